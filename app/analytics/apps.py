@@ -5,3 +5,6 @@ class AnalyticsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'analytics'
     verbose_name = 'アクセス解析'
+
+    def ready(self):
+        from analytics import signals  # noqa: F401
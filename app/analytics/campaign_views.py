@@ -13,7 +13,7 @@ from django.views.generic import CreateView, DeleteView, ListView, UpdateView
 
 from .forms import CampaignForm
 from .models import Campaign
-from .qr_generator import generate_qr_png
+from .qr_generator import ensure_qr_asset, qr_asset_name
 from .services import accessible_community_ids
 
 logger = logging.getLogger('analytics')
@@ -53,15 +53,22 @@ class CampaignFormMixin:
         return kwargs
 
     def _regenerate_qr_if_needed(self, campaign: Campaign, force: bool):
-        """force=True または qr_image 未設定なら QR を再生成する。"""
-        if force or not campaign.qr_image:
-            png = generate_qr_png(campaign.url)
-            # 既存ファイルは upload_to の uuid 命名で衝突しないが、不要なら save=False で更新
-            campaign.qr_image.save(png.name, png, save=True)
-            logger.info(
-                'Campaign QR regenerated: id=%s utm_campaign=%s',
-                campaign.pk, campaign.utm_campaign,
-            )
+        """force=True または qr_image 未設定なら QR を再生成する。
+
+        保存名は URL から決まるため、URL が変わっていなければ画像処理もストレージ書き込みもしない。
+        差し替え前の画像は他の Campaign と共有している場合があるので、ここでは削除せず
+        cleanup_qr_codes に任せる。
+        """
+        if not force and campaign.qr_image:
+            return
+        if campaign.qr_image.name == qr_asset_name(campaign.url):
+            return
+        campaign.qr_image.name = ensure_qr_asset(campaign.url)
+        campaign.save(update_fields=['qr_image', 'updated_at'])
+        logger.info(
+            'Campaign QR regenerated: id=%s utm_campaign=%s',
+            campaign.pk, campaign.utm_campaign,
+        )
 
 
 class CampaignCreateView(_AccessibleCampaignMixin, CampaignFormMixin, CreateView):
@@ -0,0 +1,44 @@
+"""アクセス解析ダッシュボードの集計結果のキャッシュ.
+
+集計は (対象 community の組, 期間, 集計日) ごとに services.get_dashboard_data の結果を保存する。
+印は全体で1つ持ち（website.versioned_cache）、PageAnalytics / PosterClick / Campaign と、
+表示に使う EventDetail / Event / Community の保存・削除シグナルが付け替える（analytics.signals）。
+集計期間は当日を基準に決まるため、キーに当日の日付を含める。
+"""
+from __future__ import annotations
+
+import hashlib
+
+from django.utils import timezone
+
+from website import versioned_cache
+from website.constants import CACHE_TTL_HOUR
+
+from . import services
+
+DASHBOARD_CACHE_TIMEOUT = CACHE_TTL_HOUR
+DASHBOARD_VERSION_KEY = 'analytics:dashboard_version'
+
+
+def _data_key(community_ids, days: int, include_global: bool) -> str:
+    ids = ','.join(str(pk) for pk in sorted(set(community_ids)))
+    digest = hashlib.sha256(
+        f'{ids}:{days}:{int(include_global)}:{timezone.localdate().isoformat()}'.encode()
+    ).hexdigest()[:32]
+    return f'analytics:dashboard:{digest}'
+
+
+def bump_dashboard_version() -> None:
+    """全ダッシュボードの集計キャッシュを無効にする（次の読み出しで作り直す）."""
+    versioned_cache.bump_versions([DASHBOARD_VERSION_KEY])
+
+
+def get_cached_dashboard_data(community_ids, *, days: int, include_global: bool = False) -> dict:
+    """services.get_dashboard_data の結果を返す。キャッシュが有効なら DB にはアクセスしない."""
+    _, data = versioned_cache.get_versioned(
+        DASHBOARD_VERSION_KEY,
+        _data_key(community_ids, days, include_global),
+        lambda: services.get_dashboard_data(community_ids, days=days, include_global=include_global),
+        DASHBOARD_CACHE_TIMEOUT,
+    )
+    return data
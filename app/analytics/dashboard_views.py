@@ -17,12 +17,13 @@ import csv
 import logging
 
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.http import HttpResponse
+from django.http import StreamingHttpResponse
 from django.views.generic import TemplateView
 
 from community.models import Community
 
 from . import services
+from .dashboard_cache import get_cached_dashboard_data
 
 logger = logging.getLogger('analytics')
 
@@ -43,13 +44,41 @@ def _csv_safe(value) -> str:
         return "'" + text
     return text
 
-# クエリパラメータで受け付ける days の許可リスト（任意値を許すと DoS リスク）
-ALLOWED_DAYS = [7, 30, 90]
-# 既定日数は services を単一の真実とし、二重管理による不整合を防ぐ
+
+class _Echo:
+    """csv.writer の書き込み先。書いた1行をそのまま返す（ストリーミング用）。"""
+
+    def write(self, value):
+        return value
+
+
+def _iter_csv_lines(rows):
+    """記事別アクセス一覧の CSV を1行ずつ返す。"""
+    # BOM を先頭に1回だけ書き込んで Excel での文字化けを防ぐ。
+    # charset=utf-8-sig だと Django が encoding 時に行ごとに BOM を付けるため、
+    # charset=utf-8 にして自前で書く
+    yield '\ufeff'
+    writer = csv.writer(_Echo())
+    yield writer.writerow([
+        'event_detail_id', 'タイトル', '公開日', '集会名',
+        'PV', 'ユーザー数', 'セッション数', '主要流入元',
+    ])
+    for row in rows:
+        yield writer.writerow([
+            row['event_detail_id'],
+            _csv_safe(row['theme']),
+            row['published_at'].isoformat() if row['published_at'] else '',
+            _csv_safe(row['community_name']),
+            row['pv'],
+            row['users'],
+            row['sessions'],
+            _csv_safe(row['top_source']),
+        ])
+
+
+# 許可リストと既定日数は services を単一の真実とし、二重管理による不整合を防ぐ
+ALLOWED_DAYS = services.ALLOWED_DAYS
 DEFAULT_DAYS = services.DEFAULT_DAYS
-# 公開後 N 日積み上げチャートで遡る日数
-POST_PUBLISH_DAYS_AFTER = 14
-POST_PUBLISH_TOP_N = 5
 
 
 class AnalyticsDashboardView(LoginRequiredMixin, TemplateView):
@@ -85,43 +114,29 @@ class AnalyticsDashboardView(LoginRequiredMixin, TemplateView):
         return [community_id]
 
     def get(self, request, *args, **kwargs):
-        # CSV エクスポートはテンプレートを返さず直接 HttpResponse
+        # CSV エクスポートはテンプレートを返さず直接ストリーミングで返す
         if request.GET.get('format') == 'csv':
             return self._export_csv()
         return super().get(request, *args, **kwargs)
 
-    def _export_csv(self) -> HttpResponse:
-        """記事別アクセス一覧を CSV で返す。Excel で文字化けしないよう UTF-8 BOM 付き。"""
+    def _export_csv(self) -> StreamingHttpResponse:
+        """記事別アクセス一覧を CSV で返す。Excel で文字化けしないよう UTF-8 BOM 付き。
+
+        集計結果を1行ずつ書き出すストリーミングレスポンスにし、期間や記事数が増えても
+        CSV 全体をメモリに載せない。
+        """
         accessible_ids = services.accessible_community_ids(self.request.user)
         target_ids = self._get_target_community_ids(accessible_ids)
         days = self._get_days()
 
-        rows = services.get_event_detail_breakdown(target_ids, days=days)
+        rows = services.iter_event_detail_export(target_ids, days=days)
 
-        response = HttpResponse(content_type='text/csv; charset=utf-8')
+        response = StreamingHttpResponse(
+            _iter_csv_lines(rows), content_type='text/csv; charset=utf-8',
+        )
         response['Content-Disposition'] = (
             f'attachment; filename="analytics-articles-{days}days.csv"'
         )
-        # BOM を書き込んで Excel での文字化けを防ぐ。
-        # charset=utf-8-sig だと Django が encoding 時に追加 BOM を付け二重 BOM になるため、
-        # charset=utf-8 にして自前で1回だけ BOM を書く
-        response.write('﻿')
-        writer = csv.writer(response)
-        writer.writerow([
-            'event_detail_id', 'タイトル', '公開日', '集会名',
-            'PV', 'ユーザー数', 'セッション数', '主要流入元',
-        ])
-        for row in rows:
-            writer.writerow([
-                row['event_detail_id'],
-                _csv_safe(row['theme']),
-                row['published_at'].isoformat() if row['published_at'] else '',
-                _csv_safe(row['community_name']),
-                row['pv'],
-                row['users'],
-                row['sessions'],
-                _csv_safe(row['top_source']),
-            ])
         return response
 
     def get_context_data(self, **kwargs):
@@ -152,26 +167,10 @@ class AnalyticsDashboardView(LoginRequiredMixin, TemplateView):
             'accessible_communities': accessible_communities,
             'selected_community': selected_community,
             'has_access': bool(accessible_ids),
-            'overall_stats': services.get_overall_stats(target_ids, days=days),
-            'daily_series': services.get_daily_series(target_ids, days=days),
-            'source_breakdown': services.get_source_breakdown(target_ids, days=days),
-            'event_detail_breakdown': services.get_event_detail_breakdown(
-                target_ids, days=days,
-            ),
-            'post_publish_chart': services.get_post_publish_series(
-                target_ids,
-                days_after=POST_PUBLISH_DAYS_AFTER,
-                top_n=POST_PUBLISH_TOP_N,
-            ),
-            # ポスタークリック集計（権限境界は target_ids ベースで services 側が絞る）
-            'poster_clicks': services.get_poster_click_stats(target_ids, days=days),
-            # キャンペーン経由アクセス（UTM utm_campaign 別）
-            'campaign_breakdown': services.get_campaign_breakdown(target_ids, days=days),
-            'campaign_daily': services.get_campaign_daily_series(target_ids, days=days),
         })
-
-        # サイト全体トラフィック（GLOBAL）は superuser のみ取得
-        if self.request.user.is_superuser:
-            context['global_traffic'] = services.get_global_traffic(days=days)
+        # 集計はまとめてキャッシュする。サイト全体トラフィック（GLOBAL）は superuser のみ取得
+        context.update(get_cached_dashboard_data(
+            target_ids, days=days, include_global=self.request.user.is_superuser,
+        ))
 
         return context
@@ -30,6 +30,8 @@ GA4_SCOPES = ['https://www.googleapis.com/auth/analytics.readonly']
 _GA4_DATE_LENGTH = 8
 
 _DIMENSIONS = ['pagePath', 'date', 'sessionSourceMedium', 'sessionCampaignName']
+# ページ別レポートの1リクエストあたりの行数（GA4 Data API の既定は 10,000、上限は 250,000）
+PAGE_REPORT_PAGE_SIZE = 100_000
 _METRICS = ['screenPageViews', 'totalUsers', 'sessions']
 _GA4_RUN_REPORT_RETRY = api_retry.Retry(
     predicate=api_retry.if_exception_type(
@@ -71,12 +73,13 @@ def _parse_ga4_date(value: str) -> str:
     return value
 
 
-def fetch_page_report(property_id: str, target_date: date) -> list[dict]:
-    """指定日のページ別アクセスレポートを GA4 から取得する。
+def fetch_page_report(property_id: str, target_date: date, end_date: date | None = None) -> list[dict]:
+    """指定日（または期間）のページ別アクセスレポートを GA4 から取得する。
 
     Args:
         property_id: GA4 Data API 用の数値プロパティID。
-        target_date: 取得対象日（start/end とも同日を指定）。
+        target_date: 取得対象日（期間指定時は開始日）。
+        end_date: 期間の終了日（含む）。省略時は target_date の1日分。
 
     Returns:
         各行を表す dict のリスト。キーは page_path / date / source_medium /
@@ -84,44 +87,46 @@ def fetch_page_report(property_id: str, target_date: date) -> list[dict]:
     """
     client = _build_client()
     date_str = target_date.isoformat()
-
-    request = RunReportRequest(
-        property=f'properties/{property_id}',
-        dimensions=[Dimension(name=name) for name in _DIMENSIONS],
-        metrics=[Metric(name=name) for name in _METRICS],
-        date_ranges=[DateRange(start_date=date_str, end_date=date_str)],
-    )
-
-    # GA4 Data API は gRPC 経路で一時的に UNAVAILABLE / DEADLINE_EXCEEDED を返すことがある。
-    # 日次同期を単発の通信断で失敗させないため、読み取りリクエストだけ明示的に再試行する。
-    response = client.run_report(request, retry=_GA4_RUN_REPORT_RETRY)
-
-    # GA4 Data API のデフォルト limit は 10,000 行。サイレント欠落を Fail Loud で検知する。
-    # 現規模（14日870行）では発生しないが、成長して上限に達したら警告ログから気付けるようにする。
-    if response.row_count > len(response.rows):
-        logger.warning(
-            'GA4 response truncated: row_count=%d returned=%d property=%s date=%s',
-            response.row_count, len(response.rows), property_id, date_str,
-        )
+    end_str = (end_date or target_date).isoformat()
 
     results = []
-    for row in response.rows:
-        page_path = row.dimension_values[0].value
-        row_date = _parse_ga4_date(row.dimension_values[1].value)
-        source_medium = row.dimension_values[2].value
-        campaign = row.dimension_values[3].value
-        results.append({
-            'page_path': page_path,
-            'date': row_date,
-            'source_medium': source_medium,
-            'campaign': campaign,
-            'pv': int(row.metric_values[0].value),
-            'users': int(row.metric_values[1].value),
-            'sessions': int(row.metric_values[2].value),
-        })
+    offset = 0
+    while True:
+        request = RunReportRequest(
+            property=f'properties/{property_id}',
+            dimensions=[Dimension(name=name) for name in _DIMENSIONS],
+            metrics=[Metric(name=name) for name in _METRICS],
+            date_ranges=[DateRange(start_date=date_str, end_date=end_str)],
+            limit=PAGE_REPORT_PAGE_SIZE,
+            offset=offset,
+        )
 
-    logger.info('GA4 fetch_page_report: property=%s date=%s rows=%d',
-                property_id, date_str, len(results))
+        # GA4 Data API は gRPC 経路で一時的に UNAVAILABLE / DEADLINE_EXCEEDED を返すことがある。
+        # 日次同期を単発の通信断で失敗させないため、読み取りリクエストだけ明示的に再試行する。
+        response = client.run_report(request, retry=_GA4_RUN_REPORT_RETRY)
+
+        for row in response.rows:
+            page_path = row.dimension_values[0].value
+            row_date = _parse_ga4_date(row.dimension_values[1].value)
+            source_medium = row.dimension_values[2].value
+            campaign = row.dimension_values[3].value
+            results.append({
+                'page_path': page_path,
+                'date': row_date,
+                'source_medium': source_medium,
+                'campaign': campaign,
+                'pv': int(row.metric_values[0].value),
+                'users': int(row.metric_values[1].value),
+                'sessions': int(row.metric_values[2].value),
+            })
+
+        # 複数日をまとめて取ると1リクエストの上限を超えうるため、row_count に達するまで offset で続きを取る
+        offset += len(response.rows)
+        if not response.rows or offset >= response.row_count:
+            break
+
+    logger.info('GA4 fetch_page_report: property=%s date=%s..%s rows=%d',
+                property_id, date_str, end_str, len(results))
     return results
 
 
@@ -0,0 +1,122 @@
+"""GA4 から取得したレポート行を PageAnalytics / PosterClick に保存する。
+
+日次同期（analytics.views.sync_analytics）と過去分のバックフィル（backfill_analytics）で共用する。
+pagePath はまとめて解決し（path_resolver.resolve_page_paths）、保存は一意制約
+（page_path, date, source_medium, campaign）をキーにした一括 upsert で行う。
+ポスタークリックも集会をまとめて読み込み、(community, date) をキーに一括 upsert する。
+一括 upsert は post_save を発火しないため、保存後にダッシュボードのキャッシュを無効にする。
+
+MySQL の INSERT ... ON DUPLICATE KEY UPDATE は衝突する制約を指定できず、Django も unique_fields を
+渡すと NotSupportedError にする。対象テーブルの一意制約は1つだけなので、指定できない DB では
+unique_fields を省いて同じ制約で衝突させる（_conflict_target）。
+"""
+import logging
+from datetime import date
+from typing import Optional
+
+from django.db import connection, transaction
+
+from community.models import Community
+
+from .dashboard_cache import bump_dashboard_version
+from .models import PageAnalytics, PosterClick
+from .path_resolver import resolve_page_paths
+
+logger = logging.getLogger('analytics')
+
+# 1回の INSERT ... ON CONFLICT で書き込む行数
+UPSERT_BATCH_SIZE = 500
+
+_UNIQUE_FIELDS = ['page_path', 'date', 'source_medium', 'campaign']
+_UPDATE_FIELDS = ['pv', 'users', 'sessions', 'content_type', 'community', 'object_id']
+
+
+def _conflict_target(unique_fields: list[str]) -> Optional[list[str]]:
+    """bulk_create(update_conflicts=True) に渡す unique_fields。指定できない DB（MySQL）では None."""
+    return unique_fields if connection.features.supports_update_conflicts_with_target else None
+
+
+def save_page_rows(rows: list[dict], *, batch_size: int = UPSERT_BATCH_SIZE) -> tuple[int, int]:
+    """ページ別レポート行を保存し、(紐付け済み件数, GLOBAL 件数) を返す。
+
+    同じキーの行は上書きするため、同じ日を再取得しても行は増えない。
+    途中失敗時の部分更新を残さないため、保存はまとめて1トランザクションにする。
+    """
+    resolved_map = resolve_page_paths((row['page_path'], row['campaign']) for row in rows)
+
+    records: dict[tuple, PageAnalytics] = {}
+    saved = 0
+    saved_global = 0
+    for row in rows:
+        # pagePath 解決に失敗した時は utm_campaign 経由で Campaign を逆引きする。
+        # landing_path=/ のチラシ QR でも主催者のキャンペーン集計に乗るようにするため
+        resolved = resolved_map[(row['page_path'], row['campaign'])]
+        if resolved is None:
+            # community/event_detail に紐付かない URL は GLOBAL レコードとして保存
+            # （superuser のみがサイト全体トラフィックとして閲覧できる）
+            resolved = {
+                'content_type': PageAnalytics.ContentType.GLOBAL,
+                'community': None,
+                'object_id': 0,
+            }
+            saved_global += 1
+        else:
+            saved += 1
+        record = PageAnalytics(
+            page_path=row['page_path'],
+            date=PageAnalytics._meta.get_field('date').to_python(row['date']),
+            source_medium=row['source_medium'],
+            campaign=row['campaign'],
+            pv=row['pv'],
+            users=row['users'],
+            sessions=row['sessions'],
+            **resolved,
+        )
+        records[(record.page_path, record.date, record.source_medium, record.campaign)] = record
+
+    if not records:
+        return saved, saved_global
+
+    pending = list(records.values())
+    with transaction.atomic():
+        for start in range(0, len(pending), batch_size):
+            PageAnalytics.objects.bulk_create(
+                pending[start:start + batch_size],
+                update_conflicts=True,
+                unique_fields=_conflict_target(_UNIQUE_FIELDS),
+                update_fields=_UPDATE_FIELDS,
+            )
+    bump_dashboard_version()
+    return saved, saved_global
+
+
+def save_poster_click_rows(rows: list[dict], target_date: date) -> int:
+    """poster_click レポート行を target_date の PosterClick として保存し、保存件数を返す。"""
+    if not rows:
+        return 0
+    existing = Community.objects.in_bulk({row['community_id'] for row in rows})
+
+    records: dict[int, PosterClick] = {}
+    saved = 0
+    for row in rows:
+        if row['community_id'] not in existing:
+            # 削除済み community への poster_click は無視（DB に保持しない）
+            continue
+        records[row['community_id']] = PosterClick(
+            community_id=row['community_id'],
+            date=target_date,
+            clicks=row['clicks'],
+            users=row['users'],
+        )
+        saved += 1
+
+    if records:
+        with transaction.atomic():
+            PosterClick.objects.bulk_create(
+                list(records.values()),
+                update_conflicts=True,
+                unique_fields=_conflict_target(['community', 'date']),
+                update_fields=['clicks', 'users'],
+            )
+        bump_dashboard_version()
+    return saved
@@ -0,0 +1,125 @@
+"""過去期間のページ別アクセスデータを GA4 から取り込む（バックフィル）。
+
+期間を --chunk-days 日ごとのチャンクに分け、GA4 への取得は --io-workers 本まで並列に行う。
+各チャンクの pagePath はまとめて解決し、PageAnalytics に一括 upsert する（analytics.ingestion）。
+DB への保存は呼び出し元スレッドで行う。
+
+完了したチャンクは default キャッシュにチェックポイントとして記録する。Cloud Run のタイムアウト等で
+中断しても、--resume を付けて再実行すれば完了済みのチャンクを飛ばして続きから取り込む。
+保存は冪等なので、同じチャンクを取り直しても行は増えない。
+
+ポスタークリック（poster_click）は日付ディメンションを持たない日次レポートのため対象外。
+月次ロールアップに圧縮済みの月（analytics.retention）は日次で上書きできないため取り込まない。
+"""
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from analytics.ga4_client import fetch_page_report
+from analytics.ingestion import save_page_rows
+from analytics.models import AnalyticsPeriod, PageAnalytics
+from utils.batch_processing import (
+    BatchCheckpoint,
+    BatchExecutor,
+    BatchOptions,
+    BatchProgress,
+    add_batch_arguments,
+)
+
+CHECKPOINT_NAME = 'backfill_analytics'
+DEFAULT_CHUNK_DAYS = 7
+
+
+def split_date_range(start: date, end: date, chunk_days: int) -> list[tuple[date, date]]:
+    """start〜end（両端含む）を chunk_days 日ずつの (開始日, 終了日) に分ける。"""
+    chunks = []
+    chunk_start = start
+    while chunk_start <= end:
+        chunk_end = min(chunk_start + timedelta(days=chunk_days - 1), end)
+        chunks.append((chunk_start, chunk_end))
+        chunk_start = chunk_end + timedelta(days=1)
+    return chunks
+
+
+def _parse_date(value: str) -> date:
+    try:
+        return date.fromisoformat(value)
+    except ValueError as exc:
+        raise CommandError(f'日付は YYYY-MM-DD 形式で指定してください: {value}') from exc
+
+
+class Command(BaseCommand):
+    help = '過去期間の GA4 ページ別アクセスデータを PageAnalytics に取り込む'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', required=True, help='取り込み開始日 (YYYY-MM-DD)')
+        parser.add_argument('--end', default=None, help='取り込み終了日 (YYYY-MM-DD)。省略時は前日。')
+        parser.add_argument(
+            '--chunk-days',
+            type=int,
+            default=DEFAULT_CHUNK_DAYS,
+            help=f'1回の GA4 取得でまとめる日数 (デフォルト: {DEFAULT_CHUNK_DAYS})',
+        )
+        add_batch_arguments(parser)
+
+    def handle(self, *args, **options):
+        start = _parse_date(options['start'])
+        end = _parse_date(options['end']) if options['end'] else timezone.localdate() - timedelta(days=1)
+        if start > end:
+            raise CommandError('--start は --end 以前の日付を指定してください。')
+        if options['chunk_days'] < 1:
+            raise CommandError('--chunk-days は1以上を指定してください。')
+        compacted = PageAnalytics.objects.filter(
+            period=AnalyticsPeriod.MONTH, date__gte=start.replace(day=1), date__lte=end,
+        )
+        if compacted.exists():
+            # 月初の日次行がロールアップ行を一意制約で上書きしてしまうため
+            raise CommandError('月次ロールアップに圧縮済みの月を含むため取り込めません。--start を見直してください。')
+        try:
+            batch_options = BatchOptions.from_options(options)
+        except ValueError as exc:
+            raise CommandError(str(exc)) from exc
+
+        property_id = settings.GA4_PROPERTY_ID
+        chunks = split_date_range(start, end, options['chunk_days'])
+        checkpoints = {
+            chunk: BatchCheckpoint(
+                CHECKPOINT_NAME, scope=f'{property_id}:{chunk[0].isoformat()}:{chunk[1].isoformat()}',
+            )
+            for chunk in chunks
+        }
+        pending = [chunk for chunk in chunks if not (batch_options.resume and checkpoints[chunk].load())]
+        self.stdout.write(
+            f'chunks={len(chunks)} pending={len(pending)} skipped={len(chunks) - len(pending)}'
+        )
+
+        def fetch(chunk: tuple[date, date]) -> list[dict]:
+            return fetch_page_report(property_id, chunk[0], chunk[1])
+
+        progress = BatchProgress(self.stdout.write, total=len(pending), label='チャンク')
+        failed = []
+        saved_total = 0
+        # 取得は io_workers 本ずつ並列に行い、取得済みの行を抱え込む量をその分に抑える
+        window = batch_options.io_workers
+        with BatchExecutor(io_workers=batch_options.io_workers) as executor:
+            for offset in range(0, len(pending), window):
+                for outcome in executor.map_io(fetch, pending[offset:offset + window]):
+                    chunk_start, chunk_end = outcome.item
+                    label = f'{chunk_start.isoformat()}..{chunk_end.isoformat()}'
+                    if not outcome.ok:
+                        # 資格情報を漏らさないため、例外の種類だけを出す
+                        self.stderr.write(f'  {label}: 取得失敗 ({type(outcome.error).__name__})')
+                        failed.append(label)
+                        continue
+                    saved, saved_global = save_page_rows(outcome.result, batch_size=batch_options.batch_size)
+                    checkpoints[outcome.item].save(True, processed=len(outcome.result))
+                    saved_total += saved + saved_global
+                    self.stdout.write(f'  {label}: rows={len(outcome.result)} saved={saved} global={saved_global}')
+                progress.advance(len(pending[offset:offset + window]))
+
+        self.stdout.write(f'saved={saved_total} failed={len(failed)}')
+        if failed:
+            # Cloud Run Job 側で失敗を検知できるよう異常終了させる（--resume で失敗分だけ取り直せる）
+            raise CommandError(f'GA4 取得に失敗したチャンクがあります: {", ".join(failed)}')
@@ -0,0 +1,65 @@
+"""どの Campaign からも参照されていない QR 画像（qr_codes/）を削除する。
+
+QR 画像は URL から決まる名前で共有されるため、URL を変えた Campaign の旧画像は
+その場では削除しない（analytics.campaign_views）。このコマンドでまとめて片付ける。
+
+保存直後でまだ Campaign に紐付いていない画像を消さないよう、--min-age-hours より
+新しいファイルは対象外にする。--apply 指定時のみ削除する（デフォルト dry-run）。
+"""
+from datetime import timedelta
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from analytics.models import Campaign
+from analytics.qr_generator import QR_DIR
+
+DEFAULT_MIN_AGE_HOURS = 24
+
+
+class Command(BaseCommand):
+    help = 'どの Campaign からも参照されていない QR 画像を削除する'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--apply', action='store_true', help='実際に削除する（指定なしはdry-run）')
+        parser.add_argument(
+            '--min-age-hours',
+            type=float,
+            default=DEFAULT_MIN_AGE_HOURS,
+            help=f'これより新しいファイルは削除しない（既定 {DEFAULT_MIN_AGE_HOURS} 時間）',
+        )
+
+    def handle(self, *args, **options):
+        apply_changes = options['apply']
+        cutoff = timezone.now() - timedelta(hours=options['min_age_hours'])
+
+        referenced = set(Campaign.objects.exclude(qr_image='').values_list('qr_image', flat=True))
+        try:
+            _, files = default_storage.listdir(QR_DIR)
+        except FileNotFoundError:
+            files = []
+
+        orphans = []
+        recent = 0
+        for filename in sorted(files):
+            name = f'{QR_DIR}/{filename}'
+            if name in referenced:
+                continue
+            if default_storage.get_modified_time(name) > cutoff:
+                recent += 1
+                continue
+            orphans.append(name)
+
+        for name in orphans:
+            self.stdout.write(f'  {name}')
+            if apply_changes:
+                default_storage.delete(name)
+
+        self.stdout.write(
+            f'total={len(files)} referenced={len(referenced)} orphaned={len(orphans)} too_recent={recent}'
+        )
+        if apply_changes:
+            self.stdout.write(self.style.SUCCESS(f'削除完了: {len(orphans)}件'))
+        else:
+            self.stdout.write(self.style.WARNING('dry-run: 削除するには --apply を指定してください'))
@@ -0,0 +1,50 @@
+"""圧縮期限を過ぎた月の PageAnalytics / PosterClick 日次行を月次ロールアップにまとめる。
+
+期限は settings.ANALYTICS_COMPACT_AFTER_DAYS（--days で上書き可）。月全体が期限より古い月だけを
+対象にし、月ごとに置き換える（analytics.retention）。--apply 指定時のみ書き換える（デフォルト dry-run）。
+"""
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from analytics.retention import DELETE_CHUNK_SIZE, compact_analytics, compaction_cutoff, pending_compaction
+
+
+class Command(BaseCommand):
+    help = '古い月のアクセス解析の日次行を月次ロールアップに圧縮する'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--apply', action='store_true', help='実際に圧縮する（指定なしはdry-run）')
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=None,
+            help='圧縮期限の日数（デフォルト: settings.ANALYTICS_COMPACT_AFTER_DAYS）',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DELETE_CHUNK_SIZE,
+            help=f'1回の DELETE で消す行数 (デフォルト: {DELETE_CHUNK_SIZE})',
+        )
+
+    def handle(self, *args, **options):
+        days = options['days'] if options['days'] is not None else settings.ANALYTICS_COMPACT_AFTER_DAYS
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size は1以上を指定してください。')
+        try:
+            before = compaction_cutoff(days)
+        except ValueError as exc:
+            raise CommandError(str(exc)) from exc
+
+        self.stdout.write(f'before={before.isoformat()}')
+        if not options['apply']:
+            for label, (months, rows) in pending_compaction(before).items():
+                self.stdout.write(f'  {label}: months={months} daily_rows={rows}')
+            self.stdout.write(self.style.WARNING('dry-run: 圧縮するには --apply を指定してください'))
+            return
+
+        for label, result in compact_analytics(before, chunk_size=options['batch_size']).items():
+            self.stdout.write(
+                f'  {label}: months={result.months} deleted={result.deleted} created={result.created}'
+            )
+        self.stdout.write(self.style.SUCCESS('圧縮完了'))
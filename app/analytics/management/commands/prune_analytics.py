@@ -0,0 +1,52 @@
+"""保持期限を過ぎた月の PageAnalytics / PosterClick を月次ロールアップも含めて削除する。
+
+期限は settings.ANALYTICS_RETENTION_DAYS（--days で上書き可、0 は削除しない）。
+主キーの範囲ごとに --batch-size 件ずつ削除・コミットし、長いロックを取らない（analytics.retention）。
+--apply 指定時のみ削除する（デフォルト dry-run）。
+"""
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from analytics.retention import DELETE_CHUNK_SIZE, pending_prune, prune_analytics, retention_cutoff
+
+
+class Command(BaseCommand):
+    help = '保持期限を過ぎたアクセス解析データを削除する'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--apply', action='store_true', help='実際に削除する（指定なしはdry-run）')
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=None,
+            help='保持期限の日数（デフォルト: settings.ANALYTICS_RETENTION_DAYS。0 は削除しない）',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DELETE_CHUNK_SIZE,
+            help=f'1回の DELETE で消す行数 (デフォルト: {DELETE_CHUNK_SIZE})',
+        )
+
+    def handle(self, *args, **options):
+        days = options['days'] if options['days'] is not None else settings.ANALYTICS_RETENTION_DAYS
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size は1以上を指定してください。')
+        try:
+            before = retention_cutoff(days)
+        except ValueError as exc:
+            raise CommandError(str(exc)) from exc
+        if before is None:
+            self.stdout.write('保持期限が設定されていないため削除しません。')
+            return
+
+        self.stdout.write(f'before={before.isoformat()}')
+        if not options['apply']:
+            for label, rows in pending_prune(before).items():
+                self.stdout.write(f'  {label}: rows={rows}')
+            self.stdout.write(self.style.WARNING('dry-run: 削除するには --apply を指定してください'))
+            return
+
+        for label, deleted in prune_analytics(before, chunk_size=options['batch_size']).items():
+            self.stdout.write(f'  {label}: deleted={deleted}')
+        self.stdout.write(self.style.SUCCESS('削除完了'))
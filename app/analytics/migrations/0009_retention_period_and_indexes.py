@@ -0,0 +1,32 @@
+# Generated by Django 5.2.14 on 2026-10-19 00:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0008_alter_campaign_utm_medium_alter_campaign_utm_source'),
+        ('community', '0028_alter_community_default_lt_duration'),
+    ]
+
+    # MySQL 8.0 での影響:
+    # - 定数の DEFAULT 付き NOT NULL 列の追加は ALGORITHM=INSTANT（既存行を書き換えない）
+    # - CREATE INDEX は InnoDB のオンライン DDL（LOCK=NONE）で、構築中も読み書きを止めない
+    # db_default を残すので、適用後も旧リビジョンの INSERT がそのまま通る
+    operations = [
+        migrations.AddField(
+            model_name='pageanalytics',
+            name='period',
+            field=models.CharField(choices=[('day', '日次'), ('month', '月次')], db_default='day', default='day', max_length=5, verbose_name='集計期間'),
+        ),
+        migrations.AddField(
+            model_name='posterclick',
+            name='period',
+            field=models.CharField(choices=[('day', '日次'), ('month', '月次')], db_default='day', default='day', max_length=5, verbose_name='集計期間'),
+        ),
+        migrations.AddIndex(
+            model_name='pageanalytics',
+            index=models.Index(fields=['community', 'date'], name='page_analytics_comm_date_idx'),
+        ),
+    ]
@@ -18,8 +18,10 @@ _UTM_TOKEN_VALIDATOR = RegexValidator(
 
 
 def qr_image_upload_to(instance, filename):
-    """QR画像を `qr_codes/<uuid>.png` に正規化する。
+    """qr_image にファイルを直接アップロードしたときの保存名を `qr_codes/<uuid>.png` に正規化する。
 
+    キャンペーン画面が生成する QR は analytics.qr_generator.ensure_qr_asset が
+    `qr_codes/<sha256>.png` に保存し、名前を直接設定するのでここは通らない。
     元ファイル名（推測可能名・連番）を公開URLに出さず、R2上での衝突を避ける。
     拡張子は常に `.png` に強制（クライアントから来たファイル名は信頼しない）。
     """
@@ -29,12 +31,21 @@ def qr_image_upload_to(instance, filename):
     return f'qr_codes/{uuid.uuid4().hex}{ext}'
 
 
+class AnalyticsPeriod(models.TextChoices):
+    """集計行が表す期間。MONTH 行は date に月初を持ち、その月の日次行を合算したもの
+    （analytics.retention で圧縮した行）。"""
+
+    DAY = 'day', '日次'
+    MONTH = 'month', '月次'
+
+
 class PageAnalytics(models.Model):
     """GA4 から取得したページ別アクセスデータの日次蓄積モデル。
 
     1行 = (page_path, date, source_medium, campaign) の組み合わせごとの集計値。
     community を権限判定の基点として必ず保持し、集計サービス側でこのFKを
     使ってアクセス可能なデータだけを絞り込む。
+    保持期間を過ぎた月の日次行は月次ロールアップ（period=MONTH）に圧縮される。
     """
 
     class ContentType(models.TextChoices):
@@ -76,6 +87,11 @@ class PageAnalytics(models.Model):
     campaign = models.CharField(
         'キャンペーン', max_length=128, default='(not set)', db_index=True,
     )
+    # db_default: デプロイ中に旧リビジョンが period なしで INSERT しても日次行として入るように
+    period = models.CharField(
+        '集計期間', max_length=5, choices=AnalyticsPeriod.choices,
+        default=AnalyticsPeriod.DAY, db_default=AnalyticsPeriod.DAY,
+    )
 
     class Meta:
         verbose_name = 'ページ解析'
@@ -87,6 +103,10 @@ class PageAnalytics(models.Model):
                 name='pageanalytics_unique_path_date_source',
             ),
         ]
+        indexes = [
+            # ダッシュボードの集計は community_id__in + 日付範囲で絞るため、その順の複合インデックス
+            models.Index(fields=['community', 'date'], name='page_analytics_comm_date_idx'),
+        ]
         ordering = ['-date', '-pv']
 
     def __str__(self):
@@ -103,6 +123,9 @@ class PosterClick(models.Model):
     PageAnalytics と分離した理由:
     - page_view ではない（custom event）ためディメンションが異なる
     - 1件 = (community, date) 単位の素朴な集計で十分（流入元別の保存は不要）
+
+    (community, date) の一意制約がそのままダッシュボード用の複合インデックスを兼ねる。
+    保持期間を過ぎた月は PageAnalytics と同じく月次ロールアップに圧縮される。
     """
 
     community = models.ForeignKey(
@@ -115,6 +138,10 @@ class PosterClick(models.Model):
     date = models.DateField('日付', db_index=True)
     clicks = models.PositiveIntegerField('クリック数', default=0)
     users = models.PositiveIntegerField('クリックユーザー数', default=0)
+    period = models.CharField(
+        '集計期間', max_length=5, choices=AnalyticsPeriod.choices,
+        default=AnalyticsPeriod.DAY, db_default=AnalyticsPeriod.DAY,
+    )
 
     class Meta:
         verbose_name = 'ポスタークリック'
@@ -3,20 +3,69 @@
 GA4 が返す pagePath（例: /community/12/）から対象モデルを引き、権限判定の
 基点となる community を解決する。pagePath で解決できない場合は utm_campaign 経由で
 Campaign テーブルを逆引きする（landing_path=/ のチラシ流入を取りこぼさないため）。
+GA4 同期では resolve_page_paths で1日分（またはバックフィルの1チャンク分）をまとめて解決する。
 """
 import re
+from collections import defaultdict
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any
+
+from django.urls import reverse
 
 from community.models import Community
 from event.models import EventDetail
 
 from .models import Campaign, PageAnalytics
 
-# クエリ文字列・末尾スラッシュ無しは対象外（正規化済みの正準URLのみ紐付ける）
-_COMMUNITY_PATTERN = re.compile(r'^/community/(\d+)/$')
-_EVENT_DETAIL_PATTERN = re.compile(r'^/event/detail/(\d+)/$')
-
 # GA4 が utm_campaign 未指定セッションに付ける標準ラベル。これは Campaign 解決対象外
 _CAMPAIGN_NOT_SET = '(not set)'
+# 分類表を作るときに URL の pk 部分へ入れる値（reverse 結果からこの位置を (\d+) に置き換える）
+_PK_PLACEHOLDER = 987654321
+
+
+@dataclass(frozen=True)
+class _Route:
+    content_type: str
+    pattern: re.Pattern
+    # pk の集合から {pk: オブジェクト} を1クエリで読み込む
+    load: Callable[[set[int]], dict[int, Any]]
+    # 読み込んだオブジェクトから権限判定の基点となる community を取り出す
+    community_of: Callable[[Any], Community]
+
+
+# (URL 名, コンテンツ種別, 読み込み, community の取り出し)
+_ROUTE_SPECS = (
+    (
+        'community:detail',
+        PageAnalytics.ContentType.COMMUNITY,
+        lambda ids: Community.objects.in_bulk(ids),
+        lambda community: community,
+    ),
+    (
+        'event:detail',
+        PageAnalytics.ContentType.EVENT_DETAIL,
+        # community は event 経由で解決する（EventDetail に直接 community FK は無い）
+        lambda ids: EventDetail.objects.select_related('event__community').in_bulk(ids),
+        lambda event_detail: event_detail.event.community,
+    ),
+)
+
+
+@lru_cache(maxsize=1)
+def _routing_table() -> tuple[_Route, ...]:
+    """URLconf から pagePath の分類表を作る。
+
+    URL 名ごとに1回だけ reverse して正準パスの形を取り出し、正規表現にする（行ごとに resolve しない）。
+    クエリ文字列・末尾スラッシュ無しは対象外（正規化済みの正準URLのみ紐付ける）。
+    """
+    routes = []
+    for url_name, content_type, load, community_of in _ROUTE_SPECS:
+        prefix, _, suffix = reverse(url_name, kwargs={'pk': _PK_PLACEHOLDER}).partition(str(_PK_PLACEHOLDER))
+        pattern = re.compile(rf'^{re.escape(prefix)}(\d+){re.escape(suffix)}$')
+        routes.append(_Route(content_type, pattern, load, community_of))
+    return tuple(routes)
 
 
 def resolve_page_path(page_path: str, campaign: str | None = None) -> dict | None:
@@ -34,47 +83,66 @@ def resolve_page_path(page_path: str, campaign: str | None = None) -> dict | Non
         紐付け成功時は content_type / community / object_id を含む dict。
         一致しない、または対象が存在しない場合は None。
     """
+    return resolve_page_paths([(page_path, campaign)])[(page_path, campaign)]
+
+
+def resolve_page_paths(entries: Iterable[tuple[str, str | None]]) -> dict[tuple[str, str | None], dict | None]:
+    """(pagePath, utm_campaign) の組をまとめて解決する（規則は resolve_page_path と同じ）。
+
+    パスを分類表で振り分けて対象モデルごとに pk をまとめ、モデルごとに1回の in_bulk で読み込んでから
+    紐付けるため、行数によらずクエリ数は一定になる。
+
+    Returns:
+        入力の各組をキーに、resolve_page_path と同じ戻り値を持つ dict。
+    """
+    entries = set(entries)
+    ids_by_route: dict[_Route, set[int]] = defaultdict(set)
+    campaigns = set()
+    for page_path, campaign in entries:
+        route, pk = _classify(page_path)
+        if route is not None:
+            ids_by_route[route].add(pk)
+        elif page_path and campaign and campaign != _CAMPAIGN_NOT_SET:
+            campaigns.add(campaign)
+
+    objects_by_route = {route: route.load(ids) for route, ids in ids_by_route.items()}
+    # Campaign の UniqueConstraint は (community, utm_campaign) のため
+    # 同一 utm_campaign が複数 community に存在しうる。曖昧な場合は GLOBAL 扱いに倒す
+    # （誤った community への割り当てによる集計汚染を避ける Fail Safe）。
+    campaigns_by_utm: dict[str, list[Campaign]] = defaultdict(list)
+    if campaigns:
+        for c in Campaign.objects.filter(utm_campaign__in=campaigns).select_related('community'):
+            campaigns_by_utm[c.utm_campaign].append(c)
+
+    return {
+        (page_path, campaign): _resolve(page_path, campaign, objects_by_route, campaigns_by_utm)
+        for page_path, campaign in entries
+    }
+
+
+def _classify(page_path: str) -> tuple[_Route | None, int | None]:
+    if page_path:
+        for route in _routing_table():
+            match = route.pattern.match(page_path)
+            if match:
+                return route, int(match.group(1))
+    return None, None
+
+
+def _resolve(page_path, campaign, objects_by_route, campaigns_by_utm) -> dict | None:
     if not page_path:
         return None
 
-    community_match = _COMMUNITY_PATTERN.match(page_path)
-    if community_match:
-        pk = int(community_match.group(1))
-        community = Community.objects.filter(pk=pk).first()
-        if community is None:
-            return None
-        return {
-            'content_type': PageAnalytics.ContentType.COMMUNITY,
-            'community': community,
-            'object_id': pk,
-        }
-
-    event_detail_match = _EVENT_DETAIL_PATTERN.match(page_path)
-    if event_detail_match:
-        pk = int(event_detail_match.group(1))
-        # community は event 経由で解決する（EventDetail に直接 community FK は無い）
-        event_detail = (
-            EventDetail.objects.select_related('event__community')
-            .filter(pk=pk)
-            .first()
-        )
-        if event_detail is None:
+    route, pk = _classify(page_path)
+    if route is not None:
+        obj = objects_by_route[route].get(pk)
+        if obj is None:
             return None
-        return {
-            'content_type': PageAnalytics.ContentType.EVENT_DETAIL,
-            'community': event_detail.event.community,
-            'object_id': pk,
-        }
+        return {'content_type': route.content_type, 'community': route.community_of(obj), 'object_id': pk}
 
     # pagePath で解決できない場合、utm_campaign で Campaign を逆引きする。
-    # Campaign の UniqueConstraint は (community, utm_campaign) のため
-    # 同一 utm_campaign が複数 community に存在しうる。曖昧な場合は GLOBAL 扱いに倒す
-    # （誤った community への割り当てによる集計汚染を避ける Fail Safe）。
     if campaign and campaign != _CAMPAIGN_NOT_SET:
-        matches = list(
-            Campaign.objects.filter(utm_campaign=campaign)
-            .select_related('community')[:2]
-        )
+        matches = campaigns_by_utm.get(campaign, [])
         if len(matches) == 1:
             c = matches[0]
             return {
@@ -1,31 +1,59 @@
 """QR コード PNG 画像生成ヘルパー。
 
-`qrcode` ライブラリで URL を PNG に変換し、`ImageField.save()` にそのまま渡せる
-`ContentFile` を返す。印刷想定で 1辺 ~410px（box_size=10, border=4）の十分なサイズ。
+`qrcode` ライブラリで URL を PNG に変換し、ストレージに保存して保存名を返す（`ensure_qr_asset`）。
+印刷想定で 1辺 ~410px（box_size=10, border=4）の十分なサイズ。
+
+同じ URL・box_size・border からは同じ画像ができるため、保存名はその組のハッシュにする
+（`qr_codes/<sha256>.png`）。保存済みなら描画もアップロードもしない。直近の描画結果は
+プロセス内の LRU キャッシュに残す。参照されなくなった画像は `cleanup_qr_codes` で削除する。
 """
+import hashlib
 import io
-import uuid
+from functools import lru_cache
 
 import qrcode
 from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
 
+QR_DIR = 'qr_codes'
+# 描画結果（PNG バイト列）を保持する件数。1枚 1〜2KB 程度
+RENDER_CACHE_SIZE = 128
 
-def generate_qr_png(url: str, *, box_size: int = 10, border: int = 4) -> ContentFile:
-    """指定 URL の QR コード PNG を生成して ContentFile で返す。
 
-    Args:
-        url: QR にエンコードする URL。
-        box_size: 1モジュールのピクセル数。10 で約 410px 四方になる。
-        border: 周囲の余白（モジュール数）。仕様上 4 以上が必須。
+def qr_content_hash(url: str, *, box_size: int = 10, border: int = 4) -> str:
+    """QR 画像の内容を決める (URL, box_size, border) のハッシュ。"""
+    return hashlib.sha256(f'{box_size}:{border}:{url}'.encode()).hexdigest()
 
-    Returns:
-        ImageField.save(name, file) に渡せる ContentFile。name は uuid.hex.png。
-    """
+
+def qr_asset_name(url: str, *, box_size: int = 10, border: int = 4) -> str:
+    """QR 画像の保存名（`qr_codes/<sha256>.png`）。"""
+    return f'{QR_DIR}/{qr_content_hash(url, box_size=box_size, border=border)}.png'
+
+
+@lru_cache(maxsize=RENDER_CACHE_SIZE)
+def _render_qr_png(url: str, box_size: int, border: int) -> bytes:
     qr = qrcode.QRCode(box_size=box_size, border=border)
     qr.add_data(url)
     qr.make(fit=True)
     img = qr.make_image(fill_color='black', back_color='white')
     buf = io.BytesIO()
     img.save(buf, format='PNG')
-    buf.seek(0)
-    return ContentFile(buf.getvalue(), name=f'{uuid.uuid4().hex}.png')
+    return buf.getvalue()
+
+
+def ensure_qr_asset(url: str, *, box_size: int = 10, border: int = 4, storage=None) -> str:
+    """QR 画像をストレージに用意し、保存名を返す（Campaign.qr_image.name にそのまま入れる）。
+
+    保存名は内容から決まるため、既に存在すれば描画もアップロードもしない。
+
+    Args:
+        url: QR にエンコードする URL。
+        box_size: 1モジュールのピクセル数。10 で約 410px 四方になる。
+        border: 周囲の余白（モジュール数）。仕様上 4 以上が必須。
+    """
+    storage = storage or default_storage
+    name = qr_asset_name(url, box_size=box_size, border=border)
+    if storage.exists(name):
+        return name
+    # 同時に保存された場合、ストレージが別名を付けることがあるので保存後の名前を返す
+    return storage.save(name, ContentFile(_render_qr_png(url, box_size, border)))
@@ -0,0 +1,204 @@
+"""アクセス解析データ（PageAnalytics / PosterClick）の保持期間管理。
+
+日次行は「日 × ページ × 流入元 × キャンペーン」ごとに増え続けるため、2段階で抑える。
+
+- 圧縮（compact_analytics）: 圧縮期限を過ぎた月の日次行を、同じキーの月次ロールアップ
+  （period=MONTH, date=月初）1行に合算する。pv / users / sessions は日次行の和なので、
+  月をまたいで切らない限り、どの期間で合計しても値は変わらない。
+- 削除（prune_analytics）: 保持期限を過ぎた月の行を、月次ロールアップも含めて削除する。
+
+ダッシュボードは直近最大 90日と、その直前の比較期間 90日を日単位で集計する。圧縮期限は
+その範囲より長くし（MIN_COMPACT_AFTER_DAYS）、画面に出る日次の値を変えない。
+
+削除は主キーの範囲ごとに分けて行い、1回の DELETE が多くの行を長くロックしないようにする。
+一括削除・一括作成は post_save を発火しないため、最後にダッシュボードのキャッシュを無効にする。
+"""
+import logging
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Optional
+
+from django.db import models, transaction
+from django.db.models import Max, Sum
+from django.utils import timezone
+
+from .dashboard_cache import bump_dashboard_version
+from .models import AnalyticsPeriod, PageAnalytics, PosterClick
+from .services import ALLOWED_DAYS
+
+logger = logging.getLogger('analytics')
+
+# 1回の DELETE で消す行数（主キーの範囲をこの件数ごとに区切る）
+DELETE_CHUNK_SIZE = 1000
+# 月次ロールアップを INSERT する行数
+ROLLUP_BATCH_SIZE = 500
+# ダッシュボードが日単位で参照する最長期間（表示期間 + 比較用の前期間）
+MIN_COMPACT_AFTER_DAYS = max(ALLOWED_DAYS) * 2
+
+
+@dataclass(frozen=True)
+class _RollupSpec:
+    """月次ロールアップの作り方。
+
+    keys は一意制約から date を除いた列。carried はキーから決まる属性で、月内の代表値を引き継ぐ
+    （削除された集会のページなど、月の途中で解決結果が変わった場合も1行にまとめる）。
+    """
+
+    label: str
+    model: type[models.Model]
+    keys: tuple[str, ...]
+    carried: tuple[str, ...]
+    sums: tuple[str, ...]
+
+
+_ROLLUP_SPECS = (
+    _RollupSpec(
+        label='page_analytics',
+        model=PageAnalytics,
+        keys=('page_path', 'source_medium', 'campaign'),
+        carried=('content_type', 'community_id', 'object_id'),
+        sums=('pv', 'users', 'sessions'),
+    ),
+    _RollupSpec(
+        label='poster_click',
+        model=PosterClick,
+        keys=('community_id',),
+        carried=(),
+        sums=('clicks', 'users'),
+    ),
+)
+
+
+@dataclass
+class CompactionResult:
+    months: int = 0
+    deleted: int = 0
+    created: int = 0
+
+
+def _validated_days(days: int, name: str) -> int:
+    if days < MIN_COMPACT_AFTER_DAYS:
+        raise ValueError(
+            f'{name} はダッシュボードの集計期間より長い {MIN_COMPACT_AFTER_DAYS} 日以上を指定してください: {days}'
+        )
+    return days
+
+
+def compaction_cutoff(after_days: int, today: Optional[date] = None) -> date:
+    """この日付より前の月を圧縮対象にする（after_days 日前を含む月の月初）。
+
+    月全体が after_days 日より古い月だけを対象にする。
+    """
+    _validated_days(after_days, '圧縮期限')
+    today = today or timezone.localdate()
+    return (today - timedelta(days=after_days)).replace(day=1)
+
+
+def retention_cutoff(retention_days: int, today: Optional[date] = None) -> Optional[date]:
+    """この日付より前の月を削除対象にする。retention_days が 0 以下なら削除しない（None）。
+
+    月次ロールアップを途中で欠けさせないよう、月初に切り下げる。
+    """
+    if retention_days <= 0:
+        return None
+    _validated_days(retention_days, '保持期限')
+    today = today or timezone.localdate()
+    return (today - timedelta(days=retention_days)).replace(day=1)
+
+
+def _next_month(month: date) -> date:
+    return (month.replace(day=1) + timedelta(days=32)).replace(day=1)
+
+
+def delete_in_pk_ranges(queryset, *, chunk_size: int = DELETE_CHUNK_SIZE) -> int:
+    """queryset の行を主キーの範囲ごとに削除し、削除件数を返す。
+
+    主キーを昇順に chunk_size 件ずつ読み、その最小〜最大の範囲に queryset の条件を重ねて削除する。
+    呼び出し元がトランザクション外なら、範囲ごとにコミットされる。
+    """
+    deleted = 0
+    last_pk = 0
+    while True:
+        pks = list(
+            queryset.filter(pk__gt=last_pk).order_by('pk').values_list('pk', flat=True)[:chunk_size]
+        )
+        if not pks:
+            return deleted
+        count, _ = queryset.filter(pk__gte=pks[0], pk__lte=pks[-1]).delete()
+        deleted += count
+        last_pk = pks[-1]
+
+
+def pending_compaction(before: date) -> dict[str, tuple[int, int]]:
+    """圧縮対象の (月数, 日次行数) をモデルごとに返す（dry-run 用）。"""
+    result = {}
+    for spec in _ROLLUP_SPECS:
+        daily = spec.model.objects.filter(period=AnalyticsPeriod.DAY, date__lt=before)
+        result[spec.label] = (len(daily.dates('date', 'month')), daily.count())
+    return result
+
+
+def pending_prune(before: date) -> dict[str, int]:
+    """削除対象の行数をモデルごとに返す（dry-run 用）。"""
+    return {spec.label: spec.model.objects.filter(date__lt=before).count() for spec in _ROLLUP_SPECS}
+
+
+def _compact_month(spec: _RollupSpec, month: date, *, chunk_size: int) -> tuple[int, int]:
+    """1か月分の行を月次ロールアップにまとめ、(削除件数, 作成件数) を返す。
+
+    既存のロールアップと後から取り込まれた日次行も合算し直すので、何度実行しても結果は同じ。
+    対象は同期で書き込まれない古い月の行だけなので、月ごとに1トランザクションで置き換える。
+    """
+    rows = spec.model.objects.filter(date__gte=month, date__lt=_next_month(month))
+    with transaction.atomic():
+        aggregates = list(
+            rows.values(*spec.keys)
+            .annotate(
+                **{f'{field}__max': Max(field) for field in spec.carried},
+                **{f'{field}__sum': Sum(field) for field in spec.sums},
+            )
+            .order_by()
+        )
+        deleted = delete_in_pk_ranges(rows, chunk_size=chunk_size)
+        rollups = [
+            spec.model(
+                date=month,
+                period=AnalyticsPeriod.MONTH,
+                **{field: row[field] for field in spec.keys},
+                **{field: row[f'{field}__max'] for field in spec.carried},
+                **{field: row[f'{field}__sum'] or 0 for field in spec.sums},
+            )
+            for row in aggregates
+        ]
+        spec.model.objects.bulk_create(rollups, batch_size=ROLLUP_BATCH_SIZE)
+    return deleted, len(rollups)
+
+
+def compact_analytics(before: date, *, chunk_size: int = DELETE_CHUNK_SIZE) -> dict[str, CompactionResult]:
+    """before より前の月の日次行を月次ロールアップに圧縮し、モデルごとの結果を返す。"""
+    results = {}
+    for spec in _ROLLUP_SPECS:
+        result = CompactionResult()
+        months = spec.model.objects.filter(period=AnalyticsPeriod.DAY, date__lt=before).dates('date', 'month')
+        for month in months:
+            deleted, created = _compact_month(spec, month, chunk_size=chunk_size)
+            result.months += 1
+            result.deleted += deleted
+            result.created += created
+            logger.info(
+                'Analytics compacted: model=%s month=%s deleted=%d created=%d',
+                spec.label, month.isoformat(), deleted, created,
+            )
+        results[spec.label] = result
+    bump_dashboard_version()
+    return results
+
+
+def prune_analytics(before: date, *, chunk_size: int = DELETE_CHUNK_SIZE) -> dict[str, int]:
+    """before より前の行（月次ロールアップを含む）を削除し、モデルごとの削除件数を返す。"""
+    results = {
+        spec.label: delete_in_pk_ranges(spec.model.objects.filter(date__lt=before), chunk_size=chunk_size)
+        for spec in _ROLLUP_SPECS
+    }
+    bump_dashboard_version()
+    return results
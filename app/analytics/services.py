@@ -5,21 +5,30 @@ object_id だけで絞ると他 community のデータが混入するため、co
 省略してはならない。
 """
 import logging
+from collections import defaultdict
+from collections.abc import Iterator
 from datetime import date, timedelta
 
-from django.db.models import Sum
+from django.db.models import OuterRef, Q, Subquery, Sum
 from django.utils import timezone
 
 from community.models import Community
 from event.models import EventDetail
 
-from .models import Campaign, PageAnalytics, PosterClick
+from .models import AnalyticsPeriod, Campaign, PageAnalytics, PosterClick
 
 logger = logging.getLogger('analytics')
 
 DEFAULT_DAYS = 30
+# ダッシュボードで選べる表示日数（任意値を許すと DoS リスク）。保持期間管理の下限にも使う
+ALLOWED_DAYS = [7, 30, 90]
 # ダッシュボード「人気記事ランキング」のデフォルト件数
 TOP_EVENT_DETAILS_LIMIT = 50
+# CSV エクスポートで DB から一度に読む行数
+EXPORT_CHUNK_SIZE = 500
+# 公開後 N 日積み上げチャートで遡る日数と記事数
+POST_PUBLISH_DAYS_AFTER = 14
+POST_PUBLISH_TOP_N = 5
 
 
 def _date_range(days=DEFAULT_DAYS) -> tuple[date, date]:
@@ -154,19 +163,21 @@ def get_overall_stats(community_ids, *, days=DEFAULT_DAYS) -> dict:
     if not community_ids:
         return _empty_overall_stats()
 
-    current = (
+    # 両期間を1クエリで集計する（条件付き集計）
+    current = Q(date__gte=since)
+    previous = Q(date__lte=prev_until)
+    totals = (
         PageAnalytics.objects
-        .filter(community_id__in=community_ids, date__gte=since, date__lte=until)
-        .aggregate(pv=Sum('pv'), users=Sum('users'), sessions=Sum('sessions'))
-    )
-    prev = (
-        PageAnalytics.objects
-        .filter(
-            community_id__in=community_ids,
-            date__gte=prev_since,
-            date__lte=prev_until,
+        .filter(community_id__in=community_ids, date__gte=prev_since, date__lte=until)
+        .aggregate(
+            # 別名をフィールド名と同じにすると後続の Sum がその集計を参照してしまう
+            pv_current=Sum('pv', filter=current),
+            users_current=Sum('users', filter=current),
+            sessions_current=Sum('sessions', filter=current),
+            pv_prev=Sum('pv', filter=previous),
+            users_prev=Sum('users', filter=previous),
+            sessions_prev=Sum('sessions', filter=previous),
         )
-        .aggregate(pv=Sum('pv'), users=Sum('users'), sessions=Sum('sessions'))
     )
 
     def _change(curr, before):
@@ -174,12 +185,12 @@ def get_overall_stats(community_ids, *, days=DEFAULT_DAYS) -> dict:
             return None
         return round((curr - before) / before * 100, 1)
 
-    pv_curr = current['pv'] or 0
-    users_curr = current['users'] or 0
-    sessions_curr = current['sessions'] or 0
-    pv_prev = prev['pv'] or 0
-    users_prev = prev['users'] or 0
-    sessions_prev = prev['sessions'] or 0
+    pv_curr = totals['pv_current'] or 0
+    users_curr = totals['users_current'] or 0
+    sessions_curr = totals['sessions_current'] or 0
+    pv_prev = totals['pv_prev'] or 0
+    users_prev = totals['users_prev'] or 0
+    sessions_prev = totals['sessions_prev'] or 0
 
     return {
         'pv': pv_curr,
@@ -225,65 +236,93 @@ def get_event_detail_breakdown(
     if not community_ids:
         return []
 
-    # まず PV 降順で event_detail 単位に集計
     base = _base_queryset(
         community_ids,
         content_type=PageAnalytics.ContentType.EVENT_DETAIL,
         days=days,
     )
-    aggregates = list(
+    # 紐付けが切れた（記事削除等）レコードは上限件数に数えたうえで除く
+    return [
+        _event_detail_result(row)
+        for row in _event_detail_rows(base)[:limit]
+        if row['published_at'] is not None
+    ]
+
+
+def _event_detail_rows(base):
+    """記事別の集計に、記事のメタ情報と主要流入元を相関サブクエリで付けた PV 降順のクエリ。"""
+    detail = EventDetail.objects.filter(pk=OuterRef('object_id'))
+    top_source = (
+        base.filter(object_id=OuterRef('object_id'))
+        .values('source_medium')
+        .annotate(source_pv=Sum('pv'))
+        .order_by('-source_pv', 'source_medium')
+        .values('source_medium')[:1]
+    )
+    return (
         base.values('object_id')
-        .annotate(pv=Sum('pv'), users=Sum('users'), sessions=Sum('sessions'))
-        .order_by('-pv')[:limit]
+        .annotate(
+            pv=Sum('pv'),
+            users=Sum('users'),
+            sessions=Sum('sessions'),
+            theme=Subquery(detail.values('theme')[:1]),
+            h1=Subquery(detail.values('h1')[:1]),
+            published_at=Subquery(detail.values('event__date')[:1]),
+            community_name=Subquery(detail.values('event__community__name')[:1]),
+            top_source=Subquery(top_source),
+        )
+        .order_by('-pv', 'object_id')
     )
 
-    if not aggregates:
-        return []
 
-    event_detail_ids = [row['object_id'] for row in aggregates]
+def _event_detail_result(row) -> dict:
+    return {
+        'event_detail_id': row['object_id'],
+        'theme': row['theme'] or row['h1'] or '(無題)',
+        'published_at': row['published_at'],
+        'community_name': row['community_name'],
+        'pv': row['pv'] or 0,
+        'users': row['users'] or 0,
+        'sessions': row['sessions'] or 0,
+        'top_source': row['top_source'] or '(不明)',
+    }
+
 
-    # EventDetail を bulk fetch（N+1 を避ける）
-    event_details = (
-        EventDetail.objects
-        .select_related('event__community')
-        .filter(pk__in=event_detail_ids)
-    )
-    detail_map = {ed.pk: ed for ed in event_details}
+def iter_event_detail_export(
+    community_ids, *, days=DEFAULT_DAYS, chunk_size=EXPORT_CHUNK_SIZE,
+) -> Iterator[dict]:
+    """CSV エクスポート用に、記事別の集計を PV 降順で1行ずつ返す。
 
-    # 各 event_detail の流入元上位1件
-    top_sources = (
-        base.filter(object_id__in=event_detail_ids)
-        .values('object_id', 'source_medium')
-        .annotate(pv=Sum('pv'))
-        .order_by('object_id', '-pv')
+    get_event_detail_breakdown と同じ項目を件数上限なしで返す。記事のメタ情報と主要流入元は
+    相関サブクエリで同じ集計クエリに含めるため、記事数・期間によらずクエリは1本で、
+    結果は iterator(chunk_size) で読みながら返す（モデルインスタンスや全行のリストを作らない）。
+
+    Args:
+        community_ids: アクセス可能な community id（必須の権限境界）。
+        days: 遡る日数。
+        chunk_size: DB から一度に読む行数。
+
+    Yields:
+        get_event_detail_breakdown の要素と同じ形の dict。
+    """
+    if not community_ids:
+        return
+
+    base = _base_queryset(
+        community_ids,
+        content_type=PageAnalytics.ContentType.EVENT_DETAIL,
+        days=days,
     )
-    top_source_map = {}
-    for row in top_sources:
-        # 同じ object_id 内で最初に来たものが PV 最大（order_by の優先順）
-        top_source_map.setdefault(row['object_id'], row['source_medium'])
-
-    results = []
-    for row in aggregates:
-        pk = row['object_id']
-        ed = detail_map.get(pk)
-        if ed is None:
+    for row in _event_detail_rows(base).iterator(chunk_size=chunk_size):
+        if row['published_at'] is None:
             # 紐付けが切れた（記事削除等）レコードは無視
             continue
-        results.append({
-            'event_detail_id': pk,
-            'theme': ed.theme or ed.h1 or '(無題)',
-            'published_at': ed.event.date,
-            'community_name': ed.event.community.name,
-            'pv': row['pv'] or 0,
-            'users': row['users'] or 0,
-            'sessions': row['sessions'] or 0,
-            'top_source': top_source_map.get(pk, '(不明)'),
-        })
-
-    return results
+        yield _event_detail_result(row)
 
 
-def get_post_publish_series(community_ids, *, days_after=14, top_n=5) -> dict:
+def get_post_publish_series(
+    community_ids, *, days_after=POST_PUBLISH_DAYS_AFTER, top_n=POST_PUBLISH_TOP_N,
+) -> dict:
     """公開後の経過日数を揃えた PV 推移を、人気上位 N 記事について返す。
 
     各記事の公開日（event.date）から N 日間のPVを「経過日数: 0,1,2,...」で並べる。
@@ -309,60 +348,56 @@ def get_post_publish_series(community_ids, *, days_after=14, top_n=5) -> dict:
     # 候補選定: 全期間で PV 上位を選ぶ（公開からの経過期間に関係なく、人気記事を網羅）。
     # 直近期間で絞ると古い人気記事が落ち、その後の Day 0〜N PV 取得時に
     # 「窓内にデータなし」で全件 0 になりチャートが空になる不整合が出るため
-    top_records = (
-        PageAnalytics.objects
-        .filter(
-            community_id__in=community_ids,
-            content_type=PageAnalytics.ContentType.EVENT_DETAIL,
-        )
+    event_details = PageAnalytics.objects.filter(
+        community_id__in=community_ids,
+        content_type=PageAnalytics.ContentType.EVENT_DETAIL,
+    )
+    detail = EventDetail.objects.filter(pk=OuterRef('object_id'))
+    top_records = list(
+        event_details
         .values('object_id')
-        .annotate(pv=Sum('pv'))
+        .annotate(
+            pv=Sum('pv'),
+            publish_date=Subquery(detail.values('event__date')[:1]),
+            theme=Subquery(detail.values('theme')[:1]),
+            h1=Subquery(detail.values('h1')[:1]),
+        )
         .order_by('-pv')[:top_n]
     )
-    event_detail_ids = [row['object_id'] for row in top_records]
-    if not event_detail_ids:
+    if not top_records:
         return {'labels': [], 'datasets': []}
 
-    event_details = (
-        EventDetail.objects
-        .select_related('event')
-        .filter(pk__in=event_detail_ids)
-    )
-    detail_map = {ed.pk: ed for ed in event_details}
-
     labels = [f'Day {i}' for i in range(days_after + 1)]
-    datasets = []
+    candidates = [row for row in top_records if row['publish_date'] is not None]
+    if not candidates:
+        return {'labels': labels, 'datasets': []}
+
+    # 記事ごとに公開日基準の日付範囲を絶対指定し、全記事分の日次 PV を1クエリで取得する
+    # （権限境界の community_id__in は維持）。月次ロールアップは日ごとの推移を持たないため除く
+    windows = Q()
+    for row in candidates:
+        windows |= Q(
+            object_id=row['object_id'],
+            date__gte=row['publish_date'],
+            date__lte=row['publish_date'] + timedelta(days=days_after),
+        )
+    day_pvs: dict[int, dict[date, int]] = defaultdict(dict)
+    for row in event_details.filter(windows, period=AnalyticsPeriod.DAY).values('object_id', 'date').annotate(pv=Sum('pv')):
+        day_pvs[row['object_id']][row['date']] = row['pv']
 
-    for ed_id in event_detail_ids:
-        ed = detail_map.get(ed_id)
-        if ed is None:
-            continue
-        publish_date: date = ed.event.date
-
-        # 公開日基準で日付範囲を絶対指定して PV を取得（権限境界の community_id__in は維持）
-        day_pvs = {
-            row['date']: row['pv']
-            for row in (
-                PageAnalytics.objects.filter(
-                    community_id__in=community_ids,
-                    content_type=PageAnalytics.ContentType.EVENT_DETAIL,
-                    object_id=ed_id,
-                    date__gte=publish_date,
-                    date__lte=publish_date + timedelta(days=days_after),
-                )
-                .values('date')
-                .annotate(pv=Sum('pv'))
-            )
-        }
+    datasets = []
+    for row in candidates:
+        publish_date: date = row['publish_date']
+        pvs = day_pvs.get(row['object_id'], {})
         data = [
-            day_pvs.get(publish_date + timedelta(days=i), 0) or 0
+            pvs.get(publish_date + timedelta(days=i), 0) or 0
             for i in range(days_after + 1)
         ]
         # 経過日のうちすべて 0 なら省略（チャートが汚れるため）
         if not any(data):
             continue
         datasets.append({
-            'label': (ed.theme or ed.h1 or '(無題)')[:30],
+            'label': (row['theme'] or row['h1'] or '(無題)')[:30],
             'data': data,
         })
 
@@ -510,34 +545,22 @@ def get_campaign_daily_series(
     if exclude_default:
         queryset = queryset.exclude(campaign=CAMPAIGN_NOT_SET)
 
-    # 上位 N キャンペーン（PV 合計で）を選ぶ
-    top_campaigns = list(
-        queryset
-        .values('campaign')
-        .annotate(pv=Sum('pv'))
-        .order_by('-pv')[:top_n]
-    )
-    if not top_campaigns:
-        return {'labels': [], 'datasets': []}
-
-    top_keys = [row['campaign'] for row in top_campaigns]
-
     # 日付ラベル: today-days 〜 today-1 のちょうど days 日分（当日除外、_date_range と一致）
     since, _until = _date_range(days)
     label_dates = [since + timedelta(days=i) for i in range(days)]
     labels = [d.strftime('%m/%d') for d in label_dates]
 
-    # 一括取得して dict 化（N+1 防止）
-    daily_rows = (
-        queryset
-        .filter(campaign__in=top_keys)
-        .values('campaign', 'date')
-        .annotate(pv=Sum('pv'))
-    )
+    # キャンペーン×日付の PV を一括取得し、合計 PV で上位 N キャンペーンを選ぶ（N+1 防止）
+    totals: dict[str, int] = defaultdict(int)
     # {campaign: {date: pv}}
-    by_campaign: dict[str, dict] = {key: {} for key in top_keys}
-    for row in daily_rows:
-        by_campaign.setdefault(row['campaign'], {})[row['date']] = row['pv']
+    by_campaign: dict[str, dict] = defaultdict(dict)
+    for row in queryset.values('campaign', 'date').annotate(pv=Sum('pv')):
+        totals[row['campaign']] += row['pv'] or 0
+        by_campaign[row['campaign']][row['date']] = row['pv']
+    if not totals:
+        return {'labels': [], 'datasets': []}
+
+    top_keys = sorted(totals, key=lambda key: (-totals[key], key))[:top_n]
 
     # 人間可読名（Campaign.name）を引く
     name_map = {
@@ -585,39 +608,57 @@ def get_poster_click_stats(community_ids, *, days=DEFAULT_DAYS) -> dict:
         date__lte=until,
     )
 
-    total = base.aggregate(clicks=Sum('clicks'), users=Sum('users'))
     daily = list(
         base.values('date')
         .annotate(clicks=Sum('clicks'), users=Sum('users'))
         .order_by('date')
     )
-    per_community_agg = list(
-        base.values('community_id')
-        .annotate(clicks=Sum('clicks'), users=Sum('users'))
-        .order_by('-clicks')
-    )
-    # name を付加（少数件想定なので bulk lookup）
-    community_map = {
-        c.pk: c.name
-        for c in Community.objects.filter(
-            pk__in=[r['community_id'] for r in per_community_agg]
-        )
-    }
+    # name は JOIN で一緒に取る
     per_community = [
         {
             'community_id': r['community_id'],
-            'name': community_map.get(r['community_id'], '(削除済み)'),
+            'name': r['community__name'] or '(削除済み)',
             'clicks': r['clicks'] or 0,
             'users': r['users'] or 0,
         }
-        for r in per_community_agg
+        for r in (
+            base.values('community_id', 'community__name')
+            .annotate(clicks=Sum('clicks'), users=Sum('users'))
+            .order_by('-clicks')
+        )
     ]
 
+    # 合計は日次集計の和と等しいため、別途 SUM を取らない
     return {
         'total': {
-            'clicks': total['clicks'] or 0,
-            'users': total['users'] or 0,
+            'clicks': sum(row['clicks'] or 0 for row in daily),
+            'users': sum(row['users'] or 0 for row in daily),
         },
         'daily': daily,
         'per_community': per_community,
     }
+
+
+def get_dashboard_data(community_ids, *, days=DEFAULT_DAYS, include_global=False) -> dict:
+    """ダッシュボードに表示する集計をまとめて返す（キャッシュは analytics.dashboard_cache）。
+
+    各集計は記事数・集会数によらず固定本数のクエリで求める。
+
+    Args:
+        community_ids: アクセス可能な community id（必須の権限境界）。
+        days: 遡る日数。
+        include_global: True ならサイト全体トラフィック（superuser 専用）も含める。
+    """
+    data = {
+        'overall_stats': get_overall_stats(community_ids, days=days),
+        'daily_series': get_daily_series(community_ids, days=days),
+        'source_breakdown': get_source_breakdown(community_ids, days=days),
+        'event_detail_breakdown': get_event_detail_breakdown(community_ids, days=days),
+        'post_publish_chart': get_post_publish_series(community_ids),
+        'poster_clicks': get_poster_click_stats(community_ids, days=days),
+        'campaign_breakdown': get_campaign_breakdown(community_ids, days=days),
+        'campaign_daily': get_campaign_daily_series(community_ids, days=days),
+    }
+    if include_global:
+        data['global_traffic'] = get_global_traffic(days=days)
+    return data
@@ -0,0 +1,29 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from community.models import Community
+from event.models import Event, EventDetail
+
+from analytics.dashboard_cache import bump_dashboard_version
+from analytics.models import Campaign, PageAnalytics, PosterClick
+
+
+@receiver(post_save, sender=PageAnalytics)
+@receiver(post_delete, sender=PageAnalytics)
+@receiver(post_save, sender=PosterClick)
+@receiver(post_delete, sender=PosterClick)
+@receiver(post_save, sender=Campaign)
+@receiver(post_delete, sender=Campaign)
+def invalidate_on_analytics_change(sender, **kwargs):
+    bump_dashboard_version()
+
+
+@receiver(post_save, sender=EventDetail)
+@receiver(post_delete, sender=EventDetail)
+@receiver(post_save, sender=Event)
+@receiver(post_delete, sender=Event)
+@receiver(post_save, sender=Community)
+@receiver(post_delete, sender=Community)
+def invalidate_on_display_change(sender, **kwargs):
+    # ダッシュボードは記事タイトル・公開日・集会名を表示する
+    bump_dashboard_version()
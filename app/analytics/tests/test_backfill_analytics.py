@@ -0,0 +1,246 @@
+"""backfill_analytics コマンドと一括取り込み（analytics.ingestion）のテスト。
+
+GA4 クライアントは固定のレポートを返す偽物に差し替える。
+"""
+from datetime import date, timedelta
+from io import StringIO
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from analytics import ga4_client
+from analytics.ingestion import save_page_rows, save_poster_click_rows
+from analytics.models import AnalyticsPeriod, PageAnalytics, PosterClick
+from tests.factories import make_community, make_event, make_event_detail
+
+
+def _ga4_row(page_path, day, source, pv):
+    return SimpleNamespace(
+        dimension_values=[
+            SimpleNamespace(value=page_path),
+            SimpleNamespace(value=day.strftime('%Y%m%d')),
+            SimpleNamespace(value=source),
+            SimpleNamespace(value='(not set)'),
+        ],
+        metric_values=[SimpleNamespace(value=str(pv)) for _ in range(3)],
+    )
+
+
+class FakeGA4Client:
+    """日付ごとの固定行を、リクエストの期間と offset / limit に従って返す。"""
+
+    def __init__(self, rows_by_date, *, failing_starts=()):
+        self.rows_by_date = rows_by_date
+        self.failing_starts = set(failing_starts)
+        self.requested = []
+
+    def run_report(self, request, retry=None):
+        start = date.fromisoformat(request.date_ranges[0].start_date)
+        end = date.fromisoformat(request.date_ranges[0].end_date)
+        self.requested.append((start, end, request.offset))
+        if start in self.failing_starts:
+            raise RuntimeError('GA4 unavailable')
+        rows = [
+            row
+            for day, day_rows in sorted(self.rows_by_date.items())
+            if start <= day <= end
+            for row in day_rows
+        ]
+        return SimpleNamespace(
+            row_count=len(rows),
+            rows=rows[request.offset:request.offset + request.limit],
+        )
+
+
+@override_settings(GA4_PROPERTY_ID='123456789')
+class BackfillAnalyticsCommandTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.community = make_community(name='バックフィル集会')
+        self.start = date(2026, 3, 1)
+        self.days = [self.start + timedelta(days=i) for i in range(10)]
+        self.client_fake = FakeGA4Client({
+            day: [
+                _ga4_row(f'/community/{self.community.pk}/', day, 'google / organic', 10),
+                _ga4_row('/about/', day, '(direct) / (none)', 3),
+            ]
+            for day in self.days
+        })
+        patcher = patch.object(ga4_client, '_build_client', return_value=self.client_fake)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _backfill(self, *extra):
+        out = StringIO()
+        call_command(
+            'backfill_analytics',
+            '--start', self.days[0].isoformat(),
+            '--end', self.days[-1].isoformat(),
+            '--chunk-days', '3',
+            '--io-workers', '2',
+            *extra,
+            stdout=out,
+            stderr=StringIO(),
+        )
+        return out.getvalue()
+
+    def test_imports_every_day_in_chunks(self):
+        output = self._backfill()
+
+        self.assertIn('chunks=4 pending=4', output)
+        self.assertEqual(
+            sorted({(s, e) for s, e, _ in self.client_fake.requested}),
+            [
+                (date(2026, 3, 1), date(2026, 3, 3)),
+                (date(2026, 3, 4), date(2026, 3, 6)),
+                (date(2026, 3, 7), date(2026, 3, 9)),
+                (date(2026, 3, 10), date(2026, 3, 10)),
+            ],
+        )
+        community_rows = PageAnalytics.objects.filter(community=self.community)
+        self.assertEqual(community_rows.count(), 10)
+        self.assertEqual(
+            set(community_rows.values_list('content_type', flat=True)),
+            {PageAnalytics.ContentType.COMMUNITY},
+        )
+        self.assertEqual(
+            PageAnalytics.objects.filter(content_type=PageAnalytics.ContentType.GLOBAL).count(), 10,
+        )
+
+    def test_resume_skips_completed_chunks(self):
+        self._backfill()
+        self.client_fake.requested.clear()
+
+        output = self._backfill('--resume')
+
+        self.assertIn('pending=0 skipped=4', output)
+        self.assertEqual(self.client_fake.requested, [])
+        self.assertEqual(PageAnalytics.objects.count(), 20)
+
+    def test_failed_chunk_is_retried_on_resume(self):
+        self.client_fake.failing_starts = {date(2026, 3, 4)}
+
+        with self.assertRaises(CommandError):
+            self._backfill()
+        self.assertEqual(PageAnalytics.objects.filter(community=self.community).count(), 7)
+
+        self.client_fake.failing_starts = set()
+        self.client_fake.requested.clear()
+        self._backfill('--resume')
+
+        self.assertEqual(
+            {(s, e) for s, e, _ in self.client_fake.requested},
+            {(date(2026, 3, 4), date(2026, 3, 6))},
+        )
+        self.assertEqual(PageAnalytics.objects.filter(community=self.community).count(), 10)
+
+    def test_rerun_without_resume_overwrites_without_duplicating(self):
+        self._backfill()
+        self._backfill()
+
+        self.assertEqual(PageAnalytics.objects.count(), 20)
+
+    def test_refuses_months_already_compacted(self):
+        PageAnalytics.objects.create(
+            page_path='/about/', date=date(2026, 3, 1), content_type=PageAnalytics.ContentType.GLOBAL,
+            pv=300, source_medium='(direct) / (none)', period=AnalyticsPeriod.MONTH,
+        )
+
+        with self.assertRaises(CommandError):
+            self._backfill()
+
+        self.assertEqual(self.client_fake.requested, [])
+        self.assertEqual(PageAnalytics.objects.get().pv, 300)
+
+    def test_report_is_paged_until_row_count(self):
+        with patch.object(ga4_client, 'PAGE_REPORT_PAGE_SIZE', 3):
+            rows = ga4_client.fetch_page_report('123456789', self.days[0], self.days[2])
+
+        self.assertEqual(len(rows), 6)
+        self.assertEqual([offset for _, _, offset in self.client_fake.requested], [0, 3])
+
+
+class SavePageRowsTest(TestCase):
+    def _rows(self, details, day):
+        return [
+            {
+                'page_path': f'/event/detail/{detail.pk}/',
+                'date': day.isoformat(),
+                'source_medium': 'google / organic',
+                'campaign': '(not set)',
+                'pv': 5,
+                'users': 4,
+                'sessions': 3,
+            }
+            for detail in details
+        ]
+
+    def _count_queries(self, rows):
+        with CaptureQueriesContext(connection) as ctx:
+            save_page_rows(rows)
+        return len(ctx.captured_queries)
+
+    def test_query_count_does_not_grow_with_rows(self):
+        community = make_community(name='一括解決集会')
+        details = [
+            make_event_detail(make_event(community, event_date=date(2026, 3, 1) + timedelta(days=i)))
+            for i in range(12)
+        ]
+
+        few = self._count_queries(self._rows(details[:2], date(2026, 3, 20)))
+        many = self._count_queries(self._rows(details, date(2026, 3, 21)))
+
+        self.assertEqual(few, many)
+        self.assertEqual(
+            PageAnalytics.objects.filter(
+                community=community, content_type=PageAnalytics.ContentType.EVENT_DETAIL,
+            ).count(),
+            14,
+        )
+
+    def test_omits_conflict_target_when_backend_cannot_name_it(self):
+        """MySQL（ON DUPLICATE KEY UPDATE）では unique_fields を渡すと NotSupportedError になる"""
+        community = make_community(name='MySQL集会')
+        detail = make_event_detail(make_event(community, event_date=date(2026, 3, 1)))
+
+        with patch.object(connection.features, 'supports_update_conflicts_with_target', False), \
+                patch.object(PageAnalytics.objects, 'bulk_create') as bulk_create:
+            save_page_rows(self._rows([detail], date(2026, 3, 20)))
+
+        kwargs = bulk_create.call_args.kwargs
+        self.assertIsNone(kwargs['unique_fields'])
+        self.assertTrue(kwargs['update_conflicts'])
+
+
+class SavePosterClickRowsTest(TestCase):
+    def setUp(self):
+        self.community = make_community(name='ポスター集会')
+        self.day = date(2026, 3, 20)
+
+    def _rows(self, clicks):
+        return [
+            {'community_id': self.community.pk, 'clicks': clicks, 'users': 1},
+            {'community_id': 999999, 'clicks': clicks, 'users': 1},
+        ]
+
+    def test_overwrites_same_day_and_skips_missing_communities(self):
+        save_poster_click_rows(self._rows(3), self.day)
+
+        saved = save_poster_click_rows(self._rows(5), self.day)
+
+        self.assertEqual(saved, 1)
+        self.assertEqual(list(PosterClick.objects.values_list('community_id', 'clicks')), [(self.community.pk, 5)])
+
+    def test_omits_conflict_target_when_backend_cannot_name_it(self):
+        with patch.object(connection.features, 'supports_update_conflicts_with_target', False), \
+                patch.object(PosterClick.objects, 'bulk_create') as bulk_create:
+            save_poster_click_rows(self._rows(3), self.day)
+
+        self.assertIsNone(bulk_create.call_args.kwargs['unique_fields'])
@@ -2,13 +2,17 @@
 
 他集会のキャンペーンを一覧で見られないこと、直接 URL でも 404 になることを担保する。
 """
+from unittest import mock
+
 from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
 from django.test import TestCase
 from django.urls import reverse
 
 from community.models import Community, CommunityMember
 
 from analytics.models import Campaign
+from analytics.qr_generator import ensure_qr_asset, qr_asset_name
 
 User = get_user_model()
 
@@ -114,6 +118,63 @@ class CampaignViewPermissionTest(TestCase):
         self.assertTrue(created.qr_image.name.startswith('qr_codes/'))
         self.assertTrue(created.qr_image.name.endswith('.png'))
 
+    def test_create_stores_qr_under_content_addressed_name(self):
+        self.client.force_login(self.user_a)
+        self.client.post(
+            reverse('analytics:campaign_create'),
+            data={
+                'community': self.community_a.pk,
+                'name': 'QR命名テスト',
+                'utm_source': 'flyer',
+                'utm_medium': 'qr',
+                'utm_campaign': 'qr-name-test',
+                'landing_path': '/',
+            },
+        )
+        created = Campaign.objects.get(utm_campaign='qr-name-test')
+        self.assertEqual(created.qr_image.name, qr_asset_name(created.url))
+
+    def test_update_without_url_change_does_no_image_work(self):
+        self.client.force_login(self.user_a)
+        self.campaign_a.qr_image.name = ensure_qr_asset(self.campaign_a.url)
+        self.campaign_a.save()
+
+        with mock.patch('analytics.qr_generator._render_qr_png') as render, \
+                mock.patch.object(default_storage, 'save') as storage_save:
+            res = self.client.post(
+                reverse('analytics:campaign_update', args=[self.campaign_a.pk]),
+                data={
+                    'community': self.community_a.pk,
+                    'name': '名前だけ変更',
+                    'utm_source': 'flyer',
+                    'utm_medium': 'qr',
+                    'utm_campaign': 'campaign-a',
+                    'landing_path': '/',
+                },
+            )
+
+        self.assertEqual(res.status_code, 302)
+        render.assert_not_called()
+        storage_save.assert_not_called()
+
+    def test_update_with_url_change_switches_qr(self):
+        self.client.force_login(self.user_a)
+        self.client.post(
+            reverse('analytics:campaign_update', args=[self.campaign_a.pk]),
+            data={
+                'community': self.community_a.pk,
+                'name': 'A の チラシ',
+                'utm_source': 'poster',
+                'utm_medium': 'qr',
+                'utm_campaign': 'campaign-a',
+                'landing_path': '/',
+            },
+        )
+
+        self.campaign_a.refresh_from_db()
+        self.assertEqual(self.campaign_a.qr_image.name, qr_asset_name(self.campaign_a.url))
+        self.assertTrue(default_storage.exists(self.campaign_a.qr_image.name))
+
     def test_landing_path_rejects_absolute_url(self):
         """landing_path に外部URLを入れたら保存できない。"""
         self.client.force_login(self.user_a)
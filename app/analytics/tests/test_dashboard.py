@@ -7,7 +7,9 @@ import csv
 import io
 from datetime import date, timedelta
 
+from django.db import connection
 from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import timezone
 
@@ -16,7 +18,8 @@ from event.models import Event, EventDetail
 from user_account.models import CustomUser
 
 from analytics import services
-from analytics.models import PageAnalytics
+from analytics.dashboard_cache import get_cached_dashboard_data
+from analytics.models import PageAnalytics, PosterClick
 
 
 def _create_community(name='community-A'):
@@ -199,6 +202,11 @@ class DashboardPeriodTest(TestCase):
         self.assertEqual(response.context['days'], 30)
 
 
+def _csv_content(response) -> bytes:
+    """ストリーミングで返る CSV の本文を連結する。"""
+    return b''.join(response.streaming_content)
+
+
 class DashboardCsvExportTest(TestCase):
     """CSV エクスポート機能を検証。"""
 
@@ -229,7 +237,7 @@ class DashboardCsvExportTest(TestCase):
     def test_csv_includes_event_detail_row(self):
         response = self.client.get(reverse('analytics:dashboard'), {'format': 'csv'})
         # utf-8-sig でデコードすれば BOM が自動除去される（テスト側で BOM 取り扱いを気にしない）
-        content = response.content.decode('utf-8-sig')
+        content = _csv_content(response).decode('utf-8-sig')
         reader = csv.reader(io.StringIO(content))
         rows = list(reader)
         # 1行目: ヘッダー、以降データ
@@ -245,7 +253,7 @@ class DashboardCsvExportTest(TestCase):
         """Excel で文字化けしないよう UTF-8 BOM を必ず付ける（回帰防止）。"""
         response = self.client.get(reverse('analytics:dashboard'), {'format': 'csv'})
         self.assertTrue(
-            response.content.startswith(b'\xef\xbb\xbf'),
+            _csv_content(response).startswith(b'\xef\xbb\xbf'),
             'CSV response must start with UTF-8 BOM',
         )
 
@@ -262,7 +270,7 @@ class DashboardCsvExportTest(TestCase):
             reverse('analytics:dashboard'),
             {'format': 'csv', 'community': other.id},
         )
-        content = response.content.decode('utf-8-sig')
+        content = _csv_content(response).decode('utf-8-sig')
         # 他人 community の名前と記事タイトルは CSV に含まれない（IDOR防止）
         self.assertNotIn('OtherCommunity', content)
         self.assertNotIn('他人の記事X', content)
@@ -274,11 +282,63 @@ class DashboardCsvExportTest(TestCase):
         self.ed.save()
 
         response = self.client.get(reverse('analytics:dashboard'), {'format': 'csv'})
-        content = response.content.decode('utf-8-sig')
+        content = _csv_content(response).decode('utf-8-sig')
         # シングルクォート付きで埋め込まれる（Excel で数式評価されない）
         self.assertIn("'=HYPERLINK", content)
 
 
+    def test_csv_is_streamed(self):
+        response = self.client.get(reverse('analytics:dashboard'), {'format': 'csv'})
+
+        self.assertTrue(response.streaming)
+
+    def test_csv_query_count_does_not_grow_with_articles(self):
+        """記事数・流入元数が増えても CSV のクエリ数は変わらない。"""
+        url = reverse('analytics:dashboard')
+        yesterday = timezone.localdate() - timedelta(days=1)
+
+        def _count_queries():
+            with CaptureQueriesContext(connection) as ctx:
+                _csv_content(self.client.get(url, {'format': 'csv'}))
+            return len(ctx.captured_queries)
+
+        baseline = _count_queries()
+        for i in range(5):
+            ed = _create_event_detail(self.community, f'追加記事{i}', event_date=date(2026, 5, 2 + i))
+            for source in ('google / organic', 'x.com / referral'):
+                _make_analytics(self.community, page_path=f'/event/detail/{ed.id}/',
+                                content_type=PageAnalytics.ContentType.EVENT_DETAIL,
+                                object_id=ed.id, date_=yesterday, pv=i + 1, source=source)
+
+        self.assertEqual(_count_queries(), baseline)
+
+    def test_csv_rows_match_breakdown_without_limit(self):
+        """ダッシュボードの記事別一覧と同じ値を、件数上限なしで PV 降順に出す。"""
+        yesterday = timezone.localdate() - timedelta(days=1)
+        for i in range(3):
+            ed = _create_event_detail(self.community, f'追加記事{i}', event_date=date(2026, 5, 2 + i))
+            _make_analytics(self.community, page_path=f'/event/detail/{ed.id}/',
+                            content_type=PageAnalytics.ContentType.EVENT_DETAIL,
+                            object_id=ed.id, date_=yesterday, pv=10 + i, source='x.com / referral')
+            _make_analytics(self.community, page_path=f'/event/detail/{ed.id}/',
+                            content_type=PageAnalytics.ContentType.EVENT_DETAIL,
+                            object_id=ed.id, date_=yesterday, pv=1, source='google / organic')
+        # 記事が削除された集計行は出さない
+        _make_analytics(self.community, page_path='/event/detail/999999/',
+                        content_type=PageAnalytics.ContentType.EVENT_DETAIL,
+                        object_id=999999, date_=yesterday, pv=500)
+
+        exported = list(services.iter_event_detail_export([self.community.id], days=30))
+
+        self.assertEqual(exported, services.get_event_detail_breakdown([self.community.id], days=30))
+        self.assertEqual(len(exported), 4)
+        self.assertEqual(exported[1]['top_source'], 'x.com / referral')
+        self.assertEqual(
+            list(services.iter_event_detail_export([self.community.id], days=30, chunk_size=1)),
+            exported,
+        )
+
+
 class ServiceFunctionsTest(TestCase):
     """services.py の集計関数を直接検証。"""
 
@@ -328,3 +388,70 @@ class ServiceFunctionsTest(TestCase):
         self.assertEqual(result['labels'][:3], ['Day 0', 'Day 1', 'Day 2'])
         # 1記事しかないので datasets は1件以下
         self.assertLessEqual(len(result['datasets']), 1)
+
+
+class DashboardQueryCountTest(TestCase):
+    """ダッシュボード集計のクエリ本数とキャッシュを検証。"""
+
+    def setUp(self):
+        self.community = _create_community('F')
+        self.yesterday = timezone.localdate() - timedelta(days=1)
+        self._add_article(0)
+
+    def _add_article(self, i):
+        publish_date = self.yesterday - timedelta(days=i)
+        ed = _create_event_detail(self.community, f'記事{i}', event_date=publish_date)
+        for day, source in ((publish_date, 'google / organic'), (self.yesterday, 'x.com / referral')):
+            _make_analytics(self.community, page_path=f'/event/detail/{ed.id}/',
+                            content_type=PageAnalytics.ContentType.EVENT_DETAIL,
+                            object_id=ed.id, date_=day, pv=10 + i, source=source)
+        PosterClick.objects.create(
+            community=self.community, date=self.yesterday - timedelta(days=i), clicks=i + 1, users=1,
+        )
+        return ed
+
+    def _count_queries(self):
+        with CaptureQueriesContext(connection) as ctx:
+            services.get_dashboard_data([self.community.id], days=30, include_global=True)
+        return len(ctx.captured_queries)
+
+    def test_query_count_does_not_grow_with_articles(self):
+        baseline = self._count_queries()
+        for i in range(1, 8):
+            self._add_article(i)
+
+        self.assertEqual(self._count_queries(), baseline)
+
+    def test_post_publish_series_covers_each_article_window(self):
+        for i in range(1, 3):
+            self._add_article(i)
+
+        result = services.get_post_publish_series([self.community.id], days_after=3, top_n=5)
+
+        by_label = {dataset['label']: dataset['data'] for dataset in result['datasets']}
+        self.assertEqual(by_label['記事0'], [20, 0, 0, 0])
+        self.assertEqual(by_label['記事1'], [11, 11, 0, 0])
+        self.assertEqual(by_label['記事2'], [12, 0, 12, 0])
+
+    def test_cached_dashboard_data_is_reused_until_analytics_change(self):
+        first = get_cached_dashboard_data([self.community.id], days=30)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(get_cached_dashboard_data([self.community.id], days=30), first)
+
+        self._add_article(1)
+
+        refreshed = get_cached_dashboard_data([self.community.id], days=30)
+        self.assertEqual(refreshed['overall_stats']['pv'], first['overall_stats']['pv'] + 22)
+
+    def test_cache_is_keyed_by_community_set_and_days(self):
+        other = _create_community('G')
+
+        self.assertEqual(get_cached_dashboard_data([self.community.id], days=30)['overall_stats']['pv'], 20)
+        self.assertEqual(get_cached_dashboard_data([other.id], days=30)['overall_stats']['pv'], 0)
+        self.assertEqual(get_cached_dashboard_data([self.community.id], days=7)['overall_stats']['pv'], 20)
+        self.assertNotIn('global_traffic', get_cached_dashboard_data([self.community.id], days=30))
+        self.assertIn(
+            'global_traffic',
+            get_cached_dashboard_data([self.community.id], days=30, include_global=True),
+        )
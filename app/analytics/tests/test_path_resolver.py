@@ -1,12 +1,14 @@
 from datetime import date
 
 from django.test import TestCase
+from django.urls import reverse
 
 from community.models import Community
 from event.models import Event, EventDetail
 
 from analytics.models import Campaign, PageAnalytics
-from analytics.path_resolver import resolve_page_path
+from analytics.path_resolver import resolve_page_path, resolve_page_paths
+from tests.factories import make_community, make_event, make_event_detail
 
 
 class ResolvePagePathTest(TestCase):
@@ -130,3 +132,50 @@ class ResolveByCampaignTest(TestCase):
         )
         # 2件マッチするのでどの community に紐付けるか曖昧 → None で GLOBAL 扱い
         self.assertIsNone(resolve_page_path('/', 'shared-key'))
+
+
+class ResolvePagePathsBatchTest(TestCase):
+    """resolve_page_paths が1件ずつの解決と同じ結果を、モデルごと1クエリで返すことを確認する。"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.community = make_community(name='一括集会')
+        cls.details = [
+            make_event_detail(make_event(cls.community, event_date=date(2026, 5, day)))
+            for day in (1, 2, 3)
+        ]
+        cls.campaign = Campaign.objects.create(
+            community=cls.community, name='一括チラシ',
+            utm_source='flyer', utm_medium='qr',
+            utm_campaign='batch-key', landing_path='/',
+        )
+
+    def _entries(self):
+        return [
+            (f'/community/{self.community.pk}/', '(not set)'),
+            ('/community/999999/', '(not set)'),
+            *[(f'/event/detail/{d.pk}/', '(not set)') for d in self.details],
+            ('/event/detail/999999/', '(not set)'),
+            (f'/event/detail/{self.details[0].pk}/?ref=x', '(not set)'),
+            ('/', 'batch-key'),
+            ('/', '(not set)'),
+            ('', 'batch-key'),
+        ]
+
+    def test_matches_single_path_resolution(self):
+        entries = self._entries()
+
+        results = resolve_page_paths(entries)
+
+        self.assertEqual(results, {entry: resolve_page_path(*entry) for entry in entries})
+
+    def test_one_query_per_target_model(self):
+        with self.assertNumQueries(3):
+            resolve_page_paths(self._entries())
+
+    def test_routes_follow_urlconf(self):
+        """分類表は URLconf の正準パスから作る。"""
+        result = resolve_page_path(reverse('event:detail', kwargs={'pk': self.details[1].pk}))
+
+        self.assertEqual(result['content_type'], PageAnalytics.ContentType.EVENT_DETAIL)
+        self.assertEqual(result['community'], self.community)
@@ -1,18 +1,89 @@
 """QR コード PNG 生成ヘルパーのテスト。"""
-from django.test import TestCase
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
 
-from analytics.qr_generator import generate_qr_png
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
 
+from analytics.models import Campaign
+from analytics.qr_generator import ensure_qr_asset, qr_asset_name
+from tests.factories import make_community
 
-class GenerateQrPngTest(TestCase):
-    def test_returns_png_content_file(self):
-        cf = generate_qr_png('https://vrc-ta-hub.example/?utm_campaign=test')
-        # PNG マジックバイト
-        self.assertTrue(cf.read(8).startswith(b'\x89PNG\r\n\x1a\n'))
-        # ファイル名は <uuid>.png 形式
-        self.assertTrue(cf.name.endswith('.png'))
 
-    def test_unique_filename_per_call(self):
-        a = generate_qr_png('https://example.com/a')
-        b = generate_qr_png('https://example.com/b')
-        self.assertNotEqual(a.name, b.name)
+class QrAssetNameTest(TestCase):
+    def test_unique_name_per_url(self):
+        self.assertNotEqual(qr_asset_name('https://example.com/a'), qr_asset_name('https://example.com/b'))
+
+    def test_name_depends_on_url_and_rendering_options(self):
+        url = 'https://example.com/?utm_campaign=a'
+
+        self.assertEqual(qr_asset_name(url), qr_asset_name(url))
+        self.assertNotEqual(qr_asset_name(url), qr_asset_name(url, box_size=8))
+        self.assertNotEqual(qr_asset_name(url), qr_asset_name(url, border=5))
+        self.assertRegex(qr_asset_name(url), r'^qr_codes/[0-9a-f]{64}\.png$')
+
+
+class EnsureQrAssetTest(TestCase):
+    def setUp(self):
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        override = override_settings(MEDIA_ROOT=media_root.name)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def test_saves_once_and_reuses_existing_asset(self):
+        url = 'https://example.com/?utm_campaign=reuse'
+
+        name = ensure_qr_asset(url)
+        with mock.patch('analytics.qr_generator._render_qr_png') as render, \
+                mock.patch.object(default_storage, 'save') as storage_save:
+            again = ensure_qr_asset(url)
+
+        self.assertEqual(name, qr_asset_name(url))
+        self.assertEqual(again, name)
+        render.assert_not_called()
+        storage_save.assert_not_called()
+
+    def test_cleanup_command_deletes_only_old_unreferenced_assets(self):
+        community = make_community(name='QR集会')
+        referenced = Campaign.objects.create(
+            community=community, name='参照あり', utm_source='flyer', utm_campaign='kept',
+        )
+        referenced.qr_image.name = ensure_qr_asset(referenced.url)
+        referenced.save()
+        orphan = ensure_qr_asset('https://example.com/?utm_campaign=orphan')
+        recent = ensure_qr_asset('https://example.com/?utm_campaign=recent')
+        old = timezone.now() - timedelta(days=2)
+
+        def modified_time(name):
+            return timezone.now() if name == recent else old
+
+        with mock.patch.object(default_storage, 'get_modified_time', side_effect=modified_time):
+            call_command('cleanup_qr_codes', stdout=StringIO())
+            self.assertTrue(default_storage.exists(orphan))
+
+            out = StringIO()
+            call_command('cleanup_qr_codes', '--apply', stdout=out)
+
+        self.assertFalse(default_storage.exists(orphan))
+        self.assertTrue(default_storage.exists(recent))
+        self.assertTrue(default_storage.exists(referenced.qr_image.name))
+        self.assertIn('orphaned=1 too_recent=1', out.getvalue())
+
+    def test_cleanup_command_handles_missing_directory(self):
+        out = StringIO()
+
+        call_command('cleanup_qr_codes', '--apply', stdout=out)
+
+        self.assertIn('total=0', out.getvalue())
+
+    def test_saves_png(self):
+        name = ensure_qr_asset('https://vrc-ta-hub.example/?utm_campaign=test')
+
+        with default_storage.open(name, 'rb') as f:
+            # PNG マジックバイト
+            self.assertEqual(f.read(8), b'\x89PNG\r\n\x1a\n')
@@ -0,0 +1,206 @@
+"""アクセス解析データの保持期間管理（analytics.retention）と compact / prune コマンドのテスト。"""
+from datetime import date, timedelta
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from analytics import services
+from analytics.models import AnalyticsPeriod, PageAnalytics, PosterClick
+from analytics.retention import (
+    MIN_COMPACT_AFTER_DAYS,
+    compact_analytics,
+    compaction_cutoff,
+    delete_in_pk_ranges,
+    retention_cutoff,
+)
+from tests.factories import make_community, make_event, make_event_detail
+
+
+def _month_days(month: date) -> list[date]:
+    days = []
+    day = month
+    while day.month == month.month:
+        days.append(day)
+        day += timedelta(days=1)
+    return days
+
+
+def _next_month(month: date) -> date:
+    return (month + timedelta(days=32)).replace(day=1)
+
+
+class CompactionTest(TestCase):
+    """日次行を月次ロールアップに圧縮しても、ダッシュボードの合計が変わらないことを検証。"""
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.community = make_community(name='保持期間集会')
+        # 90日ダッシュボードの表示期間に丸ごと収まる最初の月を圧縮対象にする
+        since, _until = services._date_range(90)
+        self.month = _next_month(since.replace(day=1))
+        event = make_event(self.community, event_date=self.month + timedelta(days=2))
+        self.detail = make_event_detail(event, status='approved', theme='圧縮される記事')
+        for day in _month_days(self.month):
+            self._add_page(f'/community/{self.community.pk}/', PageAnalytics.ContentType.COMMUNITY,
+                           self.community.pk, day, 'google / organic', pv=day.day)
+            self._add_page(f'/community/{self.community.pk}/', PageAnalytics.ContentType.COMMUNITY,
+                           self.community.pk, day, 'flyer / qr', pv=2, campaign='spring-flyer')
+            self._add_page(f'/event/detail/{self.detail.pk}/', PageAnalytics.ContentType.EVENT_DETAIL,
+                           self.detail.pk, day, 'x.com / referral', pv=3)
+            PosterClick.objects.create(community=self.community, date=day, clicks=day.day % 3 + 1, users=1)
+        self.yesterday = timezone.localdate() - timedelta(days=1)
+        self._add_page(f'/community/{self.community.pk}/', PageAnalytics.ContentType.COMMUNITY,
+                       self.community.pk, self.yesterday, 'google / organic', pv=7)
+
+    def _add_page(self, path, content_type, object_id, day, source, *, pv, campaign='(not set)'):
+        PageAnalytics.objects.create(
+            page_path=path, date=day, content_type=content_type, community=self.community,
+            object_id=object_id, pv=pv, users=1, sessions=2, source_medium=source, campaign=campaign,
+        )
+
+    def _dashboard(self):
+        return services.get_dashboard_data([self.community.id], days=90)
+
+    def test_dashboard_totals_unchanged_after_compaction(self):
+        before = self._dashboard()
+
+        compact_analytics(_next_month(self.month))
+
+        after = self._dashboard()
+        for key in ('overall_stats', 'source_breakdown', 'event_detail_breakdown', 'campaign_breakdown'):
+            self.assertEqual(after[key], before[key], key)
+        self.assertEqual(after['poster_clicks']['total'], before['poster_clicks']['total'])
+        self.assertEqual(after['poster_clicks']['per_community'], before['poster_clicks']['per_community'])
+        for metric in ('pv', 'users', 'sessions'):
+            self.assertEqual(
+                sum(row[metric] for row in after['daily_series']),
+                sum(row[metric] for row in before['daily_series']),
+            )
+
+    def test_daily_rows_are_replaced_with_monthly_rollups(self):
+        days_in_month = len(_month_days(self.month))
+
+        results = compact_analytics(_next_month(self.month))
+
+        self.assertEqual(results['page_analytics'].months, 1)
+        self.assertEqual(results['page_analytics'].deleted, days_in_month * 3)
+        self.assertEqual(results['page_analytics'].created, 3)
+        self.assertEqual(results['poster_click'].created, 1)
+        rollups = PageAnalytics.objects.filter(period=AnalyticsPeriod.MONTH)
+        self.assertEqual(set(rollups.values_list('date', flat=True)), {self.month})
+        organic = rollups.get(source_medium='google / organic')
+        self.assertEqual(organic.pv, sum(range(1, days_in_month + 1)))
+        self.assertEqual(organic.community_id, self.community.pk)
+        # 圧縮期限より新しい日次行は残る
+        self.assertTrue(
+            PageAnalytics.objects.filter(date=self.yesterday, period=AnalyticsPeriod.DAY).exists()
+        )
+
+    def test_compaction_is_idempotent_and_merges_late_daily_rows(self):
+        compact_analytics(_next_month(self.month))
+        # 圧縮後に遅れて取り込まれた日次行も、次回の圧縮で同じロールアップに合算される
+        self._add_page(f'/event/detail/{self.detail.pk}/', PageAnalytics.ContentType.EVENT_DETAIL,
+                       self.detail.pk, self.month + timedelta(days=5), 'x.com / referral', pv=100)
+
+        results = compact_analytics(_next_month(self.month))
+
+        self.assertEqual(results['page_analytics'].months, 1)
+        rollup = PageAnalytics.objects.get(
+            period=AnalyticsPeriod.MONTH, content_type=PageAnalytics.ContentType.EVENT_DETAIL,
+        )
+        self.assertEqual(rollup.pv, 3 * len(_month_days(self.month)) + 100)
+        self.assertEqual(PageAnalytics.objects.filter(period=AnalyticsPeriod.MONTH).count(), 3)
+
+        self.assertEqual(compact_analytics(_next_month(self.month))['page_analytics'].months, 0)
+
+    def test_post_publish_series_ignores_rollups(self):
+        compact_analytics(_next_month(self.month))
+
+        result = services.get_post_publish_series([self.community.id], days_after=3, top_n=5)
+
+        # 月次ロールアップは日ごとの推移を持たないので、公開日の PV として数えない
+        self.assertEqual(result['datasets'], [])
+
+
+class DeleteInPkRangesTest(TestCase):
+    def setUp(self):
+        self.community = make_community(name='削除集会')
+        self.old = date(2024, 1, 1)
+        for i in range(5):
+            PosterClick.objects.create(community=self.community, date=self.old + timedelta(days=i), clicks=1)
+        PosterClick.objects.create(community=self.community, date=date(2026, 1, 1), clicks=1)
+
+    def test_deletes_matching_rows_in_pk_range_chunks(self):
+        queryset = PosterClick.objects.filter(date__lt=date(2025, 1, 1))
+
+        with CaptureQueriesContext(connection) as ctx:
+            deleted = delete_in_pk_ranges(queryset, chunk_size=2)
+
+        self.assertEqual(deleted, 5)
+        deletes = [q['sql'] for q in ctx.captured_queries if q['sql'].startswith('DELETE')]
+        self.assertEqual(len(deletes), 3)
+        self.assertEqual(list(PosterClick.objects.values_list('date', flat=True)), [date(2026, 1, 1)])
+
+
+class RetentionCutoffTest(TestCase):
+    def test_compaction_cutoff_is_start_of_month_past_horizon(self):
+        self.assertEqual(compaction_cutoff(400, today=date(2026, 10, 19)), date(2025, 9, 1))
+
+    def test_horizon_must_cover_dashboard_comparison_window(self):
+        with self.assertRaises(ValueError):
+            compaction_cutoff(MIN_COMPACT_AFTER_DAYS - 1)
+
+    def test_retention_disabled_by_zero(self):
+        self.assertIsNone(retention_cutoff(0))
+
+
+class RetentionCommandTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.community = make_community(name='コマンド集会')
+        self.today = timezone.localdate()
+        self.old_day = (self.today - timedelta(days=800)).replace(day=10)
+        self.recent_day = self.today - timedelta(days=1)
+        for day in (self.old_day, self.old_day + timedelta(days=1), self.recent_day):
+            PosterClick.objects.create(community=self.community, date=day, clicks=2, users=1)
+
+    def _call(self, name, *args):
+        out = StringIO()
+        call_command(name, *args, stdout=out)
+        return out.getvalue()
+
+    def test_compact_dry_run_does_not_change_rows(self):
+        output = self._call('compact_analytics', '--days', '400')
+
+        self.assertIn('poster_click: months=1 daily_rows=2', output)
+        self.assertEqual(PosterClick.objects.filter(period=AnalyticsPeriod.DAY).count(), 3)
+
+    def test_compact_apply(self):
+        self._call('compact_analytics', '--days', '400', '--apply')
+
+        rollup = PosterClick.objects.get(period=AnalyticsPeriod.MONTH)
+        self.assertEqual((rollup.date, rollup.clicks), (self.old_day.replace(day=1), 4))
+        self.assertEqual(PosterClick.objects.count(), 2)
+
+    def test_compact_rejects_short_horizon(self):
+        with self.assertRaises(CommandError):
+            self._call('compact_analytics', '--days', '30', '--apply')
+
+    def test_prune_is_disabled_without_retention(self):
+        output = self._call('prune_analytics', '--days', '0', '--apply')
+
+        self.assertIn('削除しません', output)
+        self.assertEqual(PosterClick.objects.count(), 3)
+
+    def test_prune_apply_deletes_only_expired_months(self):
+        self._call('prune_analytics', '--days', '700', '--batch-size', '1', '--apply')
+
+        self.assertEqual(list(PosterClick.objects.values_list('date', flat=True)), [self.recent_day])
@@ -8,16 +8,12 @@ import secrets
 from datetime import date, datetime, timedelta
 
 from django.conf import settings
-from django.db import transaction
 from django.http import HttpResponse
 from django.utils import timezone
 from django.views.decorators.http import require_GET
 
-from community.models import Community
-
 from .ga4_client import fetch_page_report, fetch_poster_click_report
-from .models import PageAnalytics, PosterClick
-from .path_resolver import resolve_page_path
+from .ingestion import save_page_rows, save_poster_click_rows
 
 logger = logging.getLogger('analytics')
 
@@ -60,52 +56,10 @@ def sync_analytics(request):
         logger.error('GA4 fetch failed for date=%s', target_date, exc_info=True)
         return HttpResponse('Failed to fetch GA4 report. Check server logs.', status=500)
 
-    saved = 0
-    saved_global = 0
-    # 途中失敗時の部分更新を残さないため、保存はまとめて1トランザクションにする
-    with transaction.atomic():
-        for row in rows:
-            # pagePath 解決に失敗した時は utm_campaign 経由で Campaign を逆引きする。
-            # landing_path=/ のチラシ QR でも主催者のキャンペーン集計に乗るようにするため
-            resolved = resolve_page_path(row['page_path'], row['campaign'])
-            if resolved is None:
-                # community/event_detail に紐付かない URL は GLOBAL レコードとして保存
-                # （superuser のみがサイト全体トラフィックとして閲覧できる）
-                PageAnalytics.objects.update_or_create(
-                    page_path=row['page_path'],
-                    date=row['date'],
-                    source_medium=row['source_medium'],
-                    campaign=row['campaign'],
-                    defaults={
-                        'pv': row['pv'],
-                        'users': row['users'],
-                        'sessions': row['sessions'],
-                        'content_type': PageAnalytics.ContentType.GLOBAL,
-                        'community': None,
-                        'object_id': 0,
-                    },
-                )
-                saved_global += 1
-                continue
-            PageAnalytics.objects.update_or_create(
-                page_path=row['page_path'],
-                date=row['date'],
-                source_medium=row['source_medium'],
-                campaign=row['campaign'],
-                defaults={
-                    'pv': row['pv'],
-                    'users': row['users'],
-                    'sessions': row['sessions'],
-                    'content_type': resolved['content_type'],
-                    'community': resolved['community'],
-                    'object_id': resolved['object_id'],
-                },
-            )
-            saved += 1
+    saved, saved_global = save_page_rows(rows)
 
     # ポスター画像クリック（GA4 カスタムイベント poster_click）の取得・保存。
     # page_view とは別 API 呼び出しのため、失敗しても全体を 500 にせず警告ログのみ。
-    saved_poster = 0
     try:
         poster_rows = fetch_poster_click_report(settings.GA4_PROPERTY_ID, target_date)
     except Exception:
@@ -116,23 +70,7 @@ def sync_analytics(request):
         )
         poster_rows = []
 
-    if poster_rows:
-        community_ids = {row['community_id'] for row in poster_rows}
-        existing = {
-            c.pk: c for c in Community.objects.filter(pk__in=community_ids)
-        }
-        with transaction.atomic():
-            for row in poster_rows:
-                community = existing.get(row['community_id'])
-                if community is None:
-                    # 削除済み community への poster_click は無視（DB に保持しない）
-                    continue
-                PosterClick.objects.update_or_create(
-                    community=community,
-                    date=target_date,
-                    defaults={'clicks': row['clicks'], 'users': row['users']},
-                )
-                saved_poster += 1
+    saved_poster = save_poster_click_rows(poster_rows, target_date)
 
     logger.info(
         'sync_analytics done: date=%s fetched=%d saved=%d saved_global=%d saved_poster=%d',
@@ -1,9 +1,9 @@
 import logging
 
-from django.utils import timezone
 from rest_framework import authentication
 from rest_framework import exceptions
 
+from api_v1.key_cache import api_key_cache
 from user_account.models import APIKey
 
 logger = logging.getLogger(__name__)
@@ -34,15 +34,19 @@ class APIKeyAuthentication(authentication.BaseAuthentication):
             return None
 
         api_key_hash = APIKey.hash_raw_key(raw_api_key)
-            
-        try:
-            # APIキーを検証
-            key_obj = APIKey.objects.select_related('user').get(
-                key=api_key_hash,
-                is_active=True
-            )
-        except APIKey.DoesNotExist:
-            raise self._fail('unknown_api_key')
+
+        # 直近に認証したキーはプロセス内キャッシュから取る（失効はシグナルと短いTTLで反映）
+        key_obj = api_key_cache.get(api_key_hash)
+        if key_obj is None:
+            try:
+                # APIキーを検証
+                key_obj = APIKey.objects.select_related('user').get(
+                    key=api_key_hash,
+                    is_active=True
+                )
+            except APIKey.DoesNotExist:
+                raise self._fail('unknown_api_key')
+            api_key_cache.set(api_key_hash, key_obj)
 
         # 有効期限切れ・IPホワイトリスト不一致・無効ユーザーはすべて
         # 「無効なAPIキーです。」+ code=invalid_api_key に統一する（情報漏洩防止）
@@ -51,9 +55,9 @@ class APIKeyAuthentication(authentication.BaseAuthentication):
         if not key_obj.user.is_active:
             raise self._fail('inactive_user')
 
-        # すべての検証通過後に last_used を更新（失敗キーの観測を残さない）
-        key_obj.last_used = timezone.now()
-        key_obj.save(update_fields=['last_used'])
+        # すべての検証通過後に last_used を更新（失敗キーの観測を残さない）。
+        # 書き込みはキーごとに一定間隔へ間引く
+        api_key_cache.touch_last_used(key_obj)
 
         return (key_obj.user, key_obj)
     
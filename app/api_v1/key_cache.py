@@ -0,0 +1,121 @@
+"""APIキー認証のプロセス内キャッシュと last_used 更新の間引き.
+
+APIKeyAuthentication は毎リクエスト APIKey を（user 込みで）読み、last_used を保存していたため、
+読み取りだけの API 呼び出しでも同じキー行への UPDATE が発生していた。
+
+- 認証に成功したキーは、ハッシュをキーにしてプロセス内に API_KEY_AUTH_CACHE_SECONDS 秒だけ保持する。
+  有効期限・IP の判定はキャッシュ済みの値で毎回行う。
+- APIKey / ユーザーの保存・削除でこのプロセスのエントリは即座に消える（api_v1.signals）。
+  他のプロセスでも API_KEY_AUTH_CACHE_SECONDS 秒以内に失効が反映される。
+- last_used はキーごとに API_KEY_LAST_USED_INTERVAL_SECONDS 秒に1回だけ書く。書き込みは
+  「前回値が間隔より古い場合だけ」の条件付き UPDATE なので、複数プロセスからでも間隔内に1回になる。
+"""
+from __future__ import annotations
+
+import copy
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+from typing import Optional
+
+from django.conf import settings
+from django.db import DatabaseError
+from django.db.models import Q
+from django.utils import timezone
+
+from user_account.models import APIKey
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_AUTH_CACHE_SECONDS = 30
+DEFAULT_LAST_USED_INTERVAL_SECONDS = 300
+# 保持するキー数の上限（古いものから捨てる）
+MAX_CACHED_KEYS = 1024
+
+
+def auth_cache_seconds() -> float:
+    return getattr(settings, 'API_KEY_AUTH_CACHE_SECONDS', DEFAULT_AUTH_CACHE_SECONDS)
+
+
+def last_used_interval_seconds() -> float:
+    return getattr(settings, 'API_KEY_LAST_USED_INTERVAL_SECONDS', DEFAULT_LAST_USED_INTERVAL_SECONDS)
+
+
+class APIKeyCache:
+    """キーのハッシュ -> 認証済み APIKey（user 込み）の短期キャッシュ."""
+
+    def __init__(self, max_entries: int = MAX_CACHED_KEYS):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, tuple[float, APIKey]] = OrderedDict()
+        self._last_used_written: dict[str, float] = {}
+
+    def get(self, key_hash: str) -> Optional[APIKey]:
+        """有効なエントリがあればリクエスト用の複製を返す."""
+        with self._lock:
+            entry = self._entries.get(key_hash)
+            if entry is None:
+                return None
+            expires_at, key_obj = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key_hash]
+                return None
+        return _copy_with_user(key_obj)
+
+    def set(self, key_hash: str, key_obj: APIKey) -> None:
+        with self._lock:
+            self._entries[key_hash] = (time.monotonic() + auth_cache_seconds(), _copy_with_user(key_obj))
+            self._entries.move_to_end(key_hash)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def evict_key(self, key_hash: str) -> None:
+        with self._lock:
+            self._entries.pop(key_hash, None)
+
+    def evict_user(self, user_id: int) -> None:
+        with self._lock:
+            for key_hash in [h for h, (_, key_obj) in self._entries.items() if key_obj.user_id == user_id]:
+                del self._entries[key_hash]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._last_used_written.clear()
+
+    def touch_last_used(self, key_obj: APIKey) -> bool:
+        """間隔が空いていれば last_used を更新する。書き込んだら True."""
+        interval = last_used_interval_seconds()
+        now_monotonic = time.monotonic()
+        with self._lock:
+            written_at = self._last_used_written.get(key_obj.key)
+            if written_at is not None and now_monotonic - written_at < interval:
+                return False
+            self._last_used_written[key_obj.key] = now_monotonic
+            if len(self._last_used_written) > self.max_entries:
+                self._last_used_written.pop(next(iter(self._last_used_written)))
+
+        now = timezone.now()
+        try:
+            APIKey.objects.filter(pk=key_obj.pk).filter(
+                Q(last_used__isnull=True) | Q(last_used__lt=now - timedelta(seconds=interval))
+            ).update(last_used=now)
+        except DatabaseError:
+            # 最終使用日時は参考情報なので、書けなくても認証は通す
+            logger.warning("Failed to update API key last_used: api_key_id=%s", key_obj.pk, exc_info=True)
+            return False
+        key_obj.last_used = now
+        return True
+
+
+def _copy_with_user(key_obj: APIKey) -> APIKey:
+    # リクエストごとに別インスタンスを渡し、ビュー側の変更がキャッシュへ波及しないようにする
+    user = copy.copy(key_obj.user)
+    key_copy = copy.copy(key_obj)
+    key_copy.user = user
+    return key_copy
+
+
+api_key_cache = APIKeyCache()
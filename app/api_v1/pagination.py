@@ -0,0 +1,155 @@
+"""公開 API のカーソルページネーション（キーセット方式）.
+
+一覧 API はこれまで全件を1回で返していた。カタログ全体を同期する連携先向けに、
+並び順の列の値（例: date, start_time, id）をカーソルにして「前ページ最後の行より後ろ」を
+WHERE 条件で取る。OFFSET を使わないので深いページでも走査量が増えず、ページの途中で行が
+追加・削除されても重複や取りこぼしが起きない。
+
+既存クライアント互換のため、`cursor` か `page_size` を指定したリクエストだけをページングし、
+指定がなければ従来どおり配列で全件を返す。
+"""
+from __future__ import annotations
+
+import base64
+import json
+from datetime import date, datetime, time
+from functools import reduce
+from operator import or_
+from typing import Any, Optional
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+CURSOR_PARAM = 'cursor'
+PAGE_SIZE_PARAM = 'page_size'
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+INVALID_CURSOR_MESSAGE = 'カーソルが不正です。'
+
+
+class KeysetCursorPagination(BasePagination):
+    """view.cursor_ordering の列でページングする（先頭が `-` の列は降順）."""
+
+    def paginate_queryset(self, queryset, request, view=None) -> Optional[list]:
+        if CURSOR_PARAM not in request.query_params and PAGE_SIZE_PARAM not in request.query_params:
+            return None
+
+        self.request = request
+        self.ordering = tuple(view.cursor_ordering)
+        self.page_size = self._get_page_size(request)
+        queryset = queryset.order_by(*self.ordering)
+
+        raw_cursor = request.query_params.get(CURSOR_PARAM)
+        if raw_cursor:
+            try:
+                queryset = queryset.filter(self._after(self._decode(raw_cursor)))
+            except (DjangoValidationError, ValueError, TypeError):
+                # 日付・時刻・ID として読めない値に書き換えられたカーソル
+                raise NotFound(INVALID_CURSOR_MESSAGE)
+
+        rows = list(queryset[:self.page_size + 1])
+        self.has_next = len(rows) > self.page_size
+        self.page = rows[:self.page_size]
+        return self.page
+
+    def get_paginated_response(self, data) -> Response:
+        return Response({'next': self.get_next_link(), 'results': data})
+
+    def get_next_link(self) -> Optional[str]:
+        if not self.has_next:
+            return None
+        last = self.page[-1]
+        cursor = self._encode([_resolve(last, field.lstrip('-')) for field in self.ordering])
+        return replace_query_param(self.request.build_absolute_uri(), CURSOR_PARAM, cursor)
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'oneOf': [
+                schema,
+                {
+                    'type': 'object',
+                    'required': ['next', 'results'],
+                    'properties': {
+                        'next': {
+                            'type': 'string',
+                            'nullable': True,
+                            'format': 'uri',
+                            'description': '次のページのURL。最後のページなら null。',
+                        },
+                        'results': schema,
+                    },
+                },
+            ],
+            'description': f'`{CURSOR_PARAM}` か `{PAGE_SIZE_PARAM}` を指定した場合はページ単位のオブジェクト、指定しなければ全件の配列。',
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                'name': CURSOR_PARAM,
+                'required': False,
+                'in': 'query',
+                'description': '前のレスポンスの `next` に含まれるカーソル。',
+                'schema': {'type': 'string'},
+            },
+            {
+                'name': PAGE_SIZE_PARAM,
+                'required': False,
+                'in': 'query',
+                'description': f'1ページの件数（既定 {DEFAULT_PAGE_SIZE}、最大 {MAX_PAGE_SIZE}）。指定するとページングします。',
+                'schema': {'type': 'integer', 'minimum': 1, 'maximum': MAX_PAGE_SIZE},
+            },
+        ]
+
+    def _get_page_size(self, request) -> int:
+        try:
+            page_size = int(request.query_params.get(PAGE_SIZE_PARAM, DEFAULT_PAGE_SIZE))
+        except ValueError:
+            return DEFAULT_PAGE_SIZE
+        return min(max(page_size, 1), MAX_PAGE_SIZE)
+
+    def _after(self, values: list) -> Q:
+        """並び順で values より後ろの行の条件（辞書式順序）."""
+        if len(values) != len(self.ordering):
+            raise NotFound(INVALID_CURSOR_MESSAGE)
+        conditions = []
+        for index, field in enumerate(self.ordering):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            equal_before = {
+                previous.lstrip('-'): value for previous, value in zip(self.ordering[:index], values)
+            }
+            conditions.append(Q(**equal_before, **{f'{name}__{lookup}': values[index]}))
+        return reduce(or_, conditions)
+
+    @staticmethod
+    def _encode(values: list) -> str:
+        payload = json.dumps([_encode_value(value) for value in values], separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+    @staticmethod
+    def _decode(raw: str) -> list:
+        try:
+            padded = raw + '=' * (-len(raw) % 4)
+            values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        except (ValueError, TypeError):
+            raise NotFound(INVALID_CURSOR_MESSAGE)
+        if not isinstance(values, list) or not all(isinstance(v, (str, int, float)) for v in values):
+            raise NotFound(INVALID_CURSOR_MESSAGE)
+        return values
+
+
+def _resolve(obj, path: str) -> Any:
+    for attribute in path.split('__'):
+        obj = getattr(obj, attribute)
+    return obj
+
+
+def _encode_value(value):
+    if isinstance(value, (date, datetime, time)):
+        return value.isoformat()
+    return value
@@ -7,6 +7,9 @@ from rest_framework import serializers
 from community.constants import WEEKDAY_JP, WEEKDAY_ORDER as WEEKDAY_SORT_ORDER
 from community.models import Community
 from event.models import Event, EventDetail, RecurrenceRule
+from event.services.source_material import schedule_source_material_preparation
+
+from .sparse_fields import SparseFieldsetSerializerMixin
 
 
 def _extract_group_id(group_url):
@@ -29,7 +32,7 @@ def _extract_group_id(group_url):
     return None
 
 
-class CommunitySerializer(serializers.ModelSerializer):
+class CommunitySerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     poster_image = serializers.SerializerMethodField()
     group_id = serializers.SerializerMethodField()
     start_time = serializers.TimeField(format='%H:%M')
@@ -42,6 +45,11 @@ class CommunitySerializer(serializers.ModelSerializer):
             'discord', 'twitter_hashtag', 'poster_image', 'description',
             'platform', 'tags', 'allow_poster_repost'
         ]
+        # fields= で絞ったときに SerializerMethodField が読む列
+        sparse_field_sources = {
+            'poster_image': ('poster_image',),
+            'group_id': ('group_url',),
+        }
 
     def get_poster_image(self, obj):
         if obj.poster_image:
@@ -165,7 +173,7 @@ class GatheringListSerializer(GatheringListSchemaSerializer):
         return request.build_absolute_uri(url)
 
 
-class EventSerializer(serializers.ModelSerializer):
+class EventSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     community = CommunitySerializer()  # ネストしてコミュニティ情報を含める
     start_time = serializers.TimeField(format='%H:%M')
 
@@ -174,7 +182,7 @@ class EventSerializer(serializers.ModelSerializer):
         fields = ['id', 'community', 'date', 'start_time', 'duration', 'weekday']
 
 
-class EventDetailSerializer(serializers.ModelSerializer):
+class EventDetailSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     event = EventSerializer()  # ネストしてイベント情報を含める
 
     class Meta:
@@ -213,6 +221,7 @@ class EventDetailWriteSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         generate_from_pdf = validated_data.pop('generate_from_pdf', False)
         instance = super().create(validated_data)
+        schedule_source_material_preparation(instance)
         
         # PDF自動生成が有効で、PDFファイルがある場合
         if generate_from_pdf and instance.slide_file:
@@ -224,6 +233,8 @@ class EventDetailWriteSerializer(serializers.ModelSerializer):
     def update(self, instance, validated_data):
         generate_from_pdf = validated_data.pop('generate_from_pdf', False)
         instance = super().update(instance, validated_data)
+        if {'slide_file', 'youtube_url'} & validated_data.keys():
+            schedule_source_material_preparation(instance)
         
         # PDF自動生成が有効で、PDFファイルがある場合
         if generate_from_pdf and instance.slide_file:
@@ -0,0 +1,19 @@
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from api_v1.key_cache import api_key_cache
+from user_account.models import APIKey
+
+
+@receiver(post_save, sender=APIKey)
+@receiver(post_delete, sender=APIKey)
+def evict_api_key_on_change(sender, instance, **kwargs):
+    # 失効・有効期限・IP制限の変更をこのプロセスでは次のリクエストから反映する
+    api_key_cache.evict_key(instance.key)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def evict_api_keys_on_user_change(sender, instance, **kwargs):
+    api_key_cache.evict_user(instance.pk)
@@ -0,0 +1,174 @@
+"""公開 API のフィールド選択（`fields=` / `omit=`）.
+
+一覧 API は contents などの長文や入れ子の集会情報を常に全項目返していたため、
+一部の項目だけ同期したい連携先も毎回すべてを受け取っていた。
+
+- `fields=id,theme,event.date` で返す項目を絞り、`omit=event.community` で項目を除く。
+  入れ子の項目は `.` でつなぐ。存在しない項目名は 400（validation_error）にする。
+- SparseFieldsetSerializerMixin を付けたシリアライザーが、リクエストのパラメータに従って項目を絞る。
+- SparseFieldsetFilter（フィルタバックエンド）が同じ選択からモデルの列を求め、`.only()` で
+  SELECT を絞り、使わない select_related の JOIN を外す。OpenAPI にもパラメータとして載る。
+"""
+from __future__ import annotations
+
+from typing import Optional
+
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+
+FIELDS_PARAM = 'fields'
+OMIT_PARAM = 'omit'
+
+# 項目名 -> 入れ子の選択。空 dict はその項目を丸ごと指す
+FieldTree = dict[str, 'FieldTree']
+
+
+def parse_field_tree(value: str) -> FieldTree:
+    """`id,event.date,event.community.name` を木構造にする."""
+    tree: FieldTree = {}
+    for raw in value.split(','):
+        path = [part for part in raw.strip().split('.') if part]
+        node = tree
+        for part in path:
+            node = node.setdefault(part, {})
+    return tree
+
+
+def requested_selection(request) -> tuple[Optional[FieldTree], FieldTree]:
+    """リクエストの (fields の木 または None, omit の木) を返す。読み取り以外では選択しない."""
+    if request is None or request.method not in ('GET', 'HEAD'):
+        return None, {}
+    fields = request.query_params.get(FIELDS_PARAM)
+    omit = request.query_params.get(OMIT_PARAM)
+    return (parse_field_tree(fields) if fields else None), (parse_field_tree(omit) if omit else {})
+
+
+def _subtree(tree: Optional[FieldTree], path: list[str]) -> Optional[FieldTree]:
+    """path の位置での選択。途中で「丸ごと」に当たったら None（制限なし）."""
+    node = tree
+    for part in path:
+        if not node:
+            return None
+        node = node.get(part)
+        if node is None:
+            return None
+    return node or None
+
+
+class SparseFieldsetSerializerMixin:
+    """リクエストの `fields=` / `omit=` に従って出力項目を絞る（入れ子のシリアライザーにも効く）."""
+
+    def get_fields(self):
+        fields = super().get_fields()
+        include, omit = requested_selection(self.context.get('request'))
+        if include is None and not omit:
+            return fields
+
+        path = self._selection_path()
+        include_here = _subtree(include, path) if include is not None else None
+        omit_here = _subtree(omit, path) or {}
+        # 入れ子の選択は子のシリアライザー側で絞る。ここで扱うのは葉（中身の指定がない項目）だけ
+        omitted = {name for name, children in omit_here.items() if not children}
+
+        unknown = (set(include_here or ()) | set(omit_here)) - set(fields)
+        if unknown:
+            raise ValidationError({
+                FIELDS_PARAM: [f"存在しない項目です: {', '.join(sorted(unknown))}"],
+            })
+
+        return {
+            name: field for name, field in fields.items()
+            if (include_here is None or name in include_here) and name not in omitted
+        }
+
+    def _selection_path(self) -> list[str]:
+        path = []
+        node = self
+        while node.parent is not None:
+            if node.field_name:
+                path.append(node.field_name)
+            node = node.parent
+        return list(reversed(path))
+
+
+def model_field_paths(serializer) -> Optional[tuple[set[str], set[str]]]:
+    """シリアライザーの現在の項目が読むモデルの列と JOIN する関連を返す.
+
+    (only() に渡すパス, select_related に渡す関連) の組。列を決められない項目
+    （Meta.sparse_field_sources に対応がない SerializerMethodField など）があれば None を返し、
+    呼び出し側は絞り込みを行わない。
+    """
+    sources = getattr(getattr(serializer, 'Meta', None), 'sparse_field_sources', {})
+    # 主キーは only() が常に読むので含めなくてよい
+    paths: set[str] = set()
+    relations: set[str] = set()
+    for name, field in serializer.fields.items():
+        if field.write_only:
+            continue
+        if isinstance(field, serializers.BaseSerializer):
+            if field.source in ('*', None) or '.' in field.source or getattr(field, 'many', False):
+                return None
+            nested = model_field_paths(field)
+            if nested is None:
+                return None
+            nested_paths, nested_relations = nested
+            relations.add(field.source)
+            relations.update(f'{field.source}__{relation}' for relation in nested_relations)
+            paths.update(f'{field.source}__{path}' for path in nested_paths)
+        elif name in sources:
+            paths.update(sources[name])
+        elif isinstance(field, serializers.SerializerMethodField) or field.source == '*' or '.' in field.source:
+            return None
+        else:
+            paths.add(field.source)
+    return paths, relations
+
+
+class SparseFieldsetFilter(BaseFilterBackend):
+    """`fields=` / `omit=` の選択に合わせて SELECT する列と JOIN を減らす."""
+
+    def filter_queryset(self, request, queryset, view):
+        include, omit = requested_selection(request)
+        if include is None and not omit:
+            return queryset
+
+        serializer = view.get_serializer()
+        if not isinstance(serializer, SparseFieldsetSerializerMixin):
+            return queryset
+        selection = model_field_paths(serializer)
+        if selection is None:
+            return queryset
+
+        paths, relations = selection
+        # 並び順（カーソル）の列も読んでおき、ページ境界の値を取るときに追加クエリを出さない
+        for field in getattr(view, 'cursor_ordering', ()):
+            path = field.lstrip('-')
+            paths.add(path)
+            if '__' in path:
+                relations.add(path.rsplit('__', 1)[0])
+        queryset = queryset.select_related(None)
+        if relations:
+            queryset = queryset.select_related(*sorted(relations))
+        return queryset.only(*sorted(paths))
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                'name': FIELDS_PARAM,
+                'required': False,
+                'in': 'query',
+                'description': (
+                    '返す項目をカンマ区切りで指定します。入れ子の項目は `.` でつなぎます'
+                    '（例: `id,theme,event.date`）。'
+                ),
+                'schema': {'type': 'string'},
+            },
+            {
+                'name': OMIT_PARAM,
+                'required': False,
+                'in': 'query',
+                'description': '除く項目をカンマ区切りで指定します（例: `event.community`）。',
+                'schema': {'type': 'string'},
+            },
+        ]
@@ -0,0 +1,97 @@
+"""APIキー認証のプロセス内キャッシュ（api_v1.key_cache）のテスト."""
+
+import time
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from api_v1.key_cache import api_key_cache
+from tests.factories import make_user
+from user_account.models import APIKey
+
+API_KEY_TABLE = APIKey._meta.db_table
+
+
+def _api_key_queries(queries):
+    return [query['sql'] for query in queries.captured_queries if API_KEY_TABLE in query['sql']]
+
+
+@override_settings(API_KEY_AUTH_CACHE_SECONDS=30, API_KEY_LAST_USED_INTERVAL_SECONDS=300)
+class APIKeyCacheTest(TestCase):
+    """キー検証のキャッシュ・失効の反映・last_used の間引き"""
+
+    def setUp(self):
+        api_key_cache.clear()
+        self.addCleanup(api_key_cache.clear)
+        self.user = make_user(user_name='api_cache_user', email='api_cache@example.com')
+        self.api_key, raw_key = APIKey.create_with_raw_key(user=self.user, name='cache test')
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {raw_key}')
+        self.url = reverse('event-detail-api-my-events')
+
+    def _get(self):
+        return self.client.get(self.url)
+
+    def test_repeated_requests_skip_key_lookup_and_last_used_write(self):
+        self.assertEqual(self._get().status_code, status.HTTP_200_OK)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self._get().status_code, status.HTTP_200_OK)
+
+        self.assertEqual(_api_key_queries(queries), [])
+
+    def test_last_used_is_written_once_per_interval(self):
+        self._get()
+        self.api_key.refresh_from_db()
+        first = self.api_key.last_used
+        self.assertIsNotNone(first)
+
+        self._get()
+        self.api_key.refresh_from_db()
+        self.assertEqual(self.api_key.last_used, first)
+
+        later = time.monotonic() + 301
+        with patch('api_v1.key_cache.time.monotonic', return_value=later), \
+                patch('api_v1.key_cache.timezone.now', return_value=first + timedelta(seconds=301)):
+            self._get()
+        self.api_key.refresh_from_db()
+        self.assertGreater(self.api_key.last_used, first)
+
+    def test_revocation_through_save_is_immediate(self):
+        self._get()
+
+        self.api_key.is_active = False
+        self.api_key.save()
+
+        self.assertEqual(self._get().status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_user_deactivation_is_immediate(self):
+        self._get()
+
+        self.user.is_active = False
+        self.user.save()
+
+        self.assertEqual(self._get().status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_revocation_elsewhere_takes_effect_within_cache_window(self):
+        """別プロセスでの失効（シグナルが届かない）も TTL 経過後には拒否される"""
+        self._get()
+        APIKey.objects.filter(pk=self.api_key.pk).update(is_active=False)
+
+        self.assertEqual(self._get().status_code, status.HTTP_200_OK)
+        with patch('api_v1.key_cache.time.monotonic', return_value=time.monotonic() + 31):
+            self.assertEqual(self._get().status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_cached_user_is_copied_per_request(self):
+        self._get()
+
+        first = api_key_cache.get(self.api_key.key)
+        first.user.user_name = 'changed in view'
+
+        self.assertEqual(api_key_cache.get(self.api_key.key).user.user_name, 'api_cache_user')
@@ -0,0 +1,153 @@
+"""公開 API のカーソルページネーションとフィールド選択のテスト."""
+
+import json
+from datetime import date, time, timedelta
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from tests.factories import make_community, make_event, make_event_detail
+
+
+class CursorPaginationTest(TestCase):
+    """(date, start_time, id) のキーセットでのページング"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.url = reverse('eventdetail-list')
+        community = make_community(name='ページング集会', tags=['tech'])
+        base = date.today() + timedelta(days=1)
+        self.details = []
+        for day in range(3):
+            event = make_event(community, event_date=base + timedelta(days=day))
+            for minute in (0, 0, 30):
+                self.details.append(make_event_detail(
+                    event, status='approved', theme=f'発表{day}-{minute}', start_time=time(22, minute),
+                ))
+        self.expected_ids = [
+            detail.id for detail in sorted(
+                self.details, key=lambda detail: (detail.event.date, detail.start_time, detail.id),
+            )
+        ]
+
+    def _collect(self, params):
+        ids, url, pages = [], self.url, 0
+        response = self.client.get(url, params)
+        while True:
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            pages += 1
+            ids.extend(item['id'] for item in response.data['results'])
+            if response.data['next'] is None:
+                return ids, pages
+            response = self.client.get(response.data['next'])
+
+    def test_walks_all_rows_in_order_without_duplicates(self):
+        ids, pages = self._collect({'page_size': 2})
+
+        self.assertEqual(ids, self.expected_ids)
+        self.assertEqual(pages, 5)
+
+    def test_rows_inserted_before_the_cursor_do_not_shift_pages(self):
+        first = self.client.get(self.url, {'page_size': 4})
+        make_event_detail(
+            self.details[0].event, status='approved', theme='途中で追加', start_time=time(21, 0),
+        )
+
+        second = self.client.get(first.data['next'])
+
+        ids = [item['id'] for item in first.data['results'] + second.data['results']]
+        self.assertEqual(ids, self.expected_ids[:8])
+
+    def test_without_page_params_returns_plain_list(self):
+        response = self.client.get(self.url)
+
+        self.assertIsInstance(response.data, list)
+        self.assertEqual(len(response.data), len(self.details))
+
+    def test_sparse_page_reads_cursor_values_without_extra_queries(self):
+        self.client.get(self.url, {'page_size': 2, 'fields': 'id'})
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, {'page_size': 2, 'fields': 'id'})
+
+        self.assertEqual(response.data['results'], [{'id': pk} for pk in self.expected_ids[:2]])
+        self.assertIsNotNone(response.data['next'])
+        self.assertEqual(
+            len([query for query in queries.captured_queries if 'FROM "event_detail"' in query['sql']]), 1,
+        )
+
+    def test_tampered_cursor_is_rejected(self):
+        response = self.client.get(self.url, {'cursor': 'WyJub3QtYS1kYXRlIiwiMjI6MDAiLDFd'})
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(response.data['code'], 'not_found')
+
+
+class SparseFieldsetTest(TestCase):
+    """fields= / omit= と SELECT の絞り込み"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.url = reverse('eventdetail-list')
+        community = make_community(name='フィールド集会', tags=['tech'], group_url='https://vrc.group/ABC.1234')
+        event = make_event(community)
+        make_event_detail(event, status='approved', theme='発表テーマ', contents='長い本文' * 100)
+
+    def test_fields_limits_output_and_drops_joins(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, {'fields': 'id,theme'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(set(response.data[0]), {'id', 'theme'})
+        select = next(query['sql'] for query in queries.captured_queries if 'FROM "event_detail"' in query['sql'])
+        columns = select.split(' FROM ')[0]
+        self.assertNotIn('"community".', columns)
+        self.assertNotIn('"event"."duration"', columns)
+        self.assertNotIn('"contents"', columns)
+
+    def test_nested_fields_select_only_needed_columns(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, {'fields': 'theme,event.date,event.community.group_id'})
+
+        item = response.data[0]
+        self.assertEqual(set(item), {'theme', 'event'})
+        self.assertEqual(set(item['event']), {'date', 'community'})
+        self.assertEqual(item['event']['community'], {'group_id': 'ABC.1234'})
+        selects = [query['sql'] for query in queries.captured_queries if 'FROM "event_detail"' in query['sql']]
+        self.assertEqual(len(selects), 1)
+        self.assertIn('"group_url"', selects[0])
+        self.assertNotIn('"description"', selects[0])
+
+    def test_omit_removes_nested_fields(self):
+        response = self.client.get(self.url, {'omit': 'event.community,additional_info'})
+
+        item = response.data[0]
+        self.assertNotIn('additional_info', item)
+        self.assertNotIn('community', item['event'])
+        self.assertIn('date', item['event'])
+
+    def test_unknown_field_is_validation_error(self):
+        response = self.client.get(self.url, {'fields': 'id,unknown'})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['code'], 'validation_error')
+
+    def test_community_fields_and_cursor(self):
+        url = reverse('community-list')
+        make_community(name='もう一つの集会', tags=['academic'])
+
+        response = self.client.get(url, {'fields': 'id,name', 'page_size': 1})
+
+        self.assertEqual(set(response.data['results'][0]), {'id', 'name'})
+        self.assertEqual(response.data['results'][0]['name'], 'もう一つの集会')
+        self.assertIsNotNone(response.data['next'])
+
+    def test_schema_documents_cursor_and_field_parameters(self):
+        payload = json.loads(self.client.get(f"{reverse('schema')}?format=json").content)
+
+        parameters = {parameter['name'] for parameter in payload['paths']['/api/v1/event/']['get']['parameters']}
+        self.assertTrue({'cursor', 'page_size', 'fields', 'omit'} <= parameters)
@@ -10,7 +10,6 @@ from rest_framework.exceptions import ValidationError
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
-from rest_framework.throttling import AnonRateThrottle, UserRateThrottle
 from drf_spectacular.utils import extend_schema, extend_schema_view, OpenApiParameter, OpenApiExample
 from drf_spectacular.types import OpenApiTypes
 
@@ -22,8 +21,11 @@ from event.datetime_lock import (
     is_event_datetime_locked,
 )
 from event.models import Event, EventDetail, RecurrenceRule
+from website.throttling import LocalAnonRateThrottle, LocalUserRateThrottle
 from .authentication import APIKeyAuthentication
 from .base import DatabaseReconnectListMixin
+from .pagination import KeysetCursorPagination
+from .sparse_fields import SparseFieldsetFilter
 from .serializers import (
     CommunitySerializer, EventSerializer, EventDetailSerializer, EventDetailWriteSerializer,
     RecurrenceRuleSerializer, RecurrenceRuleDeleteSerializer, GatheringListSerializer,
@@ -67,8 +69,10 @@ class CommunityViewSet(DatabaseReconnectListMixin, viewsets.ReadOnlyModelViewSet
     ).order_by('-pk')
     serializer_class = CommunitySerializer
     filterset_class = CommunityFilter
-    filter_backends = [DjangoFilterBackend]
-    throttle_classes = [AnonRateThrottle, UserRateThrottle]
+    filter_backends = [DjangoFilterBackend, SparseFieldsetFilter]
+    pagination_class = KeysetCursorPagination
+    cursor_ordering = ('-id',)
+    throttle_classes = [LocalAnonRateThrottle, LocalUserRateThrottle]
 
     @extend_schema(
         summary="TaAGatheringListSys向け集会一覧取得",
@@ -80,7 +84,11 @@ class CommunityViewSet(DatabaseReconnectListMixin, viewsets.ReadOnlyModelViewSet
         # OpenAPI は fields を持つ専用 serializer を参照し、to_representation 実装との差分で壊れないようにする。
         responses=GatheringListSchemaSerializer(many=True),
     )
-    @action(detail=False, methods=['get'], url_path='gathering-list')
+    # 固定形式の全件配列を返すので、一覧用のページングとフィールド選択は使わない
+    @action(
+        detail=False, methods=['get'], url_path='gathering-list',
+        pagination_class=None, filter_backends=[DjangoFilterBackend],
+    )
     def gathering_list(self, request):
         communities = Community.objects.filter(
             end_at__isnull=True,
@@ -141,8 +149,10 @@ class EventViewSet(DatabaseReconnectListMixin, viewsets.ReadOnlyModelViewSet):
     ).select_related('community').order_by('date', 'start_time')
     serializer_class = EventSerializer
     filterset_class = EventFilter
-    filter_backends = [DjangoFilterBackend]
-    throttle_classes = [AnonRateThrottle, UserRateThrottle]
+    filter_backends = [DjangoFilterBackend, SparseFieldsetFilter]
+    pagination_class = KeysetCursorPagination
+    cursor_ordering = ('date', 'start_time', 'id')
+    throttle_classes = [LocalAnonRateThrottle, LocalUserRateThrottle]
 
 
 class EventDetailFilter(filters.FilterSet):
@@ -178,8 +188,10 @@ class EventDetailViewSet(DatabaseReconnectListMixin, viewsets.ReadOnlyModelViewS
     ).select_related('event', 'event__community').order_by('event__date', 'start_time')
     serializer_class = EventDetailSerializer
     filterset_class = EventDetailFilter
-    filter_backends = [DjangoFilterBackend]
-    throttle_classes = [AnonRateThrottle, UserRateThrottle]
+    filter_backends = [DjangoFilterBackend, SparseFieldsetFilter]
+    pagination_class = KeysetCursorPagination
+    cursor_ordering = ('event__date', 'start_time', 'id')
+    throttle_classes = [LocalAnonRateThrottle, LocalUserRateThrottle]
 
 
 @extend_schema_view(
@@ -253,7 +265,10 @@ class EventDetailAPIViewSet(DatabaseReconnectListMixin, viewsets.ModelViewSet):
     authentication_classes = [APIKeyAuthentication, SessionAuthentication]
     permission_classes = [IsAuthenticated]
     parser_classes = [MultiPartParser, FormParser, JSONParser]
-    throttle_classes = [UserRateThrottle]
+    throttle_classes = [LocalUserRateThrottle]
+    filter_backends = [SparseFieldsetFilter]
+    pagination_class = KeysetCursorPagination
+    cursor_ordering = ('event__date', 'start_time', 'id')
     
     def get_serializer_class(self):
         if self.action in ['list', 'retrieve']:
@@ -323,7 +338,7 @@ class EventDetailAPIViewSet(DatabaseReconnectListMixin, viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def my_events(self, request):
         """自分のコミュニティのイベント詳細一覧"""
-        queryset = self.get_queryset()
+        queryset = self.filter_queryset(self.get_queryset())
         page = self.paginate_queryset(queryset)
         if page is not None:
             serializer = self.get_serializer(page, many=True)
@@ -1,4 +1,7 @@
 """集会関連のコンテキストプロセッサ"""
+from django.utils.functional import SimpleLazyObject
+
+from community.membership_summary import get_cached_memberships
 
 
 def _find_active_membership(memberships):
@@ -13,20 +16,37 @@ def active_community(request):
     """アクティブな集会をテンプレートコンテキストに追加
 
     ログインユーザーが管理する集会の一覧と、現在アクティブな集会を
-    テンプレートで利用可能にする。終了した集会がアクティブに選ばれている場合、
+    テンプレートで利用可能にする。値はテンプレートが参照した時点で
+    resolve_active_community により1回だけ求める（参照しないページでは何もしない）。
+    """
+    if not request.user.is_authenticated:
+        return {'active_membership': None}
+
+    resolved = SimpleLazyObject(lambda: resolve_active_community(request))
+    return {
+        key: SimpleLazyObject(lambda key=key: resolved[key])
+        for key in ('user_communities', 'active_community', 'active_membership')
+    }
+
+
+def resolve_active_community(request):
+    """ログインユーザーの集会一覧とアクティブな集会を求める
+
+    メンバーシップはユーザー単位のキャッシュ（community.membership_summary）から組み立てるため、
+    キャッシュが有効なら DB にはアクセスしない。終了した集会がアクティブに選ばれている場合、
     自動的にアクティブな集会に切り替える。
 
     Returns:
         dict: 以下のキーを含む辞書
-            - user_communities: ユーザーのCommunityMembershipのクエリセット
+            - user_communities: ユーザーのCommunityMemberのリスト
             - active_community: 現在アクティブなCommunityオブジェクト
             - active_membership: 現在アクティブなCommunityMemberオブジェクト
     """
     if not request.user.is_authenticated:
         return {'active_membership': None}
 
-    memberships = request.user.community_memberships.select_related('community')
-    if not memberships.exists():
+    memberships = get_cached_memberships(request.user)
+    if not memberships:
         return {'user_communities': [], 'active_community': None, 'active_membership': None}
 
     empty = {'user_communities': memberships, 'active_community': None, 'active_membership': None}
@@ -34,7 +54,7 @@ def active_community(request):
     # セッションからactive_community_idを取得
     community_id = request.session.get('active_community_id')
     if community_id:
-        active = memberships.filter(community_id=community_id).first()
+        active = next((m for m in memberships if m.community_id == community_id), None)
         if active and not active.community.is_ended:
             return {
                 'user_communities': memberships,
@@ -6,22 +6,18 @@ import logging
 from collections.abc import Callable
 from datetime import date, timedelta
 
-import requests
 from django.conf import settings
 from django.contrib.auth.models import AbstractBaseUser, AnonymousUser
 from django.core.cache import cache
-from django.core.mail import send_mail
+from django.db import transaction
 from django.http import HttpRequest
 from django.template.loader import render_to_string
 from django.urls import reverse
 from django.utils import timezone
 
 from event.community_cleanup import cleanup_community_future_data
+from ta_hub.outbox import enqueue_discord_webhook, enqueue_email
 from website.constants import build_site_url
-from website.discord_webhook import (
-    get_webhook_error_context,
-    post_discord_webhook,
-)
 
 from .models import Community, CommunityMember
 
@@ -60,30 +56,16 @@ def notify_new_community_registration(community: Community, request: HttpRequest
         "content": f"**【新規集会登録】** {community.name}\n"
                    f"承認ページ: {waiting_list_url}"
     }
-    try:
-        post_discord_webhook(settings.DISCORD_WEBHOOK_URL, discord_message)
-    except requests.RequestException as error:
-        # gateway で回復できなかった最終失敗のみここに到達する
-        error_type, status_code = get_webhook_error_context(error)
-        logger.warning(
-            'Discord通知送信失敗（リトライ後）: '
-            'community_id=%s error_type=%s status_code=%s',
-            community.pk,
-            error_type,
-            status_code,
-        )
-    except Exception as error:
-        error_type, status_code = get_webhook_error_context(error)
-        logger.warning(
-            'Discord通知送信失敗: community_id=%s error_type=%s status_code=%s',
-            community.pk,
-            error_type,
-            status_code,
-        )
+    enqueue_discord_webhook(
+        settings.DISCORD_WEBHOOK_URL,
+        discord_message,
+        label=f'community_registration:{community.pk}',
+    )
 
 
+@transaction.atomic
 def approve_community_registration(community: Community, request: HttpRequest) -> None:
-    """集会を承認し、オーナーへ承認メールを送信する."""
+    """集会を承認し、オーナーへの承認メールをアウトボックスに積む."""
     community.status = 'approved'
     community.save()
 
@@ -105,23 +87,19 @@ def approve_community_registration(community: Community, request: HttpRequest) -
 
     owner_email = community.get_owner_email()
     if owner_email:
-        sent = send_mail(
+        enqueue_email(
             subject=subject,
-            message='',
-            from_email=settings.DEFAULT_FROM_EMAIL,
             recipient_list=[owner_email],
             html_message=html_message,
+            label=f'community_approved:{community.pk}',
         )
-        if sent:
-            logger.info(f'承認メール送信成功: {community.name} to {owner_email}')
-        else:
-            logger.warning(f'承認メール送信失敗: {community.name} to {owner_email}')
     else:
         logger.warning(f'承認メール送信スキップ: {community.name} - オーナーのメールアドレスが見つかりません')
 
 
+@transaction.atomic
 def reject_community_registration(community: Community) -> None:
-    """集会を非承認にし、オーナーへ非承認メールを送信する."""
+    """集会を非承認にし、オーナーへの非承認メールをアウトボックスに積む."""
     community.status = 'rejected'
     community.save()
 
@@ -134,17 +112,12 @@ def reject_community_registration(community: Community) -> None:
 
     owner_email = community.get_owner_email()
     if owner_email:
-        sent = send_mail(
+        enqueue_email(
             subject=subject,
-            message='',
-            from_email=settings.DEFAULT_FROM_EMAIL,
             recipient_list=[owner_email],
             html_message=html_message,
+            label=f'community_rejected:{community.pk}',
         )
-        if sent:
-            logger.info(f'非承認メール送信成功: {community.name} to {owner_email}')
-        else:
-            logger.warning(f'非承認メール送信失敗: {community.name} to {owner_email}')
     else:
         logger.warning(f'非承認メール送信スキップ: {community.name} - オーナーのメールアドレスが見つかりません')
 
@@ -7,22 +7,55 @@ Community ポスター画像の一括最適化コマンド
 
     # 実行
     python manage.py optimize_poster_images
+
+    # 中断した実行の続きから再開
+    python manage.py optimize_poster_images --resume
+
+R2 からの読み書きはスレッドプール、画像のデコード・リサイズ・再エンコードは
+プロセスプールで並列実行する（utils.batch_processing を参照）。
 """
 import logging
+from functools import partial
 
-from django.core.management.base import BaseCommand
-from PIL import Image
+from django.core.management.base import BaseCommand, CommandError
 
 from community.models import Community
 from ta_hub.libs import (
     DEFAULT_JPEG_QUALITY,
     DEFAULT_MAX_SIZE,
     DEFAULT_PNG_TO_JPEG_THRESHOLD,
-    resize_and_convert_image,
+    optimize_image_bytes,
+    replace_image_file,
+)
+from utils.batch_processing import (
+    BatchCheckpoint,
+    BatchExecutor,
+    BatchOptions,
+    BatchProgress,
+    add_batch_arguments,
+    iter_keyset_batches,
 )
 
 logger = logging.getLogger(__name__)
 
+CHECKPOINT_NAME = 'optimize_poster_images'
+
+
+def _read_poster_bytes(community):
+    """ポスター画像をストレージから読み出す（I/Oスレッドで実行）"""
+    poster = community.poster_image
+    poster.open('rb')
+    try:
+        return poster.read()
+    finally:
+        poster.close()
+
+
+def _write_optimized_poster(job):
+    """最適化済みの画像でポスターを置き換える（I/Oスレッドで実行）"""
+    community, result = job
+    replace_image_file(community.poster_image, result.content, result.output_format)
+
 
 class Command(BaseCommand):
     help = 'Community のポスター画像を一括最適化'
@@ -51,12 +84,17 @@ class Command(BaseCommand):
             default=DEFAULT_PNG_TO_JPEG_THRESHOLD,
             help=f'PNG→JPEG変換の閾値バイト数 (デフォルト: {DEFAULT_PNG_TO_JPEG_THRESHOLD})',
         )
+        add_batch_arguments(parser)
 
     def handle(self, *args, **options):
         dry_run = options['dry_run']
         max_size = options['max_size']
         jpeg_quality = options['jpeg_quality']
         png_threshold = options['png_threshold']
+        try:
+            batch_options = BatchOptions.from_options(options)
+        except ValueError as exc:
+            raise CommandError(str(exc)) from exc
 
         if dry_run:
             self.stdout.write(self.style.WARNING('=== ドライランモード（変更は適用されません） ==='))
@@ -64,123 +102,129 @@ class Command(BaseCommand):
         self.stdout.write(f'設定: max_size={max_size}px, jpeg_quality={jpeg_quality}, png_threshold={png_threshold // 1024}KB')
 
         # 統計情報
-        total_count = 0
-        resized_count = 0
-        converted_count = 0
-        skipped_count = 0
-        error_count = 0
+        self.total_count = 0
+        self.resized_count = 0
+        self.converted_count = 0
+        self.skipped_count = 0
+        self.error_count = 0
 
         communities = Community.objects.exclude(poster_image='').exclude(poster_image__isnull=True)
+        # 最適化条件が変わった場合は別のチェックポイントとして扱う
+        checkpoint = BatchCheckpoint(
+            CHECKPOINT_NAME, scope=f'{max_size}-{jpeg_quality}-{png_threshold}'
+        )
+        after_pk = checkpoint.load() if batch_options.resume else None
+        if after_pk is not None:
+            self.stdout.write(f'チェックポイントから再開: pk > {after_pk}')
+            communities = communities.filter(pk__gt=after_pk)
         total_communities = communities.count()
 
         self.stdout.write(f'\n対象: {total_communities} 件の Community\n')
 
-        for i, community in enumerate(communities, 1):
-            total_count += 1
-            poster = community.poster_image
-
-            try:
-                # ファイル情報を取得
-                file_path = poster.name
-                file_size = poster.size if poster else 0
-
-                # 画像を開いてサイズと形式を確認
-                # 注意: with 文を使うと PIL がファイルを閉じてしまい、
-                # 後続の poster.file.seek(0) が失敗するため try-finally を使用。
-                img = None
-                try:
-                    img = Image.open(poster.file)
-                    width, height = img.size
-                    original_format = img.format or 'UNKNOWN'
-
-                    # 透過チェック
-                    has_transparency = img.mode in ('RGBA', 'LA') or (
-                        img.mode == 'P' and 'transparency' in img.info
-                    )
-                finally:
-                    # PIL 画像オブジェクトのみ解放（poster.file は閉じない）
-                    if img is not None:
-                        del img
-
-                # 処理が必要かどうか判定
-                needs_resize = width > max_size or height > max_size
-                needs_convert = (
-                    original_format == 'PNG' and
-                    file_size >= png_threshold and
-                    not has_transparency
+        optimize = partial(
+            optimize_image_bytes,
+            max_size=max_size,
+            jpeg_quality=jpeg_quality,
+            png_to_jpeg_threshold=png_threshold,
+            apply=not dry_run,
+        )
+        progress = BatchProgress(self.stdout.write, total=total_communities)
+
+        with BatchExecutor(
+            cpu_workers=batch_options.cpu_workers, io_workers=batch_options.io_workers
+        ) as executor:
+            for chunk in iter_keyset_batches(communities, batch_size=batch_options.batch_size):
+                self._process_chunk(
+                    chunk,
+                    executor=executor,
+                    optimize=optimize,
+                    dry_run=dry_run,
+                    max_size=max_size,
+                    offset=progress.processed,
+                    total=total_communities,
                 )
-
-                if not needs_resize and not needs_convert:
-                    skipped_count += 1
-                    continue
-
-                # 処理内容を表示
-                actions = []
-                if needs_resize:
-                    actions.append(f'リサイズ: {width}x{height} → {max_size}px以下')
-                if needs_convert:
-                    actions.append(f'変換: PNG → JPEG ({file_size // 1024}KB, 透過なし)')
-
-                self.stdout.write(f'[{i}/{total_communities}] {community.name}')
-                self.stdout.write(f'  パス: {file_path}')
-                for action in actions:
-                    self.stdout.write(f'  {action}')
-
-                if needs_resize:
-                    resized_count += 1
-                if needs_convert:
-                    converted_count += 1
-
+                progress.advance(len(chunk))
                 if not dry_run:
-                    # 実際に最適化を実行
-                    # ファイルを再度開く（PIL が閉じている可能性があるため）
-                    poster.file.seek(0)
-
-                    # _committed を False に設定して resize_and_convert_image が処理するようにする
-                    poster._committed = False
-
-                    resize_and_convert_image(
-                        poster,
-                        max_size=max_size,
-                        jpeg_quality=jpeg_quality,
-                        png_to_jpeg_threshold=png_threshold
-                    )
-
-                    # リサイズ完了後、_committed を True に設定して
-                    # Community.save() での二重リサイズを防ぐ
-                    poster._committed = True
-
-                    # モデルを保存（poster_image フィールドのみ更新）
-                    community.save(update_fields=['poster_image'])
-                    self.stdout.write(self.style.SUCCESS(f'  → 完了: {poster.name}'))
-
-            except FileNotFoundError:
-                error_count += 1
-                self.stdout.write(self.style.ERROR(f'[{i}/{total_communities}] {community.name}: ファイルが見つかりません'))
-            except Exception as e:
-                error_count += 1
-                self.stdout.write(self.style.ERROR(f'[{i}/{total_communities}] {community.name}: エラー - {e}'))
-            finally:
-                # ファイルハンドルを確実に閉じる（リソースリーク防止）
-                try:
-                    poster.file.close()
-                except (OSError, ValueError):
-                    logger.exception(
-                        "ポスター画像ファイルのクローズに失敗しました: community_id=%s path=%s",
-                        community.pk,
-                        poster.name,
-                    )
+                    checkpoint.save(chunk[-1].pk, processed=progress.processed)
+
+        if not dry_run:
+            checkpoint.clear()
 
         # サマリー
         self.stdout.write('\n' + '=' * 50)
         self.stdout.write('サマリー')
         self.stdout.write('=' * 50)
-        self.stdout.write(f'  対象ファイル数: {total_count}')
-        self.stdout.write(f'  リサイズ対象: {resized_count}')
-        self.stdout.write(f'  PNG→JPEG変換対象: {converted_count}')
-        self.stdout.write(f'  スキップ（処理不要）: {skipped_count}')
-        self.stdout.write(f'  エラー: {error_count}')
+        self.stdout.write(f'  対象ファイル数: {self.total_count}')
+        self.stdout.write(f'  リサイズ対象: {self.resized_count}')
+        self.stdout.write(f'  PNG→JPEG変換対象: {self.converted_count}')
+        self.stdout.write(f'  スキップ（処理不要）: {self.skipped_count}')
+        self.stdout.write(f'  エラー: {self.error_count}')
 
         if dry_run:
             self.stdout.write(self.style.WARNING('\nドライランモードのため、変更は適用されていません。'))
             self.stdout.write('実際に適用するには --dry-run オプションを外して再実行してください。')
+
+    def _process_chunk(self, chunk, *, executor, optimize, dry_run, max_size, offset, total):
+        """1チャンク分のポスターを 読み出し(I/O) → 判定・最適化(CPU) → 書き込み(I/O) の順に処理する"""
+        self.total_count += len(chunk)
+        position = {community.pk: offset + i for i, community in enumerate(chunk, 1)}
+
+        readable = []
+        for outcome in executor.map_io(_read_poster_bytes, chunk):
+            if outcome.ok:
+                readable.append((outcome.item, outcome.result))
+            else:
+                self._report_error(outcome.item, outcome.error, position, total)
+
+        planned = executor.map_cpu(optimize, [data for _, data in readable])
+        writes = []
+        for (community, data), outcome in zip(readable, planned):
+            if not outcome.ok:
+                self._report_error(community, outcome.error, position, total)
+                continue
+            result = outcome.result
+            if not result.needs_optimization:
+                self.skipped_count += 1
+                continue
+
+            # 処理内容を表示
+            actions = []
+            if result.needs_resize:
+                actions.append(f'リサイズ: {result.width}x{result.height} → {max_size}px以下')
+                self.resized_count += 1
+            if result.needs_convert:
+                actions.append(f'変換: PNG → JPEG ({len(data) // 1024}KB, 透過なし)')
+                self.converted_count += 1
+
+            self.stdout.write(f'[{position[community.pk]}/{total}] {community.name}')
+            self.stdout.write(f'  パス: {community.poster_image.name}')
+            for action in actions:
+                self.stdout.write(f'  {action}')
+
+            if not dry_run:
+                writes.append((community, result))
+
+        for outcome in executor.map_io(_write_optimized_poster, writes):
+            community, _ = outcome.item
+            if not outcome.ok:
+                self._report_error(community, outcome.error, position, total)
+                continue
+            # 最適化済みのファイルなので Community.save() での二重リサイズを防ぐ
+            community.poster_image._committed = True
+            # モデルを保存（poster_image フィールドのみ更新）
+            community.save(update_fields=['poster_image'])
+            self.stdout.write(self.style.SUCCESS(f'  → 完了: {community.poster_image.name}'))
+
+    def _report_error(self, community, error, position, total):
+        self.error_count += 1
+        prefix = f'[{position[community.pk]}/{total}] {community.name}'
+        if isinstance(error, FileNotFoundError):
+            self.stdout.write(self.style.ERROR(f'{prefix}: ファイルが見つかりません'))
+            return
+        logger.error(
+            "ポスター画像の最適化に失敗しました: community_id=%s path=%s",
+            community.pk,
+            community.poster_image.name,
+            exc_info=error,
+        )
+        self.stdout.write(self.style.ERROR(f'{prefix}: エラー - {error}'))
@@ -0,0 +1,86 @@
+"""ユーザーの集会メンバーシップ要約のキャッシュ.
+
+active_community コンテキストプロセッサはログイン中の全ページで描画されるため、
+ヘッダーの「マイ集会」表示に使う値（メンバーシップID・集会ID・役割・集会名・終了日）だけを
+ユーザー単位でキャッシュする。
+
+印はユーザーごとに持ち（website.versioned_cache）、CommunityMember / Community の
+保存・削除シグナルが付け替える（community.signals）。
+is_ended は日付で変わるため、終了日そのものを保存して表示時に判定する。
+"""
+from __future__ import annotations
+
+from datetime import date
+from typing import Iterable, Optional
+
+from website import versioned_cache
+from website.constants import CACHE_TTL_HOUR
+
+MEMBERSHIP_SUMMARY_TIMEOUT = CACHE_TTL_HOUR
+
+
+def _summary_key(user_id: int) -> str:
+    return f'community:membership_summary:{user_id}'
+
+
+def _version_key(user_id: int) -> str:
+    return f'community:membership_summary_version:{user_id}'
+
+
+def bump_membership_summary_version(user_ids: Iterable[int]) -> None:
+    """ユーザーの要約を無効にする（次の読み出しで作り直す）."""
+    versioned_cache.bump_versions(_version_key(user_id) for user_id in set(user_ids))
+
+
+def get_membership_summary(user) -> list[tuple]:
+    """ユーザーのメンバーシップ要約を ID 順で返す.
+
+    各要素は (メンバーシップID, 集会ID, 役割, 集会名, 終了日の ISO 文字列または None)。
+    キャッシュが有効なら DB にはアクセスしない。
+    """
+    _, summary = versioned_cache.get_versioned(
+        _version_key(user.pk),
+        _summary_key(user.pk),
+        lambda: _query_membership_summary(user.pk),
+        MEMBERSHIP_SUMMARY_TIMEOUT,
+    )
+    return summary
+
+
+def get_cached_memberships(user) -> list:
+    """要約から CommunityMember（community 付き）を組み立てて返す.
+
+    要約に含まれない項目は遅延読み込みになる（アクセスした時だけ DB に問い合わせる）。
+    """
+    from community.models import Community, CommunityMember
+
+    memberships = []
+    for member_id, community_id, role, community_name, community_end_at in get_membership_summary(user):
+        end_at = date.fromisoformat(community_end_at) if community_end_at else None
+        community = Community.from_db(
+            'default', ['id', 'name', 'end_at'], (community_id, community_name, end_at),
+        )
+        member = CommunityMember.from_db(
+            'default', ['id', 'community_id', 'user_id', 'role'], (member_id, community_id, user.pk, role),
+        )
+        member.community = community
+        member.user = user
+        memberships.append(member)
+    return memberships
+
+
+def _query_membership_summary(user_id: int) -> list[tuple]:
+    from community.models import CommunityMember
+
+    rows = (
+        CommunityMember.objects.filter(user_id=user_id)
+        .order_by('pk')
+        .values_list('id', 'community_id', 'role', 'community__name', 'community__end_at')
+    )
+    return [_serialize_row(row) for row in rows]
+
+
+def _serialize_row(row: tuple) -> tuple:
+    member_id, community_id, role, community_name, community_end_at = row
+    end_at: Optional[str] = community_end_at.isoformat() if community_end_at else None
+    return (member_id, community_id, role, community_name, end_at)
@@ -0,0 +1,13 @@
+"""集会関連のミドルウェア."""
+from community.permissions import community_permission_scope
+
+
+class CommunityPermissionMiddleware:
+    """リクエストごとに集会の権限判定キャッシュのスコープを開く."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with community_permission_scope():
+            return self.get_response(request)
@@ -9,6 +9,7 @@ from django.utils import timezone
 from ta_hub.libs import DEFAULT_MAX_SIZE, resize_and_convert_image
 
 from .encrypted_fields import EncryptedTextField
+from .permissions import get_community_permissions
 
 
 def poster_upload_path(instance, filename):
@@ -187,24 +188,36 @@ class Community(models.Model):
                 resize_and_convert_image(self.poster_image, max_size=DEFAULT_MAX_SIZE)
         super().save(*args, **kwargs)
 
+    def _members_with_users(self):
+        """メンバー一覧（ユーザー込み）。prefetch_related('members') 済みならそれを使う"""
+        if 'members' in getattr(self, '_prefetched_objects_cache', {}):
+            return self.members.all()
+        return self.members.select_related('user')
+
     def get_owners(self):
         """主催者ユーザーのリストを返す"""
-        return [m.user for m in self.members.filter(role=CommunityMember.Role.OWNER)]
+        return [m.user for m in self._members_with_users() if m.role == CommunityMember.Role.OWNER]
 
     def get_staff(self):
         """スタッフユーザーのリストを返す"""
-        return [m.user for m in self.members.filter(role=CommunityMember.Role.STAFF)]
+        return [m.user for m in self._members_with_users() if m.role == CommunityMember.Role.STAFF]
 
     def get_all_managers(self):
         """全管理者ユーザーのリストを返す"""
-        return [m.user for m in self.members.all()]
+        return [m.user for m in self._members_with_users()]
 
     def is_manager(self, user):
         """指定ユーザーが管理者かどうかを判定する"""
+        permissions = get_community_permissions(user)
+        if permissions is not None:
+            return permissions.is_manager(self)
         return self.members.filter(user=user).exists()
 
     def is_owner(self, user):
         """指定ユーザーが主催者かどうかを判定する"""
+        permissions = get_community_permissions(user)
+        if permissions is not None:
+            return permissions.is_owner(self)
         return self.members.filter(user=user, role=CommunityMember.Role.OWNER).exists()
 
     def get_owner(self):
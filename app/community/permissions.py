@@ -0,0 +1,123 @@
+"""集会の権限判定（リクエスト内でメンバーシップを1回だけ読む）.
+
+Community.is_manager / is_owner / can_edit と active_community コンテキストプロセッサ、
+マイリストなどがそれぞれ CommunityMember を問い合わせていたため、1ページで同じ判定の
+クエリが何度も流れていた。
+
+CommunityPermissionResolver はユーザーのメンバーシップ（集会込み）を1クエリで読み、以降の
+判定をメモリ上で返す。リゾルバは CommunityPermissionMiddleware が開くリクエスト単位の
+スコープ（contextvar）に保持する。スコープ外（管理コマンド・バックグラウンドスレッド等）では
+get_community_permissions が None を返し、呼び出し側は従来どおり都度問い合わせる。
+CommunityMember の保存・削除で世代番号を進め、リクエストの途中でメンバーシップが変わった場合は
+次の判定時に読み直す。
+"""
+from __future__ import annotations
+
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+_generation_lock = threading.Lock()
+_membership_generation = 0
+
+# ユーザーID -> リゾルバ。None ならリクエストスコープの外
+_request_scope: ContextVar[Optional[dict[int, 'CommunityPermissionResolver']]] = ContextVar(
+    'community_permission_scope', default=None,
+)
+
+
+def invalidate_community_permissions() -> None:
+    """メンバーシップが変わったことを通知する（保持中のリゾルバは次の判定で読み直す）."""
+    global _membership_generation
+
+    with _generation_lock:
+        _membership_generation += 1
+
+
+class CommunityPermissionResolver:
+    """1ユーザーの集会メンバーシップを保持して権限を判定する."""
+
+    def __init__(self, user):
+        self.user = user
+        self._memberships = None
+        self._roles: dict[int, str] = {}
+        self._generation: Optional[int] = None
+
+    def memberships(self):
+        """ユーザーの CommunityMember（community を select_related 済み）を ID 順で返す."""
+        if self._memberships is None or self._generation != _membership_generation:
+            from community.models import CommunityMember
+
+            generation = _membership_generation
+            self._memberships = list(
+                CommunityMember.objects.filter(user_id=self.user.pk)
+                .select_related('community')
+                .order_by('pk')
+            )
+            self._roles = {member.community_id: member.role for member in self._memberships}
+            self._generation = generation
+        return self._memberships
+
+    def role(self, community) -> Optional[str]:
+        """集会での役割（owner / staff）。メンバーでなければ None."""
+        self.memberships()
+        return self._roles.get(_community_id(community))
+
+    def community_ids(self) -> list[int]:
+        return [member.community_id for member in self.memberships()]
+
+    def is_manager(self, community) -> bool:
+        return self.role(community) is not None
+
+    def is_owner(self, community) -> bool:
+        from community.models import CommunityMember
+
+        return self.role(community) == CommunityMember.Role.OWNER
+
+    def can_edit(self, community) -> bool:
+        return self.is_manager(community)
+
+    def can_delete(self, community) -> bool:
+        return self.is_owner(community)
+
+
+@contextmanager
+def community_permission_scope() -> Iterator[None]:
+    """この中で作ったリゾルバを使い回す（リクエスト1回分）."""
+    token = _request_scope.set({})
+    try:
+        yield
+    finally:
+        _request_scope.reset(token)
+
+
+def get_community_permissions(user) -> Optional[CommunityPermissionResolver]:
+    """現在のスコープでユーザーのリゾルバを返す.
+
+    スコープ外、または未ログイン・未保存のユーザーなら None。
+    """
+    scope = _request_scope.get()
+    if scope is None or user is None or not getattr(user, 'is_authenticated', False):
+        return None
+    user_id = getattr(user, 'pk', None)
+    if user_id is None:
+        return None
+    resolver = scope.get(user_id)
+    if resolver is None:
+        resolver = scope[user_id] = CommunityPermissionResolver(user)
+    return resolver
+
+
+def get_user_memberships(user) -> list:
+    """ユーザーの CommunityMember（community 込み）を ID 順で返す。スコープ内なら読み込みは1回."""
+    permissions = get_community_permissions(user)
+    if permissions is not None:
+        return permissions.memberships()
+    if user is None or not getattr(user, 'is_authenticated', False):
+        return []
+    return list(user.community_memberships.select_related('community').order_by('pk'))
+
+
+def _community_id(community) -> int:
+    return community if isinstance(community, int) else community.pk
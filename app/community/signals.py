@@ -0,0 +1,31 @@
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from community.membership_summary import bump_membership_summary_version
+from community.models import Community, CommunityMember
+from community.permissions import invalidate_community_permissions
+
+
+@receiver(post_save, sender=CommunityMember)
+@receiver(post_delete, sender=CommunityMember)
+def invalidate_permissions_on_membership_change(sender, instance, **kwargs):
+    invalidate_community_permissions()
+    bump_membership_summary_version([instance.user_id])
+
+
+@receiver(post_save, sender=Community)
+def invalidate_membership_summary_on_community_change(sender, instance, created, **kwargs):
+    # 集会の削除はメンバーの削除シグナルで無効になる
+    if created:
+        return
+    bump_membership_summary_version(
+        CommunityMember.objects.filter(community_id=instance.pk).values_list('user_id', flat=True)
+    )
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def reset_membership_summary_for_new_user(sender, instance, created, **kwargs):
+    # 削除済みユーザーの ID が再利用されても、以前の要約を返さない
+    if created:
+        bump_membership_summary_version([instance.pk])
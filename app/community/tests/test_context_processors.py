@@ -1,11 +1,15 @@
 from datetime import date, timedelta
 
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase, RequestFactory
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth import get_user_model
 from django.contrib.sessions.middleware import SessionMiddleware
 
 from community.models import Community, CommunityMember
-from community.context_processors import active_community
+from community.context_processors import active_community, resolve_active_community
+from tests.factories import make_community, make_community_member, make_user
 
 CustomUser = get_user_model()
 
@@ -75,7 +79,7 @@ class ActiveCommunityContextProcessorTest(TestCase):
         request.user = self.user2  # メンバーシップなし
         self._add_session_to_request(request)
 
-        result = active_community(request)
+        result = resolve_active_community(request)
 
         self.assertEqual(result['user_communities'], [])
         self.assertIsNone(result['active_community'])
@@ -86,7 +90,7 @@ class ActiveCommunityContextProcessorTest(TestCase):
         request.user = self.user1
         self._add_session_to_request(request)
 
-        result = active_community(request)
+        result = resolve_active_community(request)
 
         self.assertIn(result['active_community'], [self.community1, self.community2])
         self.assertIsNotNone(result['active_membership'])
@@ -101,7 +105,7 @@ class ActiveCommunityContextProcessorTest(TestCase):
         self._add_session_to_request(request)
         request.session['active_community_id'] = self.community2.id
 
-        result = active_community(request)
+        result = resolve_active_community(request)
 
         self.assertEqual(result['active_community'], self.community2)
         self.assertEqual(result['active_membership'].community, self.community2)
@@ -113,7 +117,7 @@ class ActiveCommunityContextProcessorTest(TestCase):
         self._add_session_to_request(request)
         request.session['active_community_id'] = 99999  # 存在しないID
 
-        result = active_community(request)
+        result = resolve_active_community(request)
 
         # 無効なIDの場合、最初の集会にフォールバック
         self.assertIsNotNone(result['active_community'])
@@ -129,7 +133,7 @@ class ActiveCommunityContextProcessorTest(TestCase):
         self._add_session_to_request(request)
         request.session['active_community_id'] = self.community1.id
 
-        result = active_community(request)
+        result = resolve_active_community(request)
 
         # 終了した集会1ではなく、アクティブな集会2に切り替わる
         self.assertEqual(result['active_community'], self.community2)
@@ -146,7 +150,7 @@ class ActiveCommunityContextProcessorTest(TestCase):
         request.user = self.user1
         self._add_session_to_request(request)
 
-        result = active_community(request)
+        result = resolve_active_community(request)
 
         self.assertIsNone(result['active_community'])
         self.assertIsNone(result['active_membership'])
@@ -162,6 +166,61 @@ class ActiveCommunityContextProcessorTest(TestCase):
         request.user = self.user1
         self._add_session_to_request(request)
 
-        result = active_community(request)
+        result = resolve_active_community(request)
 
         self.assertEqual(result['active_community'], self.community2)
+
+
+class ActiveCommunityCacheTest(TestCase):
+    """メンバーシップ要約のキャッシュと遅延評価"""
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.factory = RequestFactory()
+        self.user = make_user(user_name='キャッシュユーザー', email='cache@example.com')
+        self.community = make_community(name='キャッシュ集会', owner=self.user)
+
+    def _request(self):
+        request = self.factory.get('/')
+        request.user = self.user
+        middleware = SessionMiddleware(lambda x: None)
+        middleware.process_request(request)
+        return request
+
+    def test_unreferenced_context_costs_no_queries(self):
+        request = self._request()
+
+        with CaptureQueriesContext(connection) as queries:
+            active_community(request)
+
+        self.assertEqual(len(queries.captured_queries), 0)
+
+    def test_warm_cache_costs_no_queries(self):
+        resolve_active_community(self._request())
+
+        request = self._request()
+        with CaptureQueriesContext(connection) as queries:
+            context = active_community(request)
+            self.assertEqual(context['active_community'].name, 'キャッシュ集会')
+            self.assertTrue(context['active_membership'].is_owner)
+            self.assertEqual(len(context['user_communities']), 1)
+
+        self.assertEqual(len(queries.captured_queries), 0)
+        self.assertEqual(context['active_community'], self.community)
+
+    def test_membership_and_community_changes_refresh_summary(self):
+        resolve_active_community(self._request())
+
+        other = make_community(name='追加集会')
+        make_community_member(other, self.user)
+        self.community.name = '改名した集会'
+        self.community.save()
+
+        result = resolve_active_community(self._request())
+        names = [membership.community.name for membership in result['user_communities']]
+        self.assertEqual(names, ['改名した集会', '追加集会'])
+
+        CommunityMember.objects.filter(community=other, user=self.user).delete()
+        result = resolve_active_community(self._request())
+        self.assertEqual(len(result['user_communities']), 1)
@@ -21,6 +21,7 @@ from community.forms_processor import (
     reject_community_registration,
 )
 from community.models import CommunityMember
+from ta_hub.models import OutboxMessage
 from tests.factories import (
     make_community as _make_community_factory,
     make_user,
@@ -58,7 +59,8 @@ class ApproveCommunityRegistrationTest(TestCase):
 
     def test_approves_community_and_sends_email(self):
         """status が approved になり、オーナーへメール送信される"""
-        approve_community_registration(self.community, self.request)
+        with self.captureOnCommitCallbacks(execute=True):
+            approve_community_registration(self.community, self.request)
         self.community.refresh_from_db()
         self.assertEqual(self.community.status, "approved")
         self.assertEqual(len(mail.outbox), 1)
@@ -70,7 +72,8 @@ class ApproveCommunityRegistrationTest(TestCase):
         self.community.tags = ["tech", "partner"]
         self.community.save(update_fields=["tags"])
 
-        approve_community_registration(self.community, self.request)
+        with self.captureOnCommitCallbacks(execute=True):
+            approve_community_registration(self.community, self.request)
 
         html_message = mail.outbox[0].alternatives[0][0]
         self.assertIn("協力団体としての遵守条件", html_message)
@@ -95,7 +98,8 @@ class ApproveCommunityRegistrationTest(TestCase):
                 self.community.save(update_fields=["tags"])
                 mail.outbox.clear()
 
-                approve_community_registration(self.community, self.request)
+                with self.captureOnCommitCallbacks(execute=True):
+                    approve_community_registration(self.community, self.request)
 
                 html_message = mail.outbox[0].alternatives[0][0]
                 self.assertIn(summary, html_message)
@@ -107,7 +111,8 @@ class ApproveCommunityRegistrationTest(TestCase):
         """オーナーが email 未設定でもクラッシュせず status は approved になる"""
         self.owner.email = ""
         self.owner.save()
-        approve_community_registration(self.community, self.request)
+        with self.captureOnCommitCallbacks(execute=True):
+            approve_community_registration(self.community, self.request)
         self.community.refresh_from_db()
         self.assertEqual(self.community.status, "approved")
         self.assertEqual(len(mail.outbox), 0)
@@ -115,7 +120,8 @@ class ApproveCommunityRegistrationTest(TestCase):
     def test_skips_email_when_no_owner(self):
         """オーナー不在でもクラッシュせず status は approved"""
         community_no_owner = _make_community(owner=None, name="NoOwnerCommunity")
-        approve_community_registration(community_no_owner, self.request)
+        with self.captureOnCommitCallbacks(execute=True):
+            approve_community_registration(community_no_owner, self.request)
         community_no_owner.refresh_from_db()
         self.assertEqual(community_no_owner.status, "approved")
         self.assertEqual(len(mail.outbox), 0)
@@ -131,7 +137,8 @@ class RejectCommunityRegistrationTest(TestCase):
 
     def test_rejects_community_and_sends_email(self):
         """status が rejected になり、オーナーへメール送信される"""
-        reject_community_registration(self.community)
+        with self.captureOnCommitCallbacks(execute=True):
+            reject_community_registration(self.community)
         self.community.refresh_from_db()
         self.assertEqual(self.community.status, "rejected")
         self.assertEqual(len(mail.outbox), 1)
@@ -142,7 +149,8 @@ class RejectCommunityRegistrationTest(TestCase):
         """オーナーが email 未設定でも status は rejected"""
         self.owner.email = ""
         self.owner.save()
-        reject_community_registration(self.community)
+        with self.captureOnCommitCallbacks(execute=True):
+            reject_community_registration(self.community)
         self.community.refresh_from_db()
         self.assertEqual(self.community.status, "rejected")
         self.assertEqual(len(mail.outbox), 0)
@@ -160,44 +168,45 @@ class NotifyNewCommunityRegistrationTest(TestCase):
     @override_settings(DISCORD_WEBHOOK_URL="")
     def test_skipped_when_webhook_url_empty(self):
         """DISCORD_WEBHOOK_URL 空で何もしない"""
-        with patch("community.forms_processor.post_discord_webhook") as mock_post:
-            notify_new_community_registration(self.community, self.request)
-            mock_post.assert_not_called()
+        notify_new_community_registration(self.community, self.request)
+        self.assertFalse(OutboxMessage.objects.exists())
 
     @override_settings(DISCORD_WEBHOOK_URL="https://discord.com/api/webhooks/123/abc")
-    @patch("community.forms_processor.post_discord_webhook")
+    @patch("ta_hub.outbox.send_discord_webhook")
     def test_posts_to_webhook_when_url_set(self, mock_post):
-        """DISCORD_WEBHOOK_URL 設定時に POST される"""
+        """DISCORD_WEBHOOK_URL 設定時にコミット後 POST される"""
         mock_post.return_value = MagicMock(ok=True, status_code=200)
-        notify_new_community_registration(self.community, self.request)
+        with self.captureOnCommitCallbacks(execute=True):
+            notify_new_community_registration(self.community, self.request)
         mock_post.assert_called_once()
         args = mock_post.call_args.args
         self.assertEqual(args[0], "https://discord.com/api/webhooks/123/abc")
         self.assertIn("content", args[1])
         self.assertIn(self.community.name, args[1]["content"])
 
-    @override_settings(DISCORD_WEBHOOK_URL="https://discord.com/api/webhooks/123/abc")
-    @patch("community.forms_processor.post_discord_webhook")
+    @override_settings(DISCORD_WEBHOOK_URL="https://discord.com/api/webhooks/123456789/secret-token")
+    @patch("ta_hub.outbox.send_discord_webhook")
     def test_swallows_request_exception(self, mock_post):
-        """gateway最終失敗を安全にlogし、呼び出し元へ伝播しない."""
+        """配信失敗を安全にlogし、呼び出し元へ伝播しない."""
         sensitive_url = "https://discord.com/api/webhooks/123456789/secret-token"
         mock_post.side_effect = requests.RequestException(
             f"network down for {sensitive_url}",
         )
-        with self.assertLogs(
-            "community.forms_processor",
-            level="WARNING",
-        ) as log_context:
-            notify_new_community_registration(self.community, self.request)
+        with self.assertLogs("ta_hub.outbox", level="WARNING") as log_context:
+            with self.captureOnCommitCallbacks(execute=True):
+                notify_new_community_registration(self.community, self.request)
         mock_post.assert_called_once()
         logs = "\n".join(log_context.output)
-        self.assertIn(f"community_id={self.community.pk}", logs)
+        self.assertIn(f"community_registration:{self.community.pk}", logs)
         self.assertIn("error_type=RequestException", logs)
         self.assertIn("status_code=None", logs)
         self.assertNotIn(sensitive_url, logs)
         self.assertNotIn("secret-token", logs)
         self.assertNotIn("network down", logs)
         self.assertNotIn("Traceback", logs)
+        message = OutboxMessage.objects.get()
+        self.assertEqual(message.status, OutboxMessage.Status.PENDING)
+        self.assertNotIn("secret-token", message.destination_key + message.last_error)
 
 
 class CloseCommunityAndCleanupTest(TestCase):
@@ -0,0 +1,91 @@
+"""集会の権限判定（community.permissions）のテスト"""
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from community.models import CommunityMember
+from community.permissions import community_permission_scope, get_community_permissions
+from tests.factories import (
+    make_community,
+    make_community_member,
+    make_discord_linked_user,
+    make_event,
+    make_event_detail,
+    make_user,
+)
+
+
+def _membership_queries(queries):
+    table = CommunityMember._meta.db_table
+    return [query for query in queries.captured_queries if table in query['sql']]
+
+
+class CommunityPermissionResolverTest(TestCase):
+    """リクエストスコープ内のメンバーシップ読み込みと無効化"""
+
+    def setUp(self):
+        self.user = make_user(user_name='権限ユーザー', email='perm@example.com')
+        self.owned = make_community(name='主催集会', owner=self.user)
+        self.staffed = make_community(name='スタッフ集会')
+        make_community_member(self.staffed, self.user, role=CommunityMember.Role.STAFF)
+        self.other = make_community(name='無関係集会')
+
+    def test_permission_checks_share_one_query_within_scope(self):
+        with community_permission_scope(), CaptureQueriesContext(connection) as queries:
+            self.assertTrue(self.owned.is_owner(self.user))
+            self.assertTrue(self.staffed.is_manager(self.user))
+            self.assertFalse(self.staffed.can_delete(self.user))
+            self.assertFalse(self.other.can_edit(self.user))
+
+        self.assertEqual(len(queries.captured_queries), 1)
+
+    def test_membership_change_mid_scope_is_visible(self):
+        with community_permission_scope():
+            self.assertFalse(self.other.can_edit(self.user))
+            member = make_community_member(self.other, self.user)
+            self.assertTrue(self.other.can_edit(self.user))
+            member.delete()
+            self.assertFalse(self.other.can_edit(self.user))
+
+    def test_outside_scope_queries_each_time(self):
+        self.assertIsNone(get_community_permissions(self.user))
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertTrue(self.owned.is_owner(self.user))
+            self.assertTrue(self.staffed.is_manager(self.user))
+
+        self.assertEqual(len(queries.captured_queries), 2)
+
+
+class PermissionQueryCountTest(TestCase):
+    """ページ表示中に CommunityMember を読み直さない"""
+
+    def setUp(self):
+        self.user = make_discord_linked_user(user_name='主催者', email='owner@example.com')
+        self.community = make_community(name='クエリ集会', owner=self.user)
+        self.event = make_event(self.community)
+        self.detail = make_event_detail(self.event, status='pending', theme='審査中の発表')
+        self.client.force_login(self.user)
+
+    def test_event_detail_reads_memberships_once(self):
+        url = reverse('event:detail', kwargs={'pk': self.detail.pk})
+        self.client.get(url)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context['is_community_owner'])
+        self.assertEqual(len(_membership_queries(queries)), 1)
+
+    def test_my_list_reads_memberships_once(self):
+        url = reverse('event:my_list')
+        self.client.get(url)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['active_community'], self.community)
+        self.assertEqual(len(_membership_queries(queries)), 1)
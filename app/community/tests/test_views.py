@@ -153,10 +153,11 @@ class AcceptViewTest(TestCase):
         # 管理者ユーザーでログイン
         self.client.force_login(self.admin_user)
 
-        # 未承認集会を承認（pkパラメータを指定）
-        response = self.client.post(
-            reverse('community:accept', kwargs={'pk': self.pending_community.pk})
-        )
+        # 未承認集会を承認（pkパラメータを指定）。メールはコミット後に配信される
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse('community:accept', kwargs={'pk': self.pending_community.pk})
+            )
 
         # リダイレクトを確認
         self.assertRedirects(response, reverse('community:waiting_list'))
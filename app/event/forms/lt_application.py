@@ -95,7 +95,9 @@ class LTApplicationForm(forms.Form):
         max_length=200,
         widget=forms.TextInput(attrs={
             'class': 'form-control',
-            'placeholder': 'VRChat表示名を入力してください'
+            'placeholder': 'VRChat表示名を入力してください',
+            'list': 'speaker-suggestions',
+            'autocomplete': 'off',
         }),
         help_text='VRChatの表示名を入力してください。送信するとアカウントの表示名としても保存されます。'
     )
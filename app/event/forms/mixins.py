@@ -23,8 +23,12 @@ class EventDetailMediaFormMixin:
         instance = super().save(commit=commit)
         if commit:
             from event.services.media_service import ensure_pdf_thumbnail
+            from event.services.source_material import schedule_source_material_preparation
             from twitter.services.tweet_generation import sync_slide_share_queue_image
 
             ensure_pdf_thumbnail(instance, save=True)
             sync_slide_share_queue_image(instance)
+            # 記事生成用の抽出テキスト・字幕はアップロード時点で用意しておく
+            if {'slide_file', 'youtube_url'} & set(self.changed_data):
+                schedule_source_material_preparation(instance)
         return instance
@@ -3,15 +3,14 @@ from __future__ import annotations
 
 import json
 import logging
-import os
 from datetime import date, datetime
 from typing import Protocol
 
 from django.conf import settings
-from openai import OpenAI
 from pydantic import BaseModel, Field
 
 from website.constants import OPENROUTER_BASE_URL, build_openrouter_extra_headers
+from website.llm_gateway import GeminiProvider, LlmRequest, OpenAICompatibleProvider, get_llm_gateway
 
 logger = logging.getLogger(__name__)
 
@@ -19,6 +18,8 @@ DEFAULT_RECURRENCE_LLM_PROVIDER = "openrouter"
 DEFAULT_RECURRENCE_MODEL = "google/gemini-2.0-flash-exp"
 OPENROUTER_EXTRA_HEADERS = build_openrouter_extra_headers()
 SYSTEM_PROMPT = "あなたは定期イベントの日付を生成する専門家です。必ず指定されたJSON形式で出力してください。"
+# 同じ条件・履歴のプロンプトには同じ日付を返してよいので、応答を1日キャッシュする
+EVENT_DATE_CACHE_TTL = 60 * 60 * 24
 
 
 class EventDateLlmService(Protocol):
@@ -57,6 +58,12 @@ class OpenAICompatibleEventDateLlmService:
 
     def __init__(self, config: OpenAICompatibleProviderConfig):
         self.config = config
+        self.provider = OpenAICompatibleProvider(
+            config.provider,
+            api_key_env=config.api_key_env,
+            base_url=config.base_url,
+            extra_headers=config.extra_headers,
+        )
 
     def generate_event_dates(self, prompt: str) -> list[date]:
         """Generate event dates with an OpenAI-compatible provider.
@@ -70,27 +77,11 @@ class OpenAICompatibleEventDateLlmService:
         Raises:
             ValueError: 必須APIキーが環境変数にない場合。
         """
-        api_key = os.environ.get(self.config.api_key_env)
-        if not api_key:
-            raise ValueError(f"{self.config.api_key_env} is required for {self.config.provider}")
-
-        client_kwargs = {"api_key": api_key}
-        if self.config.base_url:
-            client_kwargs["base_url"] = self.config.base_url
-
-        client = OpenAI(**client_kwargs)
-        completion = client.chat.completions.create(
-            extra_headers=self.config.extra_headers,
-            model=self.config.model_name,
-            messages=[
-                {"role": "system", "content": SYSTEM_PROMPT},
-                {"role": "user", "content": prompt},
-            ],
-            temperature=0.3,
-            max_tokens=2000,
+        response = get_llm_gateway().complete(
+            _build_event_date_request(self.config.model_name, prompt),
+            provider=self.provider,
         )
-        text = completion.choices[0].message.content or ""
-        return extract_event_dates(text)
+        return extract_event_dates(response.text)
 
 
 class GeminiEventDateLlmService:
@@ -98,6 +89,7 @@ class GeminiEventDateLlmService:
 
     def __init__(self, config: GeminiProviderConfig):
         self.config = config
+        self.provider = GeminiProvider(api_key_env=config.api_key_env)
 
     def generate_event_dates(self, prompt: str) -> list[date]:
         """Generate event dates with Google Gemini.
@@ -111,22 +103,23 @@ class GeminiEventDateLlmService:
         Raises:
             ValueError: 必須APIキーが環境変数またはsettingsにない場合。
         """
-        api_key = os.environ.get(self.config.api_key_env) or getattr(settings, self.config.api_key_env, None)
-        if not api_key:
-            raise ValueError(f"{self.config.api_key_env} is required for gemini")
-
-        import google.generativeai as genai
-
-        genai.configure(api_key=api_key)
-        model = genai.GenerativeModel(_normalize_gemini_model_name(self.config.model_name))
-        response = model.generate_content(
-            [SYSTEM_PROMPT, prompt],
-            generation_config={
-                "temperature": 0.3,
-                "max_output_tokens": 2000,
-            },
+        response = get_llm_gateway().complete(
+            _build_event_date_request(_normalize_gemini_model_name(self.config.model_name), prompt),
+            provider=self.provider,
         )
-        return extract_event_dates(getattr(response, "text", "") or "")
+        return extract_event_dates(response.text)
+
+
+def _build_event_date_request(model_name: str, prompt: str) -> LlmRequest:
+    return LlmRequest.chat(
+        SYSTEM_PROMPT,
+        prompt,
+        model=model_name,
+        temperature=0.3,
+        max_tokens=2000,
+        task="recurrence_dates",
+        cache_ttl=EVENT_DATE_CACHE_TTL,
+    )
 
 
 def get_event_date_llm_service() -> EventDateLlmService:
@@ -3,15 +3,38 @@ import logging
 from django.core.management.base import BaseCommand, CommandError
 from django.db.models import Q
 
-from event.services.media_service import ensure_pdf_thumbnail
 from event.models import EventDetail
+from event.services.media_service import needs_pdf_thumbnail, store_pdf_thumbnail
+from event.services.slide_pdf import get_slide_pdf
+from event.thumbnail import render_pdf_thumbnail_jpeg
 from twitter.services.tweet_generation import sync_slide_share_queue_image
+from utils.batch_processing import (
+    BatchCheckpoint,
+    BatchExecutor,
+    BatchOptions,
+    BatchProgress,
+    add_batch_arguments,
+    iter_keyset_batches,
+)
 
 logger = logging.getLogger(__name__)
 
+CHECKPOINT_NAME = "backfill_event_detail_pdf_thumbnails"
+
+
+def _store_thumbnail(job) -> None:
+    """レンダリング済みサムネイルをストレージへ書き込む（I/Oスレッドで実行）."""
+    event_detail, image_bytes = job
+    store_pdf_thumbnail(event_detail, image_bytes, save=False)
+
 
 class Command(BaseCommand):
-    """PDFスライドからEventDetailサムネイルを一括再生成する."""
+    """PDFスライドからEventDetailサムネイルを一括再生成する.
+
+    R2 からのPDF読み出しとサムネイル書き込みはスレッドプール、pdfium による
+    レンダリングはプロセスプールで並列実行する。チャンクごとにチェックポイントを保存し、
+    Cloud Run Job のタイムアウト後も `--resume` で続きから再開できる。
+    """
 
     help = "slide_file がある EventDetail のサムネイルを PDF 先頭ページから再生成します。"
 
@@ -35,64 +58,137 @@ class Command(BaseCommand):
             "--ids",
             help="対象 EventDetail ID をカンマ区切りで指定します。",
         )
+        # PDFはチャンク単位でメモリに保持するため、既定のチャンクを小さめにする
+        add_batch_arguments(parser, default_batch_size=20)
 
     def handle(self, *args, **options):
         dry_run = options["dry_run"]
         force = options["force"]
         limit = options.get("limit")
         target_ids = self._parse_ids(options.get("ids"))
+        try:
+            batch_options = BatchOptions.from_options(options)
+        except ValueError as exc:
+            raise CommandError(str(exc)) from exc
 
-        queryset = EventDetail.objects.exclude(slide_file="").exclude(slide_file__isnull=True).order_by("pk")
+        queryset = EventDetail.objects.exclude(slide_file="").exclude(slide_file__isnull=True)
         if not force:
             queryset = queryset.filter(Q(thumbnail_image="") | Q(thumbnail_image__isnull=True))
         if target_ids is not None:
             queryset = queryset.filter(pk__in=target_ids)
-        if limit is not None:
-            if limit < 1:
-                raise CommandError("--limit は1以上を指定してください。")
-            queryset = queryset[:limit]
+        if limit is not None and limit < 1:
+            raise CommandError("--limit は1以上を指定してください。")
 
-        event_details = list(queryset)
+        # --ids / --limit の部分実行は全件実行のチェックポイントを読み書きしない
+        # （保存すると全件実行の再開位置を上書きし、完了時には消してしまうため）
+        partial_run = target_ids is not None or limit is not None
+        checkpoint = None if partial_run else BatchCheckpoint(CHECKPOINT_NAME, scope="force" if force else "")
+        if partial_run and batch_options.resume:
+            self.stdout.write(self.style.WARNING("--ids / --limit 指定時は --resume を無視します。"))
+        after_pk = checkpoint.load() if checkpoint is not None and batch_options.resume else None
+        if after_pk is not None:
+            self.stdout.write(f"チェックポイントから再開: id > {after_pk}")
+            queryset = queryset.filter(pk__gt=after_pk)
+
+        total = queryset.count()
+        if limit is not None:
+            total = min(total, limit)
         self.stdout.write(
-            f"対象 EventDetail: {len(event_details)}件 "
+            f"対象 EventDetail: {total}件 "
             f"(force={force}, dry_run={dry_run})"
         )
 
+        batches = iter_keyset_batches(queryset, batch_size=batch_options.batch_size, limit=limit)
         if dry_run:
-            for event_detail in event_details:
-                self.stdout.write(
-                    f"DRY-RUN id={event_detail.pk} slide_file={event_detail.slide_file.name} "
-                    f"thumbnail_image={event_detail.thumbnail_image.name or '-'}"
-                )
+            for chunk in batches:
+                for event_detail in chunk:
+                    self.stdout.write(
+                        f"DRY-RUN id={event_detail.pk} slide_file={event_detail.slide_file.name} "
+                        f"thumbnail_image={event_detail.thumbnail_image.name or '-'}"
+                    )
             return
 
-        generated = 0
-        skipped = 0
-        failed = []
+        self.generated = 0
+        self.skipped = 0
+        self.failed = []
+        progress = BatchProgress(self.stdout.write, total=total)
 
-        for event_detail in event_details:
-            try:
-                if ensure_pdf_thumbnail(event_detail, save=True, overwrite=force):
-                    generated += 1
-                    sync_slide_share_queue_image(event_detail)
-                    self.stdout.write(
-                        f"UPDATED id={event_detail.pk} thumbnail_image={event_detail.thumbnail_image.name}"
-                    )
-                else:
-                    skipped += 1
-                    self.stdout.write(f"SKIPPED id={event_detail.pk}")
-            except Exception as exc:
-                logger.exception("EventDetail PDFサムネイル再生成に失敗しました: id=%s", event_detail.pk)
-                failed.append((event_detail.pk, str(exc)))
-                self.stderr.write(f"FAILED id={event_detail.pk}: {exc}")
+        with BatchExecutor(
+            cpu_workers=batch_options.cpu_workers, io_workers=batch_options.io_workers
+        ) as executor:
+            for chunk in batches:
+                self._process_chunk(chunk, executor=executor, force=force)
+                progress.advance(len(chunk))
+                if checkpoint is not None:
+                    checkpoint.save(chunk[-1].pk, processed=progress.processed)
+        if checkpoint is not None:
+            checkpoint.clear()
 
         self.stdout.write(
             self.style.SUCCESS(
-                f"完了: updated={generated}, skipped={skipped}, failed={len(failed)}"
+                f"完了: updated={self.generated}, skipped={self.skipped}, failed={len(self.failed)}"
+            )
+        )
+        if self.failed:
+            raise CommandError(f"{len(self.failed)}件のサムネイル生成に失敗しました。")
+
+    def _process_chunk(self, chunk, *, executor: BatchExecutor, force: bool) -> None:
+        """1チャンク分を PDF読み出し(I/O) → レンダリング(CPU) → 書き込み(I/O) → DB保存 の順に処理する."""
+        targets = []
+        for event_detail in chunk:
+            if needs_pdf_thumbnail(event_detail, overwrite=force):
+                targets.append(event_detail)
+            else:
+                self.skipped += 1
+                self.stdout.write(f"SKIPPED id={event_detail.pk}")
+
+        loaded = []
+        for outcome in executor.map_io(get_slide_pdf, targets):
+            if outcome.ok:
+                loaded.append((outcome.item, outcome.result))
+            else:
+                self._record_failure(outcome.item, outcome.error)
+
+        # 同じ内容のPDFのレンダリング結果がキャッシュにあればプロセスプールへ回さない
+        jobs = []
+        to_render = []
+        for event_detail, slide_pdf in loaded:
+            cached = slide_pdf.cached_thumbnail_jpeg()
+            if cached is not None:
+                jobs.append((event_detail, cached))
+            else:
+                to_render.append((event_detail, slide_pdf))
+
+        rendered = executor.map_cpu(render_pdf_thumbnail_jpeg, [slide_pdf.data for _, slide_pdf in to_render])
+        for (event_detail, slide_pdf), outcome in zip(to_render, rendered):
+            if outcome.ok:
+                slide_pdf.remember_thumbnail_jpeg(outcome.result)
+                jobs.append((event_detail, outcome.result))
+            else:
+                self._record_failure(event_detail, outcome.error)
+
+        for outcome in executor.map_io(_store_thumbnail, jobs):
+            event_detail, _ = outcome.item
+            if not outcome.ok:
+                self._record_failure(event_detail, outcome.error)
+                continue
+            try:
+                event_detail.save(update_fields=["thumbnail_image"])
+                sync_slide_share_queue_image(event_detail)
+            except Exception as exc:
+                self._record_failure(event_detail, exc)
+                continue
+            self.generated += 1
+            self.stdout.write(
+                f"UPDATED id={event_detail.pk} thumbnail_image={event_detail.thumbnail_image.name}"
             )
+
+    def _record_failure(self, event_detail: EventDetail, exc: BaseException) -> None:
+        logger.error(
+            "EventDetail PDFサムネイル再生成に失敗しました: id=%s", event_detail.pk, exc_info=exc
         )
-        if failed:
-            raise CommandError(f"{len(failed)}件のサムネイル生成に失敗しました。")
+        self.failed.append((event_detail.pk, str(exc)))
+        self.stderr.write(f"FAILED id={event_detail.pk}: {exc}")
 
     def _parse_ids(self, ids_value: str | None) -> list[int] | None:
         if not ids_value:
@@ -11,6 +11,7 @@ from pydantic import BaseModel, ConfigDict
 
 from community.models import CommunityMember
 from event.models import EventDetail
+from utils.fuzzy_index import FuzzyNameIndex
 
 ORGANIZER_SPLIT_RE = re.compile(r"[\s,、/／&＆+＋・|｜≺≻<>＜＞（）()]+")
 MANUAL_SPEAKER_USER_ALIASES = {
@@ -71,30 +72,6 @@ class MatchResult(BaseModel):
     candidates: tuple[UserCandidate, ...] = ()
 
 
-def levenshtein_distance(left: str, right: str, max_distance: int = 2) -> int:
-    """Return the Levenshtein distance, stopping once it exceeds max_distance."""
-    if left == right:
-        return 0
-    if abs(len(left) - len(right)) > max_distance:
-        return max_distance + 1
-
-    previous = list(range(len(right) + 1))
-    for row_index, left_char in enumerate(left, start=1):
-        current = [row_index]
-        row_min = current[0]
-        for column_index, right_char in enumerate(right, start=1):
-            insertion = current[column_index - 1] + 1
-            deletion = previous[column_index] + 1
-            substitution = previous[column_index - 1] + (left_char != right_char)
-            value = min(insertion, deletion, substitution)
-            current.append(value)
-            row_min = min(row_min, value)
-        if row_min > max_distance:
-            return max_distance + 1
-        previous = current
-    return previous[-1]
-
-
 class SpeakerMatcher:
     """Match saved LT speaker names to existing CustomUser.user_name values."""
 
@@ -104,6 +81,8 @@ class SpeakerMatcher:
         self.casefolded = self._group_by(lambda user: user.user_name.casefold())
         self.stripped = self._group_by(lambda user: user.user_name.strip())
         self.normalized = self._group_by(lambda user: normalize_name(user.user_name))
+        # tier6 の総当たりを避けるため、編集距離2以内の候補を引くインデックスを1回だけ作る
+        self.fuzzy = FuzzyNameIndex(users, key=lambda user: user.user_name.casefold(), max_distance=2)
 
     def match(self, event_detail: EventDetail, interactive: bool) -> MatchResult:
         speaker = event_detail.speaker
@@ -147,11 +126,7 @@ class SpeakerMatcher:
         if organizer_match is not None:
             return organizer_match
 
-        fuzzy_candidates = tuple(
-            user
-            for user in self.users
-            if levenshtein_distance(stripped_speaker.casefold(), user.user_name.casefold(), max_distance=2) <= 2
-        )
+        fuzzy_candidates = tuple(self.fuzzy.search(stripped_speaker.casefold()))
         if fuzzy_candidates:
             return MatchResult(
                 tier="tier6",
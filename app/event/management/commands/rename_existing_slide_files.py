@@ -12,6 +12,9 @@ R2バケットはローカル・本番で共有しているため、以下の4
 
 各フェーズは --apply 指定時のみ実体を変更する（デフォルト dry-run）。
 
+copy / cleanup の R2 操作はスレッドプールで並列実行する（--io-workers）。
+copy はチャンクごとにチェックポイントを保存し、中断後は --resume で続きから再開できる。
+
 phase=update-db は同一マッピングJSONで本番DBに対しても再実行できるよう冪等に設計。
 """
 
@@ -27,6 +30,14 @@ from django.db import transaction
 from django.db.models import Q
 
 from event.models import EventDetail
+from utils.batch_processing import (
+    BatchCheckpoint,
+    BatchExecutor,
+    BatchOptions,
+    BatchProgress,
+    add_batch_arguments,
+    iter_keyset_batches,
+)
 
 
 def _build_url_variants(media_host: str, old_name: str, new_name: str) -> list[tuple[str, str]]:
@@ -47,6 +58,31 @@ def _build_url_variants(media_host: str, old_name: str, new_name: str) -> list[t
 
 _UUID_PDF_RE = re.compile(r'^slide/[0-9a-f]{32}\.pdf$')
 
+COPY_CHECKPOINT_NAME = "rename_existing_slide_files:copy"
+
+
+def _copy_storage_object(job: tuple[str, str, bool]) -> str:
+    """R2上で旧→新へオブジェクトをコピーし、結果種別を返す（I/Oスレッドで実行）。"""
+    old, new, apply_changes = job
+    if not default_storage.exists(old):
+        return "missing_source"
+    if default_storage.exists(new):
+        return "skipped_existing"
+    if apply_changes:
+        with default_storage.open(old, "rb") as src:
+            default_storage.save(new, src)
+    return "copied"
+
+
+def _delete_storage_object(job: tuple[str, bool]) -> str:
+    """R2上の旧オブジェクトを削除し、結果種別を返す（I/Oスレッドで実行）。"""
+    old, apply_changes = job
+    if not default_storage.exists(old):
+        return "not_found"
+    if apply_changes:
+        default_storage.delete(old)
+    return "deleted"
+
 
 class Command(BaseCommand):
     help = "既存スライドPDFをUUID形式パスに移行する（phase: mapping/copy/update-db/cleanup）"
@@ -64,12 +100,17 @@ class Command(BaseCommand):
             default="data.vrc-ta-hub.com",
             help="contents 内URL書き換えで対象とするホスト名",
         )
+        add_batch_arguments(parser)
 
     def handle(self, *args, **opts):
         phase = opts["phase"]
         mapping_path = Path(opts["mapping_file"])
         apply_changes = opts["apply"]
         media_host = opts["media_host"]
+        try:
+            self.batch_options = BatchOptions.from_options(opts)
+        except ValueError as exc:
+            raise CommandError(str(exc)) from exc
 
         if phase == "mapping":
             self._phase_mapping(mapping_path, apply_changes)
@@ -86,17 +127,20 @@ class Command(BaseCommand):
         qs = EventDetail.objects.exclude(Q(slide_file="") | Q(slide_file__isnull=True)).order_by("pk")
         mapping: dict[str, str] = {}
         skipped = 0
-        for ed in qs:
-            old = ed.slide_file.name
-            if _UUID_PDF_RE.match(old):
-                skipped += 1
-                continue
-            if old in mapping:
-                continue
-            mapping[old] = f"slide/{uuid.uuid4().hex}.pdf"
+        total = 0
+        for chunk in iter_keyset_batches(qs.only("pk", "slide_file"), batch_size=self.batch_options.batch_size):
+            total += len(chunk)
+            for ed in chunk:
+                old = ed.slide_file.name
+                if _UUID_PDF_RE.match(old):
+                    skipped += 1
+                    continue
+                if old in mapping:
+                    continue
+                mapping[old] = f"slide/{uuid.uuid4().hex}.pdf"
 
         self.stdout.write(
-            f"total_with_slide_file={qs.count()} to_rename={len(mapping)} already_uuid={skipped}"
+            f"total_with_slide_file={total} to_rename={len(mapping)} already_uuid={skipped}"
         )
         for o, n in list(mapping.items())[:3]:
             self.stdout.write(f"  {o} -> {n}")
@@ -110,38 +154,45 @@ class Command(BaseCommand):
 
     def _phase_copy(self, path: Path, apply_changes: bool) -> None:
         mapping = self._load_mapping(path)
-        copied = 0
-        skipped_existing = 0
-        missing_source = 0
+        counts = {"copied": 0, "skipped_existing": 0, "missing_source": 0}
         errors = 0
 
-        for old, new in mapping.items():
-            if not default_storage.exists(old):
-                self.stderr.write(f"MISSING source: {old}")
-                missing_source += 1
-                continue
-            if default_storage.exists(new):
-                skipped_existing += 1
-                continue
-            if not apply_changes:
-                copied += 1
-                continue
-            try:
-                with default_storage.open(old, "rb") as src:
-                    default_storage.save(new, src)
-                copied += 1
-                if copied % 20 == 0:
-                    self.stdout.write(f"  copied={copied}/{len(mapping)}")
-            except Exception as exc:
-                self.stderr.write(f"ERROR copying {old} -> {new}: {exc}")
-                errors += 1
+        # チェックポイントはマッピングJSONごとに分け、旧名の昇順で処理済み位置を記録する
+        checkpoint = BatchCheckpoint(COPY_CHECKPOINT_NAME, scope=str(path.resolve()))
+        items = sorted(mapping.items())
+        resume_after = checkpoint.load() if self.batch_options.resume and apply_changes else None
+        if resume_after is not None:
+            items = [(old, new) for old, new in items if old > resume_after]
+            self.stdout.write(f"resume from checkpoint: after={resume_after} remaining={len(items)}")
+
+        batch_size = self.batch_options.batch_size
+        progress = BatchProgress(self.stdout.write, total=len(items), label="  copy")
+        with BatchExecutor(io_workers=self.batch_options.io_workers) as executor:
+            for start in range(0, len(items), batch_size):
+                chunk = items[start:start + batch_size]
+                jobs = [(old, new, apply_changes) for old, new in chunk]
+                for outcome in executor.map_io(_copy_storage_object, jobs):
+                    old, new, _ = outcome.item
+                    if not outcome.ok:
+                        self.stderr.write(f"ERROR copying {old} -> {new}: {outcome.error}")
+                        errors += 1
+                        continue
+                    counts[outcome.result] += 1
+                    if outcome.result == "missing_source":
+                        self.stderr.write(f"MISSING source: {old}")
+                progress.advance(len(chunk))
+                if apply_changes:
+                    checkpoint.save(chunk[-1][0], processed=progress.processed)
+
+        if apply_changes and not errors and not counts["missing_source"]:
+            checkpoint.clear()
 
         verb = "COPIED" if apply_changes else "DRY-RUN COPY"
         msg = (
-            f"{verb}: copied={copied} skipped_existing={skipped_existing} "
-            f"missing_source={missing_source} errors={errors}"
+            f"{verb}: copied={counts['copied']} skipped_existing={counts['skipped_existing']} "
+            f"missing_source={counts['missing_source']} errors={errors}"
         )
-        if errors or missing_source:
+        if errors or counts["missing_source"]:
             raise CommandError(msg)
         self.stdout.write(self.style.SUCCESS(msg))
 
@@ -247,6 +298,7 @@ class Command(BaseCommand):
         not_found = 0
         still_referenced = 0
 
+        deletable: list[str] = []
         for old in mapping:
             # DB上で旧名がまだ参照されていないことを確認（防御的）
             if EventDetail.objects.filter(slide_file=old).exists():
@@ -259,12 +311,18 @@ class Command(BaseCommand):
                 still_referenced += 1
                 self.stderr.write(f"STILL REFERENCED in contents: {old}")
                 continue
-            if not default_storage.exists(old):
+            deletable.append(old)
+
+        # DB確認は呼び出し元スレッドで済ませ、R2の存在確認と削除だけを並列化する
+        with BatchExecutor(io_workers=self.batch_options.io_workers) as executor:
+            outcomes = executor.map_io(_delete_storage_object, [(old, apply_changes) for old in deletable])
+        for outcome in outcomes:
+            if not outcome.ok:
+                raise CommandError(f"cleanup failed: {outcome.item[0]}: {outcome.error}")
+            if outcome.result == "not_found":
                 not_found += 1
-                continue
-            if apply_changes:
-                default_storage.delete(old)
-            deleted += 1
+            else:
+                deleted += 1
 
         verb = "DELETED" if apply_changes else "DRY-RUN DELETE"
         self.stdout.write(
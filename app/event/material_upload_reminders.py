@@ -1,30 +1,41 @@
-"""発表資料アップロード依頼メールの対象抽出と送信を扱う。"""
+"""発表資料アップロード依頼メールの対象抽出と送信を扱う。
+
+一括モードでは同じ備考を1回だけ判定し、空の備考は LLM に問い合わせない（decide_material_reminders）。
+送信結果のログ（MaterialUploadReminderLog）は、最後にまとめて bulk_create せず、メール1通の送信結果が
+出るたびに保存する。ジョブが送信の途中で落ちても送信済みの分はログが残り、再実行で二重送信しない
+（ログの INSERT は送信1通につき1回で、SMTP の往復に比べて十分小さい）。
+"""
 from __future__ import annotations
 
 import json
 import logging
-import os
 from dataclasses import dataclass
 from datetime import date
 from typing import Literal, Protocol
 
 from django.conf import settings
-from django.core.mail import send_mail
+from django.core.mail import EmailMultiAlternatives
 from django.db.models import Q
 from django.db import connections
 from django.template.loader import render_to_string
 from django.urls import reverse
 from django.utils import timezone
-from openai import OpenAI
 from pydantic import BaseModel, Field, ValidationError
 
 from event.models import EventDetail, MaterialUploadReminderLog
-from website.constants import OPENROUTER_BASE_URL, build_openrouter_extra_headers, build_site_url
+from utils.batch_processing import BatchExecutor
+from website.constants import build_site_url
+from website.llm_gateway import LlmConfigurationError, LlmRequest, get_llm_gateway, get_openrouter_provider
+from website.mail_dispatch import MailNotSentError, build_email, send_email_batch
 
 logger = logging.getLogger(__name__)
 
 MATERIAL_UPLOAD_HISTORY_URL = "https://vrc-ta-hub.com/event/detail/history/"
 DEFAULT_MATERIAL_REMINDER_MODEL = "google/gemini-2.5-flash-lite-preview-06-17"
+# 同じ備考には同じ判定を返してよいので、再実行・同文の備考では判定を使い回す（1日）
+MATERIAL_REMINDER_DECISION_CACHE_TTL = 60 * 60 * 24
+# 一括判定で同時に問い合わせる備考の最大数（LLM ゲートウェイ全体の同時実行制限も別にかかる）
+DEFAULT_MATERIAL_REMINDER_DECISION_WORKERS = 4
 MATERIAL_REMINDER_SYSTEM_PROMPT = """
 あなたは発表後の資料アップロード依頼メールを送ってよいか判定する運営補助です。
 発表申請時の備考を読み、資料・スライド・YouTube・動画・録画・アーカイブなどを
@@ -52,6 +63,15 @@ class MaterialReminderDecision(BaseModel):
     matched_intent: str = Field(alias="matchedIntent")
 
 
+# 備考が空なら公開しない意向はないので LLM に問い合わせずこの判定を使う
+EMPTY_NOTE_DECISION = MaterialReminderDecision(
+    shouldSend=True,
+    confidence="high",
+    reason="備考欄が空のため公開しない意向はありません",
+    matchedIntent="none",
+)
+
+
 class MaterialReminderDecisionService(Protocol):
     """備考テキストから資料依頼メールの送信可否を判定する。"""
 
@@ -83,31 +103,27 @@ class OpenRouterMaterialReminderDecisionService:
         Raises:
             ValueError: APIキー未設定、LLM応答不正、またはAPI呼び出し失敗の場合。
         """
-        api_key = os.environ.get("OPENROUTER_API_KEY")
-        if not api_key:
-            raise ValueError("OPENROUTER_API_KEY is required for material reminder decision")
-
+        provider = get_openrouter_provider()
         model_name = self.model_name.split(":", 1)[0]
-        if not any(connection.in_atomic_block for connection in connections.all()):
-            connections.close_all()
+        request = LlmRequest.chat(
+            MATERIAL_REMINDER_SYSTEM_PROMPT,
+            f"備考欄:\n{_sanitize_note_for_prompt(note_text)}",
+            model=model_name,
+            temperature=0.1,
+            max_tokens=400,
+            task="material_reminder_decision",
+            cache_ttl=MATERIAL_REMINDER_DECISION_CACHE_TTL,
+        )
+        _release_db_connections()
 
         try:
-            client = OpenAI(base_url=OPENROUTER_BASE_URL, api_key=api_key)
-            response = client.chat.completions.create(
-                extra_headers=build_openrouter_extra_headers(),
-                model=model_name,
-                messages=[
-                    {"role": "system", "content": MATERIAL_REMINDER_SYSTEM_PROMPT},
-                    {"role": "user", "content": f"備考欄:\n{_sanitize_note_for_prompt(note_text)}"},
-                ],
-                temperature=0.1,
-                max_tokens=400,
-            )
+            response = get_llm_gateway().complete(request, provider=provider)
+        except LlmConfigurationError as exc:
+            raise ValueError("OPENROUTER_API_KEY is required for material reminder decision") from exc
         except Exception as exc:
             raise ValueError("material reminder LLM request failed") from exc
 
-        text = response.choices[0].message.content or ""
-        return parse_material_reminder_decision(text)
+        return parse_material_reminder_decision(response.text)
 
 
 def parse_material_reminder_decision(text: str) -> MaterialReminderDecision:
@@ -145,11 +161,28 @@ def send_material_upload_reminders(
     target_date: date,
     dry_run: bool = False,
     decision_service: MaterialReminderDecisionService | None = None,
+    batch: bool = True,
 ) -> list[ReminderResult]:
-    """Send or preview material upload reminders for presentations on a date."""
+    """Send or preview material upload reminders for presentations on a date.
+
+    In batch mode each distinct note is decided once, distinct notes are decided
+    in parallel, and all mails go out over one connection. Each reminder log is
+    saved as soon as its mail's outcome is known, so an interrupted run does not
+    resend (see the module docstring). The decisions are the same as in the
+    per-item mode (batch=False); empty notes are decided without the service in
+    both modes.
+    """
     decision_service = decision_service or get_material_reminder_decision_service()
+    targets = iter_material_upload_reminder_targets(target_date)
+    if batch:
+        return _send_material_upload_reminders_in_batch(
+            list(targets),
+            dry_run=dry_run,
+            decision_service=decision_service,
+        )
+
     results = []
-    for event_detail in iter_material_upload_reminder_targets(target_date):
+    for event_detail in targets:
         results.append(
             process_material_upload_reminder_target(
                 event_detail,
@@ -168,6 +201,41 @@ def get_material_reminder_decision_service() -> MaterialReminderDecisionService:
     return OpenRouterMaterialReminderDecisionService()
 
 
+def decide_material_reminders(
+    note_texts: list[str],
+    decision_service: MaterialReminderDecisionService,
+    *,
+    workers: int | None = None,
+) -> dict[str, MaterialReminderDecision | Exception]:
+    """Decide many notes, asking the decision service once per distinct non-empty note.
+
+    Returns:
+        A mapping from note text to its decision, or to the exception raised while deciding it.
+    """
+    decisions: dict[str, MaterialReminderDecision | Exception] = {}
+    unique_notes = []
+    for note_text in dict.fromkeys(note_texts):
+        if _is_empty_note(note_text):
+            decisions[note_text] = EMPTY_NOTE_DECISION
+        else:
+            unique_notes.append(note_text)
+    if not unique_notes:
+        return decisions
+
+    workers = workers or getattr(
+        settings, "MATERIAL_REMINDER_DECISION_WORKERS", DEFAULT_MATERIAL_REMINDER_DECISION_WORKERS
+    )
+    _release_db_connections()
+    with BatchExecutor(io_workers=min(workers, len(unique_notes))) as executor:
+        outcomes = executor.map_io(decision_service.decide, unique_notes)
+    decisions.update({outcome.item: outcome.result if outcome.ok else outcome.error for outcome in outcomes})
+    return decisions
+
+
+def _is_empty_note(note_text: str) -> bool:
+    return not _sanitize_note_for_prompt(note_text)
+
+
 def process_material_upload_reminder_target(
     event_detail: EventDetail,
     *,
@@ -177,56 +245,137 @@ def process_material_upload_reminder_target(
     """Process one material upload reminder target."""
     applicant = get_material_reminder_recipient(event_detail)
     if not applicant or not applicant.email:
-        return ReminderResult(event_detail.pk, "", "skipped_no_email", "申請者またはメールアドレスがありません")
+        return _no_email_result(event_detail)
 
     note_text = get_material_reminder_note_text(event_detail)
-    try:
-        decision = decision_service.decide(note_text)
-    except Exception as exc:
-        logger.exception(
+    if _is_empty_note(note_text):
+        decision = EMPTY_NOTE_DECISION
+    else:
+        try:
+            decision = decision_service.decide(note_text)
+        except Exception as exc:
+            decision = exc
+
+    resolved = _resolve_material_reminder_decision(
+        event_detail, applicant.email, decision, dry_run=dry_run
+    )
+    if resolved is None:
+        try:
+            _send_material_upload_reminder_email(event_detail)
+        except Exception as exc:
+            resolved = _material_reminder_delivery_result(event_detail, applicant.email, decision, exc)
+        else:
+            resolved = _material_reminder_delivery_result(event_detail, applicant.email, decision, None)
+
+    result, log = resolved
+    if log is not None:
+        log.save()
+    return result
+
+
+def _send_material_upload_reminders_in_batch(
+    targets: list[EventDetail],
+    *,
+    dry_run: bool,
+    decision_service: MaterialReminderDecisionService,
+) -> list[ReminderResult]:
+    results: dict[int, ReminderResult] = {}
+    pending = []
+    for event_detail in targets:
+        applicant = get_material_reminder_recipient(event_detail)
+        if not applicant or not applicant.email:
+            results[event_detail.pk] = _no_email_result(event_detail)
+            continue
+        pending.append((event_detail, applicant.email, get_material_reminder_note_text(event_detail)))
+
+    decisions = decide_material_reminders([note_text for _, _, note_text in pending], decision_service)
+
+    def record(event_detail, resolved):
+        result, log = resolved
+        results[event_detail.pk] = result
+        # 送信ごとにすぐ保存し、途中でプロセスが落ちても送信済み分の再送を防ぐ
+        if log is not None:
+            log.save()
+
+    # 送信するメールを先にすべて組み立て、1つのメール接続でまとめて送る
+    to_send = []
+    for event_detail, email, note_text in pending:
+        decision = decisions[note_text]
+        resolved = _resolve_material_reminder_decision(event_detail, email, decision, dry_run=dry_run)
+        if resolved is not None:
+            record(event_detail, resolved)
+            continue
+        try:
+            message = build_material_upload_reminder_email(event_detail)
+        except Exception as exc:
+            record(event_detail, _material_reminder_delivery_result(event_detail, email, decision, exc))
+            continue
+        to_send.append((event_detail, email, decision, message))
+
+    def record_outcome(index, outcome):
+        event_detail, email, decision, _ = to_send[index]
+        record(event_detail, _material_reminder_delivery_result(event_detail, email, decision, outcome.error))
+
+    send_email_batch([message for *_, message in to_send], on_outcome=record_outcome)
+    return [results[event_detail.pk] for event_detail in targets]
+
+
+def _no_email_result(event_detail: EventDetail) -> ReminderResult:
+    return ReminderResult(event_detail.pk, "", "skipped_no_email", "申請者またはメールアドレスがありません")
+
+
+def _resolve_material_reminder_decision(
+    event_detail: EventDetail,
+    email: str,
+    decision: MaterialReminderDecision | Exception,
+    *,
+    dry_run: bool,
+) -> tuple[ReminderResult, MaterialUploadReminderLog | None] | None:
+    """Resolve a decision that needs no mail into its result and (unsaved) log.
+
+    Returns None when the reminder should be sent.
+    """
+    if isinstance(decision, Exception):
+        logger.error(
             "発表資料アップロード依頼: LLM判定に失敗しました。EventDetail=%s",
             event_detail.pk,
+            exc_info=decision,
         )
-        return ReminderResult(event_detail.pk, applicant.email, "llm_error", str(exc))
+        return ReminderResult(event_detail.pk, email, "llm_error", str(decision)), None
 
     if not decision.should_send:
+        log = None
         if not dry_run:
-            MaterialUploadReminderLog.objects.create(
+            log = MaterialUploadReminderLog(
                 event_detail=event_detail,
                 status=MaterialUploadReminderLog.Status.SKIPPED_BY_NOTE,
                 reason=decision.reason,
                 confidence=decision.confidence,
                 matched_intent=decision.matched_intent,
             )
-        return ReminderResult(
-            event_detail.pk,
-            applicant.email,
-            "skipped_by_note",
-            decision.reason,
-            decision.confidence,
-            decision.matched_intent,
-        )
+        return _decision_result(event_detail, email, "skipped_by_note", decision), log
 
     if dry_run:
-        return ReminderResult(
-            event_detail.pk,
-            applicant.email,
-            "would_send",
-            decision.reason,
-            decision.confidence,
-            decision.matched_intent,
-        )
+        return _decision_result(event_detail, email, "would_send", decision), None
+    return None
 
-    try:
-        _send_material_upload_reminder_email(event_detail)
-    except Exception as exc:
-        logger.exception(
+
+def _material_reminder_delivery_result(
+    event_detail: EventDetail,
+    email: str,
+    decision: MaterialReminderDecision,
+    error: Exception | None,
+) -> tuple[ReminderResult, MaterialUploadReminderLog | None]:
+    """Build the result and (unsaved) log for a reminder that was sent or failed to send."""
+    if error is not None:
+        logger.error(
             "発表資料アップロード依頼: メール送信に失敗しました。EventDetail=%s",
             event_detail.pk,
+            exc_info=error,
         )
-        return ReminderResult(event_detail.pk, applicant.email, "mail_error", str(exc))
+        return ReminderResult(event_detail.pk, email, "mail_error", str(error)), None
 
-    MaterialUploadReminderLog.objects.create(
+    log = MaterialUploadReminderLog(
         event_detail=event_detail,
         status=MaterialUploadReminderLog.Status.SENT,
         reason=decision.reason,
@@ -234,10 +383,19 @@ def process_material_upload_reminder_target(
         matched_intent=decision.matched_intent,
         sent_at=timezone.now(),
     )
+    return _decision_result(event_detail, email, "sent", decision), log
+
+
+def _decision_result(
+    event_detail: EventDetail,
+    email: str,
+    action: str,
+    decision: MaterialReminderDecision,
+) -> ReminderResult:
     return ReminderResult(
         event_detail.pk,
-        applicant.email,
-        "sent",
+        email,
+        action,
         decision.reason,
         decision.confidence,
         decision.matched_intent,
@@ -277,7 +435,8 @@ def _get_vket_presentation(event_detail: EventDetail):
     )
 
 
-def _send_material_upload_reminder_email(event_detail: EventDetail) -> None:
+def build_material_upload_reminder_email(event_detail: EventDetail) -> EmailMultiAlternatives:
+    """Render the material upload reminder for an event detail."""
     applicant = get_material_reminder_recipient(event_detail)
     if not applicant:
         raise ValueError(f"material upload reminder recipient was not found: event_detail={event_detail.pk}")
@@ -291,16 +450,20 @@ def _send_material_upload_reminder_email(event_detail: EventDetail) -> None:
         "upload_url": upload_url,
         "history_url": MATERIAL_UPLOAD_HISTORY_URL,
     }
-    html_message = render_to_string("event/email/material_upload_reminder.html", context)
-    sent = send_mail(
+    return build_email(
         subject="発表資料アップロードのお願い",
         message=render_material_upload_reminder_text(context),
-        from_email=settings.DEFAULT_FROM_EMAIL,
+        html_message=render_to_string("event/email/material_upload_reminder.html", context),
         recipient_list=[applicant.email],
-        html_message=html_message,
     )
-    if not sent:
+
+
+def _send_material_upload_reminder_email(event_detail: EventDetail) -> None:
+    [outcome] = send_email_batch([build_material_upload_reminder_email(event_detail)])
+    if isinstance(outcome.error, MailNotSentError):
         raise ValueError(f"material upload reminder mail was not sent: event_detail={event_detail.pk}")
+    if outcome.error is not None:
+        raise outcome.error
 
 
 def render_material_upload_reminder_text(context: dict[str, object]) -> str:
@@ -320,5 +483,11 @@ def render_material_upload_reminder_text(context: dict[str, object]) -> str:
     )
 
 
+def _release_db_connections() -> None:
+    """LLM の応答待ちの間 DB 接続を保持しないよう閉じる（トランザクション内では閉じない）."""
+    if not any(connection.in_atomic_block for connection in connections.all()):
+        connections.close_all()
+
+
 def _sanitize_note_for_prompt(text: str, max_length: int = 2000) -> str:
     return " ".join((text or "").split())[:max_length]
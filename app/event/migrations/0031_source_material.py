@@ -0,0 +1,46 @@
+# Generated by Django 5.2.14 on 2026-10-18 22:24
+#
+# スキーマの追加だけを行う。字幕のコピーは 0032、cached_transcript 列の削除は旧リビジョンが
+# 列を読まなくなった後のデプロイで行う（docs/deployment.md）。
+# slide_material_file は db_default を付け、列を知らない旧リビジョンの INSERT も通す。
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('event', '0030_eventdetail_cached_transcript_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='eventdetail',
+            name='slide_material_file',
+            field=models.CharField(blank=True, db_default='', default='', editable=False, max_length=255),
+        ),
+        migrations.CreateModel(
+            name='SourceMaterial',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('slide_pdf', 'スライドPDF'), ('transcript', 'YouTube字幕')], max_length=20, verbose_name='種別')),
+                ('content_key', models.CharField(max_length=100, verbose_name='内容キー')),
+                ('text', models.TextField(blank=True, default='', verbose_name='抽出テキスト')),
+                ('page_count', models.PositiveIntegerField(blank=True, null=True, verbose_name='ページ数')),
+                ('extraction_ms', models.PositiveIntegerField(default=0, verbose_name='抽出時間（ミリ秒）')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='作成日時')),
+            ],
+            options={
+                'verbose_name': '記事生成用の元資料',
+                'verbose_name_plural': '記事生成用の元資料',
+                'db_table': 'event_source_material',
+                'constraints': [models.UniqueConstraint(fields=('kind', 'content_key'), name='uniq_source_material_kind_key')],
+            },
+        ),
+        migrations.AddField(
+            model_name='eventdetail',
+            name='slide_material',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='event.sourcematerial', verbose_name='スライド抽出テキスト'),
+        ),
+    ]
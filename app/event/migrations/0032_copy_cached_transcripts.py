@@ -0,0 +1,54 @@
+# Generated by Django 5.2.14 on 2026-10-19 09:12
+#
+# 0031 で作った SourceMaterial へ、EventDetail.cached_transcript の字幕をコピーする。
+# 列はまだ消さない（移行中の旧リビジョンが読むため）。何度流しても同じ結果になる。
+
+from django.db import migrations
+
+
+def copy_cached_transcripts(apps, schema_editor):
+    """EventDetail.cached_transcript を動画ID+言語キーの SourceMaterial へ移す"""
+    EventDetail = apps.get_model('event', 'EventDetail')
+    SourceMaterial = apps.get_model('event', 'SourceMaterial')
+
+    rows = (
+        EventDetail.objects.exclude(cached_transcript='')
+        .exclude(cached_transcript_video_id='')
+        .values_list('cached_transcript_video_id', 'cached_transcript')
+        .order_by('pk')
+    )
+    seen = set()
+    for video_id, transcript in rows.iterator(chunk_size=200):
+        content_key = f'{video_id}:ja'
+        if content_key in seen:
+            continue
+        seen.add(content_key)
+        SourceMaterial.objects.get_or_create(
+            kind='transcript',
+            content_key=content_key,
+            defaults={'text': transcript},
+        )
+
+
+def restore_cached_transcripts(apps, schema_editor):
+    """逆マイグレーション（SourceMaterial の字幕を EventDetail へ書き戻す）"""
+    EventDetail = apps.get_model('event', 'EventDetail')
+    SourceMaterial = apps.get_model('event', 'SourceMaterial')
+
+    for material in SourceMaterial.objects.filter(kind='transcript').iterator():
+        video_id = material.content_key.rsplit(':', 1)[0]
+        EventDetail.objects.filter(youtube_url__contains=video_id).update(
+            cached_transcript=material.text,
+            cached_transcript_video_id=video_id,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('event', '0031_source_material'),
+    ]
+
+    operations = [
+        migrations.RunPython(copy_cached_transcripts, restore_cached_transcripts),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.14 on 2026-10-19 00:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('event', '0032_copy_cached_transcripts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='materialuploadreminderlog',
+            name='follow_up_claimed_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='1週間後リマインド確保日時'),
+        ),
+    ]
@@ -282,6 +282,47 @@ class EventOccurrenceTombstone(models.Model):
         return f"{self.community.name} - {self.date} ({self.get_reason_display()})"
 
 
+class SourceMaterial(models.Model):
+    """記事生成の元資料（スライドPDFの抽出テキスト・YouTube字幕）を内容単位で保持する。
+
+    スライドは PDF の SHA-256、字幕は ``<video_id>:<言語>`` をキーにするため、
+    同じデッキ・動画を参照する複数の EventDetail で共有される。
+    アップロード時にバックグラウンドで作成し、記事の再生成では LLM 呼び出しだけで済ませる。
+    """
+
+    class Kind(models.TextChoices):
+        SLIDE_PDF = 'slide_pdf', 'スライドPDF'
+        TRANSCRIPT = 'transcript', 'YouTube字幕'
+
+    # スライドのページ区切り。pdfium の抽出テキストには含まれない改ページ文字を使う
+    PAGE_SEPARATOR = '\f'
+
+    kind = models.CharField('種別', max_length=20, choices=Kind.choices)
+    content_key = models.CharField('内容キー', max_length=100)
+    text = models.TextField('抽出テキスト', blank=True, default='')
+    page_count = models.PositiveIntegerField('ページ数', null=True, blank=True)
+    extraction_ms = models.PositiveIntegerField('抽出時間（ミリ秒）', default=0)
+    created_at = models.DateTimeField('作成日時', auto_now_add=True)
+
+    class Meta:
+        verbose_name = '記事生成用の元資料'
+        verbose_name_plural = '記事生成用の元資料'
+        db_table = 'event_source_material'
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'content_key'], name='uniq_source_material_kind_key'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} {self.content_key}"
+
+    @property
+    def page_texts(self) -> list[str]:
+        """スライドのページごとのテキスト。字幕は1要素として返す。"""
+        if self.kind == self.Kind.SLIDE_PDF:
+            return self.text.split(self.PAGE_SEPARATOR) if self.text else []
+        return [self.text] if self.text else []
+
+
 class EventDetailQuerySet(models.QuerySet):
     """QuerySet レベルで ``.delete()`` を soft delete に倒す。
 
@@ -368,6 +409,15 @@ class EventDetail(models.Model):
     meta_description = models.CharField(
         'メタディスクリプション', max_length=255, blank=True, default='')
 
+    # 記事生成用の抽出テキストは SourceMaterial に内容ハッシュ単位で保持する。
+    # slide_material_file は紐付けを計算した時点の slide_file.name で、差し替え検知に使う。
+    slide_material = models.ForeignKey(
+        'SourceMaterial', on_delete=models.SET_NULL, null=True, blank=True, editable=False,
+        related_name='+', verbose_name='スライド抽出テキスト',
+    )
+    slide_material_file = models.CharField(max_length=255, blank=True, default='', db_default='', editable=False)
+    # 廃止済み: 字幕は 0032 で SourceMaterial に移した。移行中の旧リビジョンが読むので列だけ残し、
+    # 次のデプロイで削除する（docs/deployment.md）。新しいコードからは読み書きしない。
     cached_transcript = models.TextField(
         blank=True,
         default='',
@@ -483,6 +533,9 @@ class MaterialUploadReminderLog(models.Model):
     confidence = models.CharField("信頼度", max_length=20, blank=True, default="")
     sent_at = models.DateTimeField("送信日時", null=True, blank=True)
     follow_up_sent_at = models.DateTimeField("1週間後リマインド送信日時", null=True, blank=True, db_index=True)
+    # 1週間後リマインドを送信中の実行が対象を確保した日時。送信結果が出たら follow_up_sent_at を
+    # 記録する。実行が途中で落ちて確保したまま残っても、期限（SLIDE_REMINDER_CLAIM_TIMEOUT）後に再送する
+    follow_up_claimed_at = models.DateTimeField("1週間後リマインド確保日時", null=True, blank=True)
     created_at = models.DateTimeField("作成日時", auto_now_add=True)
     updated_at = models.DateTimeField("更新日時", auto_now=True)
 
@@ -1,14 +1,17 @@
-"""発表申請の通知サービス"""
+"""発表申請の通知サービス
+
+申請・審査結果の通知は ta_hub.outbox に積み、コミット後に配信する（リクエスト処理中に
+SMTP や Discord を待たない）。
+"""
 import logging
 
 import requests
-from django.conf import settings
-from django.core.mail import send_mail
 from django.template.loader import render_to_string
 from django.urls import reverse
 from django.utils.timezone import localtime
 
 from event.models import EventDetail
+from ta_hub.outbox import enqueue_discord_webhook, enqueue_email
 from website.constants import build_site_url
 from website.discord_webhook import (
     get_webhook_error_context,
@@ -86,26 +89,12 @@ def notify_owners_of_new_application(event_detail: EventDetail, request=None) ->
             'event/email/lt_application_received.html', context
         )
 
-        try:
-            sent = send_mail(
-                subject=subject,
-                message='',
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                recipient_list=[owner.email],
-                html_message=html_message,
-            )
-            if sent:
-                logger.info(
-                    f"発表申請通知メール送信成功: {owner.email} (申請ID={event_detail.pk})"
-                )
-            else:
-                logger.warning(
-                    f"発表申請通知メール送信失敗: {owner.email} (申請ID={event_detail.pk})"
-                )
-        except Exception as e:
-            logger.error(
-                f"発表申請通知メール送信エラー: {owner.email} (申請ID={event_detail.pk}): {e}"
-            )
+        enqueue_email(
+            subject=subject,
+            recipient_list=[owner.email],
+            html_message=html_message,
+            label=f"lt_application_received:{event_detail.pk}",
+        )
 
     # Discord Webhook通知
     _send_discord_notification_for_new_application(event_detail, review_url)
@@ -178,27 +167,12 @@ def notify_applicant_of_result(
         'event/email/lt_application_result.html', context
     )
 
-    try:
-        sent = send_mail(
-            subject=subject,
-            message='',
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[applicant.email],
-            html_message=html_message,
-        )
-        if sent:
-            logger.info(
-                f"申請結果通知メール送信成功: {applicant.email} (申請ID={event_detail.pk}, "
-                f"status={event_detail.status})"
-            )
-        else:
-            logger.warning(
-                f"申請結果通知メール送信失敗: {applicant.email} (申請ID={event_detail.pk})"
-            )
-    except Exception as e:
-        logger.error(
-            f"申請結果通知メール送信エラー: {applicant.email} (申請ID={event_detail.pk}): {e}"
-        )
+    enqueue_email(
+        subject=subject,
+        recipient_list=[applicant.email],
+        html_message=html_message,
+        label=f"lt_application_result:{event_detail.pk}:{event_detail.status}",
+    )
 
     # Discord Webhook通知
     _send_discord_notification_for_result(event_detail, schedule_changes)
@@ -207,7 +181,7 @@ def notify_applicant_of_result(
 def _send_discord_notification_for_new_application(
     event_detail: EventDetail, review_url: str
 ) -> None:
-    """新しい申請のDiscord Webhook通知を送信"""
+    """新しい申請のDiscord Webhook通知をアウトボックスに積む"""
     community = event_detail.event.community
     webhook_url = community.notification_webhook_url
 
@@ -252,41 +226,16 @@ def _send_discord_notification_for_new_application(
         }],
     }
 
-    try:
-        response = post_discord_webhook(webhook_url, message)
-        # raise_for_status を通っているので response.ok は常に True
-        logger.info(
-            f"Discord Webhook通知成功（新規申請）: Community={community.name}, "
-            f"status={response.status_code}"
-        )
-    except requests.RequestException as error:
-        # gateway で回復できなかった最終失敗のみここに到達する
-        error_type, status_code = get_webhook_error_context(error)
-        logger.error(
-            "Discord Webhook通知エラー（新規申請、リトライ後）: "
-            "community_id=%s event_detail_id=%s error_type=%s status_code=%s",
-            community.pk,
-            event_detail.pk,
-            error_type,
-            status_code,
-        )
-    except Exception as error:
-        error_type, status_code = get_webhook_error_context(error)
-        logger.error(
-            "Discord Webhook通知エラー（新規申請）: "
-            "community_id=%s event_detail_id=%s error_type=%s status_code=%s",
-            community.pk,
-            event_detail.pk,
-            error_type,
-            status_code,
-        )
+    enqueue_discord_webhook(
+        webhook_url, message, label=f"lt_application_received:{event_detail.pk}"
+    )
 
 
 def _send_discord_notification_for_result(
     event_detail: EventDetail,
     schedule_changes: list[dict[str, str]] | None = None,
 ) -> None:
-    """申請結果のDiscord Webhook通知を送信"""
+    """申請結果のDiscord Webhook通知をアウトボックスに積む"""
     community = event_detail.event.community
     webhook_url = community.notification_webhook_url
 
@@ -342,33 +291,11 @@ def _send_discord_notification_for_result(
         }],
     }
 
-    try:
-        post_discord_webhook(webhook_url, message)
-        logger.info(
-            f"Discord Webhook通知成功（申請結果）: Community={community.name}, "
-            f"status={event_detail.status}"
-        )
-    except requests.RequestException as error:
-        # gateway で回復できなかった最終失敗のみここに到達する
-        error_type, status_code = get_webhook_error_context(error)
-        logger.error(
-            "Discord Webhook通知エラー（申請結果、リトライ後）: "
-            "community_id=%s event_detail_id=%s error_type=%s status_code=%s",
-            community.pk,
-            event_detail.pk,
-            error_type,
-            status_code,
-        )
-    except Exception as error:
-        error_type, status_code = get_webhook_error_context(error)
-        logger.error(
-            "Discord Webhook通知エラー（申請結果）: "
-            "community_id=%s event_detail_id=%s error_type=%s status_code=%s",
-            community.pk,
-            event_detail.pk,
-            error_type,
-            status_code,
-        )
+    enqueue_discord_webhook(
+        webhook_url,
+        message,
+        label=f"lt_application_result:{event_detail.pk}:{event_detail.status}",
+    )
 
 
 def notify_speaker_account_linked(event_detail: EventDetail, user) -> None:
@@ -5,28 +5,27 @@ import json
 import logging
 import os
 import re
-import tempfile
 from datetime import datetime
 from typing import Optional
 
-from openai import OpenAI
 from openai.types.chat import (
-    ChatCompletionMessageParam,
     ChatCompletionNamedToolChoiceParam,
     ChatCompletionToolParam,
 )
 from openai.types.shared_params import FunctionDefinition
 from pydantic import BaseModel, Field
-from pypdf import PdfReader
 
-from event.models import EventDetail
+from event.models import EventDetail, SourceMaterial
 from event.prompts import BLOG_GENERATION_TEMPLATE
 from event.services.media_service import ensure_pdf_thumbnail
-from event.services.youtube_service import get_transcript
-from website.constants import (
-    OPENROUTER_BASE_URL,
-    build_openrouter_extra_headers,
+from event.services.slide_pdf import limit_page_texts
+from event.services.source_material import (
+    MAX_PDF_TEXT_PAGES,
+    get_slide_material,
+    get_transcript_material,
 )
+from website.constants import OPENROUTER_BASE_URL
+from website.llm_gateway import LlmRequest, get_llm_gateway, get_openrouter_provider
 
 logger = logging.getLogger(__name__)
 
@@ -34,7 +33,6 @@ logger = logging.getLogger(__name__)
 MAX_SOURCE_TEXT_CHARS = 40_000
 # 文字起こし + PDF の合算上限。文字起こしを優先し、PDF は残り予算だけ使う。
 MAX_COMBINED_SOURCE_CHARS = 60_000
-MAX_PDF_TEXT_PAGES = 30
 
 
 class BlogOutput(BaseModel):
@@ -66,26 +64,6 @@ def apply_blog_output_to_event_detail(event_detail: EventDetail, blog_output: Bl
     return True
 
 
-def _copy_uploaded_file_to_temp_path(uploaded_file, *, suffix: str = '.pdf') -> str:
-    """Copy a Django file to a temp path without loading it all into memory."""
-    temp_file_path = None
-    try:
-        with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as temp_file:
-            temp_file_path = temp_file.name
-            uploaded_file.open('rb')
-            for chunk in uploaded_file.chunks():
-                temp_file.write(chunk)
-        return temp_file_path
-    except Exception:
-        if temp_file_path and os.path.exists(temp_file_path):
-            os.unlink(temp_file_path)
-        raise
-    finally:
-        close = getattr(uploaded_file, 'close', None)
-        if callable(close):
-            close()
-
-
 def _limit_source_text(text: str, *, max_chars: int = MAX_SOURCE_TEXT_CHARS) -> str:
     """Limit extracted source text before it is embedded in an LLM prompt."""
     if len(text) <= max_chars:
@@ -94,54 +72,24 @@ def _limit_source_text(text: str, *, max_chars: int = MAX_SOURCE_TEXT_CHARS) ->
     return text[:max_chars]
 
 
-def _extract_pdf_text(temp_file_path: str, *, max_chars: int = MAX_SOURCE_TEXT_CHARS) -> str:
-    """Extract bounded text from a PDF file for blog generation.
+def _extract_pdf_text(slide_material: SourceMaterial, *, max_chars: int = MAX_SOURCE_TEXT_CHARS) -> str:
+    """Extract bounded text from a slide PDF for blog generation.
 
     Args:
-        temp_file_path: 読み込む PDF の一時ファイルパス
+        slide_material: スライドPDFの抽出済みテキスト（内容ハッシュ単位で共有される）
         max_chars: 抽出テキストの合計文字数上限（呼び出し側の残り予算）
 
     Returns:
         上限内に切り詰めた抽出テキスト
     """
-    if max_chars <= 0:
-        return ""
-
-    reader = PdfReader(temp_file_path)
-    page_count = len(reader.pages)
-    if page_count > MAX_PDF_TEXT_PAGES:
-        logger.info(
-            "PDF text extraction limited to first %d of %d pages",
-            MAX_PDF_TEXT_PAGES,
-            page_count,
-        )
-
-    page_texts = []
-    current_chars = 0
-    for page_index, page in enumerate(reader.pages):
-        if page_index >= MAX_PDF_TEXT_PAGES:
-            break
-
-        text = page.extract_text() or ""
-        if not text:
-            continue
-
-        remaining_chars = max_chars - current_chars
-        if remaining_chars <= 0:
-            break
-
-        page_texts.append(text[:remaining_chars])
-        current_chars += min(len(text), remaining_chars) + 1
-
-    return "\n".join(page_texts)
+    return limit_page_texts(slide_material.page_texts[:MAX_PDF_TEXT_PAGES], max_chars=max_chars)
 
 
 def _get_transcript_with_cache(event_detail: EventDetail) -> Optional[str]:
-    """YouTube字幕をキャッシュ優先で取得する.
+    """YouTube字幕を元資料ストア優先で取得する.
 
-    同一動画のキャッシュがあれば YouTube API を呼ばずに再利用し、
-    取得に成功した時だけキャッシュを更新する（失敗を「字幕なし」として
-    恒久化しないため、None のときは書き込まない）。
+    同一動画の字幕が SourceMaterial にあれば YouTube API を呼ばずに再利用する。
+    取得に失敗した場合は保存しない（失敗を「字幕なし」として恒久化しないため）。
 
     Args:
         event_detail: 対象のイベント詳細
@@ -150,26 +98,14 @@ def _get_transcript_with_cache(event_detail: EventDetail) -> Optional[str]:
         字幕テキスト。取得できなかった場合は None（video_id 未設定時は空文字）
     """
     video_id = event_detail.video_id
+    if not video_id:
+        return ''
 
-    if event_detail.cached_transcript and event_detail.cached_transcript_video_id == video_id:
-        logger.info(f"Using cached transcript for video {video_id}: {len(event_detail.cached_transcript)} chars")
-        return event_detail.cached_transcript
-
-    transcript = get_transcript(video_id, "ja")
-    if transcript:
-        logger.info(f"Retrieved transcript for video {video_id}: {len(transcript)} chars")
-        event_detail.cached_transcript = transcript
-        event_detail.cached_transcript_video_id = video_id or ''
-        # save() だと post_save シグナル（twitter の daily_reminder 再同期等）が発火し、
-        # 既投稿 TweetQueue を上書き破壊するため、シグナル非発火の update() で書き込む
-        EventDetail.objects.filter(pk=event_detail.pk).update(
-            cached_transcript=transcript,
-            cached_transcript_video_id=video_id or '',
-        )
-    else:
-        logger.warning(f"No transcript found for video {video_id}")
-
-    return transcript
+    material = get_transcript_material(video_id)
+    if material is None:
+        return None
+    logger.info(f"Using transcript for video {video_id}: {len(material.text)} chars")
+    return material.text
 
 
 def generate_blog(event_detail: EventDetail, model=None) -> BlogOutput:
@@ -217,18 +153,12 @@ def generate_blog(event_detail: EventDetail, model=None) -> BlogOutput:
         pdf_url = event_detail.slide_url or (event_detail.slide_file.url if event_detail.slide_file else "")
 
         if event_detail.slide_file:
-            temp_file_path = None
             try:
-                temp_file_path = _copy_uploaded_file_to_temp_path(event_detail.slide_file)
-                # PyPDFを使用してPDFの内容を抽出
-                pdf_content = _extract_pdf_text(temp_file_path, max_chars=pdf_budget)
+                # 抽出済みテキストがあればPDFは読み出さない（未作成時だけ読み出して保存する）
+                pdf_content = _extract_pdf_text(get_slide_material(event_detail), max_chars=pdf_budget)
                 logger.info(f"Extracted PDF content: {len(pdf_content)} chars")
             except Exception as e:
                 logger.warning(f"Error loading PDF for EventDetail {event_detail.pk}: {e}")
-            finally:
-                # 一時ファイルを確実に削除
-                if temp_file_path and os.path.exists(temp_file_path):
-                    os.unlink(temp_file_path)
 
         # プロンプトテンプレートを作成
         prompt_text = BLOG_GENERATION_TEMPLATE.format(
@@ -253,12 +183,6 @@ JSONオブジェクトだけを```json ... ```ブロックで出力してくだ
 
         logger.info(f'Prompt for OpenRouter:\n{prompt_text[:500]}...')  # 長すぎるので一部表示
 
-        # OpenAI SDKを使用してOpenRouterにリクエスト
-        client = OpenAI(
-            base_url=OPENROUTER_BASE_URL,
-            api_key=api_key
-        )
-
         # デバッグ用：APIリクエスト開始時刻を記録
         request_start_time = datetime.now()
         logger.info(f"Starting API request at {request_start_time}")
@@ -272,11 +196,6 @@ JSONオブジェクトだけを```json ... ```ブロックで出力してくだ
                 "description": "VRChatイベントの発表内容に基づいてブログ記事を生成する",
                 "parameters": BlogOutput.model_json_schema(),
             }
-            messages: list[ChatCompletionMessageParam] = [
-                {"role": "system",
-                 "content": "あなたはVRChatの技術イベントに関するブログ記事を生成する専門のライターです。必ず指定されたJSON形式で出力してください。"},
-                {"role": "user", "content": prompt_text},
-            ]
             tools: list[ChatCompletionToolParam] = [
                 {"type": "function", "function": blog_output_schema}
             ]
@@ -285,15 +204,18 @@ JSONオブジェクトだけを```json ... ```ブロックで出力してくだ
                 "function": {"name": "generate_blog_post"},
             }
 
-            # Function Callingを使用したリクエスト
-            completion = client.chat.completions.create(
-                extra_headers=build_openrouter_extra_headers(),
-                model=model,
-                messages=messages,
-                temperature=0.3,  # 温度を下げて出力の安定性を向上
-                max_tokens=5000,
-                tools=tools,
-                tool_choice=tool_choice,
+            # Function Callingを使用したリクエスト（OpenRouter へは LLM ゲートウェイ経由で送る）
+            response = get_llm_gateway().complete(
+                LlmRequest.chat(
+                    "あなたはVRChatの技術イベントに関するブログ記事を生成する専門のライターです。必ず指定されたJSON形式で出力してください。",
+                    prompt_text,
+                    model=model,
+                    temperature=0.3,  # 温度を下げて出力の安定性を向上
+                    max_tokens=5000,
+                    task="blog",
+                    options={"tools": tools, "tool_choice": tool_choice},
+                ),
+                provider=get_openrouter_provider(),
             )
 
             # デバッグ用：APIリクエスト終了時刻とかかった時間を記録
@@ -309,14 +231,10 @@ JSONオブジェクトだけを```json ... ```ブロックで出力してくだ
 
         # Function Callingのレスポンスを処理
         try:
-            # ツール呼び出しの確認
-            message = completion.choices[0].message
-
             # ツール呼び出しの結果がある場合
-            if hasattr(message, 'tool_calls') and message.tool_calls:
-                tool_call = message.tool_calls[0]
+            if response.tool_arguments:
                 # 関数レスポンスのJSONを取得
-                blog_output_json = tool_call.function.arguments
+                blog_output_json = response.tool_arguments
                 logger.info(f"Raw response from Function Call: {blog_output_json[:500]}...")
 
                 # 直接Pydanticモデルに変換を試みる
@@ -340,7 +258,7 @@ JSONオブジェクトだけを```json ... ```ブロックで出力してくだ
                 logger.warning("No tool_calls in response. Model might not support function calling.")
 
             # レスポンスからテキストを取得（Function Calling未対応の場合のフォールバック）
-            response_text = message.content
+            response_text = response.text
             # content が空なら tool_calls も content も無い異常応答なので、後段で
             # 曖昧に落ちる前にここで失敗させる
             if not response_text:
@@ -0,0 +1,183 @@
+"""スライドPDFのアクセス層.
+
+サムネイル生成（pdfium レンダリング）と記事生成用テキスト抽出は、どちらも同じスライドPDFを
+必要とする。以前はそれぞれが R2 から一時ファイルへ全体をコピーしてから開いていたため、
+アップロード直後の記事生成では同じPDFをローカルディスクへ2回書き出していた。
+
+ここではストレージから1回だけバッファに読み出し、開いた pdfium ドキュメントを
+同一リクエスト・同一ジョブ内のレンダリングとテキスト抽出で共有する。
+先頭ページのレンダリング結果は内容の SHA-256 をキーに default キャッシュへ保存し、
+抽出テキストは同じキーで SourceMaterial（event.services.source_material）に永続化するので、
+同じデッキの再アップロードや記事の再生成ではPDFを開き直さない。
+
+部分取得（Range リクエスト）は採用していない。テキスト抽出はほぼ全ページを読むうえ、
+キャッシュキーの SHA-256 にも全体のバイト列が必要なため、1回の全体読み出しが最小になる。
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+
+import pypdfium2 as pdfium
+from django.core.cache import cache
+
+from event.thumbnail import render_pdf_document_thumbnail_jpeg
+
+logger = logging.getLogger(__name__)
+
+SLIDE_PDF_CACHE_KEY_PREFIX = 'slide_pdf'
+# 同じ内容ハッシュの結果は不変なので長めに保持する（7日）
+SLIDE_PDF_CACHE_TIMEOUT = 60 * 60 * 24 * 7
+# EventDetail インスタンスに読み込み済み SlidePdf を保持する属性名
+_INSTANCE_ATTR = '_slide_pdf'
+
+
+class SlidePdf:
+    """1回のバッファ読み出しから開くスライドPDF.
+
+    pdfium ドキュメントは初回アクセス時に開き、サムネイル生成とテキスト抽出で共有する。
+    """
+
+    def __init__(self, data: bytes, *, name: str = ''):
+        self.data = data
+        self.name = name
+        self.content_hash = hashlib.sha256(data).hexdigest()
+        self._document = None
+        self._page_texts: dict[int, list[str]] = {}
+
+    @classmethod
+    def from_file(cls, django_file) -> SlidePdf:
+        """Django の File / FieldFile からチャンク単位で読み出して生成する."""
+        django_file.open('rb')
+        try:
+            data = b''.join(django_file.chunks())
+        finally:
+            close = getattr(django_file, 'close', None)
+            if callable(close):
+                close()
+        return cls(data, name=getattr(django_file, 'name', '') or '')
+
+    def __enter__(self) -> SlidePdf:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    @property
+    def document(self):
+        if self._document is None:
+            self._document = pdfium.PdfDocument(self.data)
+        return self._document
+
+    @property
+    def page_count(self) -> int:
+        return len(self.document)
+
+    def close(self) -> None:
+        if self._document is not None and hasattr(self._document, 'close'):
+            self._document.close()
+        self._document = None
+
+    def _cache_key(self, kind: str) -> str:
+        return f'{SLIDE_PDF_CACHE_KEY_PREFIX}:{self.content_hash}:{kind}'
+
+    def cached_thumbnail_jpeg(self) -> bytes | None:
+        """キャッシュ済みの先頭ページサムネイルを返す。なければ None."""
+        return cache.get(self._cache_key('thumbnail'))
+
+    def remember_thumbnail_jpeg(self, image_bytes: bytes) -> None:
+        """別プロセスでレンダリングしたサムネイルをキャッシュに登録する."""
+        cache.set(self._cache_key('thumbnail'), image_bytes, SLIDE_PDF_CACHE_TIMEOUT)
+
+    def render_thumbnail_jpeg(self) -> bytes:
+        """先頭ページをスライド比率のJPEGにレンダリングする（内容ハッシュでキャッシュ）."""
+        image_bytes = self.cached_thumbnail_jpeg()
+        if image_bytes is None:
+            image_bytes = render_pdf_document_thumbnail_jpeg(self.document)
+            self.remember_thumbnail_jpeg(image_bytes)
+        return image_bytes
+
+    def page_texts(self, *, max_pages: int) -> list[str]:
+        """先頭 max_pages ページのテキストをページごとに返す.
+
+        永続化は SourceMaterial が担うので、ここでは同一インスタンス内の再抽出だけを防ぐ。
+        """
+        if max_pages not in self._page_texts:
+            self._page_texts[max_pages] = self._extract_page_texts(max_pages)
+        return self._page_texts[max_pages]
+
+    def _extract_page_texts(self, max_pages: int) -> list[str]:
+        document = self.document
+        page_count = len(document)
+        if page_count > max_pages:
+            logger.info(
+                "PDF text extraction limited to first %d of %d pages",
+                max_pages,
+                page_count,
+            )
+
+        texts = []
+        for page_index in range(min(page_count, max_pages)):
+            page = document[page_index]
+            try:
+                textpage = page.get_textpage()
+                try:
+                    texts.append(textpage.get_text_range() or '')
+                finally:
+                    textpage.close()
+            finally:
+                page.close()
+        return texts
+
+
+def limit_page_texts(page_texts: list[str], *, max_chars: int) -> str:
+    """ページごとのテキストを合計 max_chars 文字以内で改行連結する（空ページは飛ばす）."""
+    if max_chars <= 0:
+        return ''
+
+    limited = []
+    current_chars = 0
+    for text in page_texts:
+        if not text:
+            continue
+
+        remaining_chars = max_chars - current_chars
+        if remaining_chars <= 0:
+            break
+
+        limited.append(text[:remaining_chars])
+        current_chars += min(len(text), remaining_chars) + 1
+
+    return '\n'.join(limited)
+
+
+def get_slide_pdf(event_detail) -> SlidePdf | None:
+    """EventDetail のスライドPDFを返す.
+
+    読み出した SlidePdf はインスタンスに保持し、同じリクエスト・ジョブ内で
+    サムネイル生成と記事生成が続いてもストレージからの読み出しは1回で済ませる。
+    slide_file が差し替えられた場合は読み直す。
+    """
+    if not event_detail.slide_file:
+        return None
+
+    slide_pdf = get_loaded_slide_pdf(event_detail)
+    if slide_pdf is not None:
+        return slide_pdf
+
+    slide_pdf = SlidePdf.from_file(event_detail.slide_file)
+    attach_slide_pdf(event_detail, slide_pdf)
+    return slide_pdf
+
+
+def attach_slide_pdf(event_detail, slide_pdf: SlidePdf) -> None:
+    """読み込み済みの SlidePdf を別インスタンス（再取得した EventDetail 等）に引き継ぐ."""
+    setattr(event_detail, _INSTANCE_ATTR, slide_pdf)
+
+
+def get_loaded_slide_pdf(event_detail) -> SlidePdf | None:
+    """同じインスタンスで読み込み済みの SlidePdf があれば返す（ストレージは読まない）."""
+    slide_pdf = getattr(event_detail, _INSTANCE_ATTR, None)
+    if slide_pdf is not None and event_detail.slide_file and slide_pdf.name == event_detail.slide_file.name:
+        return slide_pdf
+    return None
@@ -0,0 +1,183 @@
+"""記事生成用の元資料ストア.
+
+スライドPDFの抽出テキストと YouTube 字幕を SourceMaterial に内容キー単位で保存する。
+スライドは PDF の SHA-256、字幕は ``<video_id>:<言語>`` がキーなので、同じデッキ・動画を
+参照する EventDetail 間で共有される。アップロード直後にバックグラウンドで作成しておき、
+記事の再生成では PDF の読み出し・テキスト抽出・字幕 API 呼び出しを行わない。
+
+EventDetail からは slide_material（FK）で参照し、紐付けた時点の slide_file.name を
+slide_material_file に残して、スライド差し替え後の古い紐付けを使わないようにする。
+"""
+from __future__ import annotations
+
+import logging
+import sys
+import threading
+import time
+from typing import Optional
+
+from django.conf import settings
+from django.db import transaction
+
+from event.models import EventDetail, SourceMaterial
+from event.services.slide_pdf import SlidePdf, attach_slide_pdf, get_loaded_slide_pdf, get_slide_pdf
+from event.services.youtube_service import get_transcript
+
+logger = logging.getLogger(__name__)
+
+# 記事生成に使うのは先頭30ページまでなので、それ以降は抽出・保存しない
+MAX_PDF_TEXT_PAGES = 30
+TRANSCRIPT_LANGUAGE = 'ja'
+
+
+def transcript_content_key(video_id: str, language: str = TRANSCRIPT_LANGUAGE) -> str:
+    return f'{video_id}:{language}'
+
+
+def _elapsed_ms(started: float) -> int:
+    return int((time.monotonic() - started) * 1000)
+
+
+def get_or_create_slide_material(slide_pdf: SlidePdf) -> SourceMaterial:
+    """PDF内容ハッシュの SourceMaterial を返す。未作成ならテキストを抽出して保存する."""
+    material = SourceMaterial.objects.filter(
+        kind=SourceMaterial.Kind.SLIDE_PDF, content_key=slide_pdf.content_hash,
+    ).first()
+    if material is not None:
+        return material
+
+    started = time.monotonic()
+    page_texts = [
+        text.replace(SourceMaterial.PAGE_SEPARATOR, '')
+        for text in slide_pdf.page_texts(max_pages=MAX_PDF_TEXT_PAGES)
+    ]
+    material, _ = SourceMaterial.objects.get_or_create(
+        kind=SourceMaterial.Kind.SLIDE_PDF,
+        content_key=slide_pdf.content_hash,
+        defaults={
+            'text': SourceMaterial.PAGE_SEPARATOR.join(page_texts),
+            'page_count': slide_pdf.page_count,
+            'extraction_ms': _elapsed_ms(started),
+        },
+    )
+    logger.info(
+        "Stored slide source material %s: pages=%s chars=%d extraction_ms=%d",
+        material.content_key, material.page_count, len(material.text), material.extraction_ms,
+    )
+    return material
+
+
+def get_slide_material(event_detail: EventDetail) -> Optional[SourceMaterial]:
+    """EventDetail のスライドに対応する SourceMaterial を返す.
+
+    紐付け済みで slide_file が変わっていなければ DB 参照だけで返す。
+    未作成・差し替え後はPDFを読み出して作成し、EventDetail に紐付け直す。
+    """
+    if not event_detail.slide_file:
+        return None
+
+    slide_file_name = event_detail.slide_file.name
+    if event_detail.slide_material_id and event_detail.slide_material_file == slide_file_name:
+        return event_detail.slide_material
+
+    material = get_or_create_slide_material(get_slide_pdf(event_detail))
+    event_detail.slide_material = material
+    event_detail.slide_material_file = slide_file_name
+    # save() だと post_save シグナル（twitter の daily_reminder 再同期等）が発火するため
+    # update() で書き込む。処理中に別のスライドへ差し替えられていれば紐付けない
+    EventDetail.all_objects.filter(pk=event_detail.pk, slide_file=slide_file_name).update(
+        slide_material=material,
+        slide_material_file=slide_file_name,
+    )
+    return material
+
+
+def get_transcript_material(video_id: Optional[str], language: str = TRANSCRIPT_LANGUAGE) -> Optional[SourceMaterial]:
+    """YouTube字幕の SourceMaterial を返す。未作成なら字幕を取得して保存する.
+
+    取得に失敗した場合は保存しない（一時的な失敗を「字幕なし」として恒久化しないため）。
+    """
+    if not video_id:
+        return None
+
+    content_key = transcript_content_key(video_id, language)
+    material = SourceMaterial.objects.filter(
+        kind=SourceMaterial.Kind.TRANSCRIPT, content_key=content_key,
+    ).first()
+    if material is not None:
+        return material
+
+    started = time.monotonic()
+    transcript = get_transcript(video_id, language)
+    if not transcript:
+        logger.warning(f"No transcript found for video {video_id}")
+        return None
+
+    material, _ = SourceMaterial.objects.get_or_create(
+        kind=SourceMaterial.Kind.TRANSCRIPT,
+        content_key=content_key,
+        defaults={'text': transcript, 'extraction_ms': _elapsed_ms(started)},
+    )
+    logger.info(f"Stored transcript for video {video_id}: {len(material.text)} chars")
+    return material
+
+
+def prepare_source_materials(event_detail_id: int, *, slide_pdf: Optional[SlidePdf] = None) -> None:
+    """EventDetail の元資料（スライド抽出テキスト・字幕）を作成しておく.
+
+    Args:
+        event_detail_id: 対象のイベント詳細ID
+        slide_pdf: 呼び出し元で読み込み済みの SlidePdf（同じファイルならストレージを読み直さない）
+    """
+    event_detail = EventDetail.objects.filter(pk=event_detail_id).select_related('slide_material').first()
+    if event_detail is None:
+        return
+
+    if event_detail.slide_file:
+        if slide_pdf is not None and slide_pdf.name == event_detail.slide_file.name:
+            attach_slide_pdf(event_detail, slide_pdf)
+        try:
+            get_slide_material(event_detail)
+        except Exception:
+            logger.exception("スライドの元資料作成に失敗しました: EventDetail ID=%s", event_detail_id)
+
+    get_transcript_material(event_detail.video_id)
+
+
+def _should_skip_background_thread() -> bool:
+    """テスト実行時は外部APIを呼ぶバックグラウンド処理を起動しない。"""
+    if getattr(settings, 'ENABLE_SOURCE_MATERIAL_THREADS_IN_TESTS', False):
+        return False
+    return getattr(settings, 'TESTING', False) or 'test' in sys.argv
+
+
+def _prepare_source_materials_in_thread(event_detail_id: int, slide_pdf: Optional[SlidePdf]) -> None:
+    from django.db import connections
+
+    try:
+        prepare_source_materials(event_detail_id, slide_pdf=slide_pdf)
+    except Exception:
+        logger.exception("元資料の事前作成に失敗しました: EventDetail ID=%s", event_detail_id)
+    finally:
+        connections.close_all()
+
+
+def schedule_source_material_preparation(event_detail: EventDetail) -> None:
+    """アップロード後、コミット完了時に元資料の作成をバックグラウンドで開始する."""
+    if not event_detail.pk or not (event_detail.slide_file or event_detail.video_id):
+        return
+    if _should_skip_background_thread():
+        logger.debug("Skipped source material thread in tests for EventDetail %d", event_detail.pk)
+        return
+
+    event_detail_id = event_detail.pk
+    slide_pdf = get_loaded_slide_pdf(event_detail)
+
+    def start():
+        threading.Thread(
+            target=_prepare_source_materials_in_thread,
+            args=(event_detail_id, slide_pdf),
+            daemon=True,
+        ).start()
+
+    transaction.on_commit(start)
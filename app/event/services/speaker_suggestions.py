@@ -0,0 +1,80 @@
+"""発表者名から既存ユーザーの候補を返す（LT 申込フォームの入力補完用）。
+
+link_lt_speakers_to_users の tier6 と同じ基準（user_name を casefold して編集距離2以内）で引く。
+ユーザー名のインデックスはプロセス内に保持し、SUGGESTION_INDEX_TTL ごとに作り直す。
+"""
+
+import threading
+import time
+from typing import NamedTuple
+
+from django.contrib.auth import get_user_model
+
+from utils.fuzzy_index import FuzzyNameIndex
+
+SUGGESTION_MAX_DISTANCE = 2
+SUGGESTION_INDEX_TTL = 300
+DEFAULT_SUGGESTION_LIMIT = 10
+
+
+class SpeakerSuggestion(NamedTuple):
+    """発表者名に近いユーザー。"""
+
+    id: int
+    user_name: str
+
+
+_index_lock = threading.Lock()
+_cached_index: FuzzyNameIndex[SpeakerSuggestion] | None = None
+_cached_at = 0.0
+
+
+def build_user_name_index() -> FuzzyNameIndex[SpeakerSuggestion]:
+    """全ユーザーの user_name から候補検索用のインデックスを作る（ID 順）。"""
+    users = (
+        SpeakerSuggestion(id=user_id, user_name=user_name)
+        for user_id, user_name in get_user_model().objects.order_by("id").values_list("id", "user_name")
+    )
+    return FuzzyNameIndex(
+        users,
+        key=lambda user: user.user_name.casefold(),
+        max_distance=SUGGESTION_MAX_DISTANCE,
+    )
+
+
+def get_user_name_index() -> FuzzyNameIndex[SpeakerSuggestion]:
+    """キャッシュ済みのインデックスを返す。期限切れなら作り直す。"""
+    global _cached_index, _cached_at
+
+    with _index_lock:
+        if _cached_index is None or time.monotonic() - _cached_at >= SUGGESTION_INDEX_TTL:
+            _cached_index = build_user_name_index()
+            _cached_at = time.monotonic()
+        return _cached_index
+
+
+def clear_user_name_index() -> None:
+    """キャッシュを破棄する（テストやユーザー一括更新の後に使う）。"""
+    global _cached_index
+
+    with _index_lock:
+        _cached_index = None
+
+
+def suggest_users_for_speaker(
+    speaker: str,
+    limit: int = DEFAULT_SUGGESTION_LIMIT,
+) -> list[SpeakerSuggestion]:
+    """発表者名に近い user_name のユーザーを ID 順に最大 limit 件返す。
+
+    Args:
+        speaker: フォームに入力された発表者名。
+        limit: 返す最大件数。
+
+    Returns:
+        候補ユーザーのリスト。空の入力には空リストを返す。
+    """
+    name = speaker.strip()
+    if not name:
+        return []
+    return get_user_name_index().search(name.casefold())[:limit]
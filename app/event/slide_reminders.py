@@ -6,8 +6,7 @@ import logging
 from dataclasses import dataclass
 from datetime import timedelta
 
-from django.conf import settings
-from django.core.mail import send_mail
+from django.core.mail import EmailMultiAlternatives
 from django.db import transaction
 from django.db.models import Q, QuerySet
 from django.template.loader import render_to_string
@@ -17,11 +16,15 @@ from django.utils import timezone
 from event.material_upload_reminders import get_material_reminder_recipient
 from event.models import EventDetail, MaterialUploadReminderLog
 from website.constants import build_site_url
+from website.mail_dispatch import MailOutcome, build_email, send_email_batch
 
 logger = logging.getLogger(__name__)
 
 SLIDE_REMINDER_DELAY_DAYS = 7
 DEFAULT_SLIDE_REMINDER_LIMIT = 50
+# 確保した対象をこの時間内に送り切れなかった実行は落ちたとみなし、次の実行が確保し直す。
+# Cloud Run のリクエストタイムアウト（最大60分）より長くする
+SLIDE_REMINDER_CLAIM_TIMEOUT = timedelta(minutes=90)
 
 
 @dataclass(frozen=True)
@@ -52,6 +55,13 @@ def has_published_material(event_detail: EventDetail) -> bool:
     return bool(event_detail.slide_url or event_detail.slide_file or event_detail.youtube_url)
 
 
+def _claim_expired_q(current, prefix: str = '') -> Q:
+    """送信中の実行が確保していない（または確保の期限が切れた）ログの条件。"""
+    return Q(**{f'{prefix}follow_up_claimed_at__isnull': True}) | Q(
+        **{f'{prefix}follow_up_claimed_at__lt': current - SLIDE_REMINDER_CLAIM_TIMEOUT}
+    )
+
+
 def get_slide_reminder_queryset(now=None) -> QuerySet[EventDetail]:
     """開催から1週間以上経った未公開LTのリマインド候補を返す。"""
     current = now or timezone.now()
@@ -64,6 +74,7 @@ def get_slide_reminder_queryset(now=None) -> QuerySet[EventDetail]:
             material_upload_reminder_log__status=MaterialUploadReminderLog.Status.SENT,
             material_upload_reminder_log__follow_up_sent_at__isnull=True,
         )
+        .filter(_claim_expired_q(current, 'material_upload_reminder_log__'))
         .filter(Q(slide_url='') | Q(slide_url__isnull=True))
         .filter(Q(slide_file='') | Q(slide_file__isnull=True))
         .filter(Q(youtube_url='') | Q(youtube_url__isnull=True))
@@ -77,12 +88,12 @@ def _build_application_edit_url(event_detail: EventDetail) -> str:
     return build_site_url(path)
 
 
-def send_slide_reminder_email(event_detail: EventDetail) -> bool:
-    """資料未公開の発表者へリマインドメールを送信する。"""
+def build_slide_reminder_email(event_detail: EventDetail) -> EmailMultiAlternatives | None:
+    """資料未公開の発表者へのリマインドメールを組み立てる（宛先がなければ None）。"""
     applicant = get_material_reminder_recipient(event_detail)
     if not applicant or not applicant.email:
         logger.warning("資料公開リマインド: 申請者またはメールアドレスがありません。EventDetail=%s", event_detail.pk)
-        return False
+        return None
 
     edit_url = _build_application_edit_url(event_detail)
     context = {
@@ -92,22 +103,102 @@ def send_slide_reminder_email(event_detail: EventDetail) -> bool:
         'event_detail': event_detail,
         'edit_url': edit_url,
     }
-    subject = f"[{event_detail.event.community.name}] 発表資料公開のお願い"
-    message = render_to_string('event/email/slide_publication_reminder.txt', context).strip()
-    html_message = render_to_string('event/email/slide_publication_reminder.html', context)
-
-    sent = send_mail(
-        subject=subject,
-        message=message,
-        from_email=settings.DEFAULT_FROM_EMAIL,
+    return build_email(
+        subject=f"[{event_detail.event.community.name}] 発表資料公開のお願い",
+        message=render_to_string('event/email/slide_publication_reminder.txt', context).strip(),
+        html_message=render_to_string('event/email/slide_publication_reminder.html', context),
         recipient_list=[applicant.email],
-        html_message=html_message,
     )
-    if sent:
-        logger.info("資料公開リマインド送信成功: EventDetail=%s, email=%s", event_detail.pk, applicant.email)
+
+
+def send_slide_reminder_email(event_detail: EventDetail) -> bool:
+    """資料未公開の発表者へリマインドメールを送信する。"""
+    email = build_slide_reminder_email(event_detail)
+    if email is None:
+        return False
+    [outcome] = send_email_batch([email])
+    _log_slide_reminder_outcome(event_detail, outcome)
+    return outcome.ok
+
+
+def _log_slide_reminder_outcome(event_detail: EventDetail, outcome: MailOutcome) -> None:
+    if outcome.ok:
+        logger.info("資料公開リマインド送信成功: EventDetail=%s, email=%s", event_detail.pk, outcome.message.to[0])
+    else:
+        logger.warning(
+            "資料公開リマインド送信失敗: EventDetail=%s, email=%s, error_type=%s",
+            event_detail.pk,
+            outcome.message.to[0],
+            type(outcome.error).__name__,
+        )
+
+
+def _claim_slide_reminder_targets(
+    candidate_ids: list[int],
+    claimed_at,
+) -> tuple[list[EventDetail], int, int]:
+    """送信対象を行ロックで確定し、follow_up_claimed_at を記録して他の実行と重複しないようにする。
+
+    ロックを持つのはこの確定処理だけで、メールの組み立て・送信はコミット後に行う。
+    follow_up_sent_at は送信結果が出てから記録する（_record_slide_reminder_outcome）。
+
+    Returns:
+        (送信対象, スキップ件数, エラー件数)
+    """
+    claimed: list[EventDetail] = []
+    skipped = 0
+    failed = 0
+    with transaction.atomic():
+        locked_details = (
+            EventDetail.objects.select_for_update()
+            .select_related('applicant', 'event', 'event__community')
+            .select_related('material_upload_reminder_log')
+            .filter(pk__in=candidate_ids)
+            .order_by('event__date', 'pk')
+        )
+        for locked in locked_details:
+            try:
+                reminder_log = getattr(locked, 'material_upload_reminder_log', None)
+                if (
+                    not reminder_log
+                    or reminder_log.status != MaterialUploadReminderLog.Status.SENT
+                    or reminder_log.follow_up_sent_at
+                    or not (
+                        reminder_log.follow_up_claimed_at is None
+                        or reminder_log.follow_up_claimed_at < claimed_at - SLIDE_REMINDER_CLAIM_TIMEOUT
+                    )
+                    or has_published_material(locked)
+                ):
+                    skipped += 1
+                    continue
+                recipient = get_material_reminder_recipient(locked)
+                if not recipient or not recipient.email:
+                    skipped += 1
+                    continue
+            except Exception:
+                logger.exception("資料公開リマインド処理エラー: EventDetail=%s", locked.pk)
+                failed += 1
+                continue
+            claimed.append(locked)
+
+        MaterialUploadReminderLog.objects.filter(
+            pk__in=[detail.material_upload_reminder_log.pk for detail in claimed],
+        ).update(follow_up_claimed_at=claimed_at)
+    return claimed, skipped, failed
+
+
+def _record_slide_reminder_outcome(event_detail: EventDetail, claimed_at, ok: bool) -> None:
+    """1通の送信結果を記録する。送れた分は送信済みに、送れなかった分は確保を外して次回に回す。
+
+    自分が確保したままの行だけを更新する（期限切れで他の実行が確保し直した行は触らない）。
+    """
+    mine = MaterialUploadReminderLog.objects.filter(
+        pk=event_detail.material_upload_reminder_log.pk, follow_up_claimed_at=claimed_at,
+    )
+    if ok:
+        mine.update(follow_up_sent_at=timezone.now(), follow_up_claimed_at=None)
     else:
-        logger.warning("資料公開リマインド送信失敗: EventDetail=%s, email=%s", event_detail.pk, applicant.email)
-    return bool(sent)
+        mine.update(follow_up_claimed_at=None)
 
 
 def process_slide_publication_reminders(
@@ -116,8 +207,14 @@ def process_slide_publication_reminders(
     limit: int = DEFAULT_SLIDE_REMINDER_LIMIT,
     now=None,
 ) -> SlideReminderResult:
-    """未公開資料の1週間後リマインドを送信する。"""
-    queryset = get_slide_reminder_queryset(now=now)
+    """未公開資料の1週間後リマインドを送信する。
+
+    対象を確保してから、全メールを組み立てて1つの接続で送る。1通送るごとに結果を記録し、
+    送れなかった分は確保を外して次回の実行で再送する。実行が途中で落ちた場合は、
+    確保の期限（SLIDE_REMINDER_CLAIM_TIMEOUT）が切れた後の実行が送り直す。
+    """
+    claimed_at = now or timezone.now()
+    queryset = get_slide_reminder_queryset(now=claimed_at)
     candidate_ids = list(queryset.values_list('id', flat=True)[:limit])
     if dry_run:
         return SlideReminderResult(
@@ -129,48 +226,39 @@ def process_slide_publication_reminders(
             event_detail_ids=candidate_ids,
         )
 
-    sent = 0
-    skipped = 0
-    failed = 0
-    processed_ids: list[int] = []
+    claimed, skipped, failed = _claim_slide_reminder_targets(candidate_ids, claimed_at)
 
-    for event_detail_id in candidate_ids:
+    to_send: list[tuple[EventDetail, EmailMultiAlternatives]] = []
+    for event_detail in claimed:
         try:
-            with transaction.atomic():
-                locked = (
-                    EventDetail.objects.select_for_update()
-                    .select_related('applicant', 'event', 'event__community')
-                    .select_related('material_upload_reminder_log')
-                    .get(pk=event_detail_id)
-                )
-                reminder_log = getattr(locked, 'material_upload_reminder_log', None)
-                if (
-                    not reminder_log
-                    or reminder_log.status != MaterialUploadReminderLog.Status.SENT
-                    or reminder_log.follow_up_sent_at
-                    or has_published_material(locked)
-                ):
-                    skipped += 1
-                    continue
-                recipient = get_material_reminder_recipient(locked)
-                if not recipient or not recipient.email:
-                    skipped += 1
-                    continue
-                if send_slide_reminder_email(locked):
-                    reminder_log.follow_up_sent_at = timezone.now()
-                    reminder_log.save(update_fields=['follow_up_sent_at'])
-                    sent += 1
-                    processed_ids.append(locked.pk)
-                else:
-                    failed += 1
+            email = build_slide_reminder_email(event_detail)
         except Exception:
-            logger.exception("資料公開リマインド処理エラー: EventDetail=%s", event_detail_id)
+            logger.exception("資料公開リマインド処理エラー: EventDetail=%s", event_detail.pk)
+            email = None
+        if email is None:
             failed += 1
+            _record_slide_reminder_outcome(event_detail, claimed_at, ok=False)
+            continue
+        to_send.append((event_detail, email))
+
+    processed_ids: list[int] = []
+
+    def record_outcome(index: int, outcome: MailOutcome) -> None:
+        nonlocal failed
+        event_detail, _ = to_send[index]
+        _log_slide_reminder_outcome(event_detail, outcome)
+        _record_slide_reminder_outcome(event_detail, claimed_at, ok=outcome.ok)
+        if outcome.ok:
+            processed_ids.append(event_detail.pk)
+        else:
+            failed += 1
+
+    send_email_batch([email for _, email in to_send], on_outcome=record_outcome)
 
     return SlideReminderResult(
         dry_run=False,
         candidates=len(candidate_ids),
-        sent=sent,
+        sent=len(processed_ids),
         skipped=skipped,
         failed=failed,
         event_detail_ids=processed_ids,
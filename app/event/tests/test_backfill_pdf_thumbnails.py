@@ -3,17 +3,24 @@ from io import StringIO
 from unittest.mock import patch
 
 from django.core.files.base import ContentFile
+from django.core.cache import cache
 from django.core.management import call_command
+from django.core.management.base import CommandError
 from django.test import TestCase
 
 from community.models import Community
+from event.management.commands.backfill_event_detail_pdf_thumbnails import CHECKPOINT_NAME
 from event.models import Event, EventDetail
+from tests.factories import make_community, make_event, make_event_detail
+from utils.batch_processing import BatchCheckpoint
 
 
 class BackfillEventDetailPdfThumbnailsCommandTest(TestCase):
     """EventDetail PDFサムネイル再生成コマンドのテスト."""
 
     def setUp(self):
+        # レンダリング結果はPDFの内容ハッシュでキャッシュされるため、テスト間で共有しない
+        cache.clear()
         self.community = Community.objects.create(name="Test Community")
         self.event = Event.objects.create(
             community=self.community,
@@ -32,27 +39,126 @@ class BackfillEventDetailPdfThumbnailsCommandTest(TestCase):
         self.detail.slide_file.save("test.pdf", ContentFile(b"%PDF-1.4\n%%EOF"), save=True)
         self.detail.thumbnail_image.save("existing.jpg", ContentFile(b"old"), save=True)
 
-    @patch("event.management.commands.backfill_event_detail_pdf_thumbnails.ensure_pdf_thumbnail")
-    def test_dry_run_does_not_generate_thumbnail(self, mock_ensure_pdf_thumbnail):
+    @patch("event.management.commands.backfill_event_detail_pdf_thumbnails.render_pdf_thumbnail_jpeg")
+    def test_dry_run_does_not_generate_thumbnail(self, mock_render):
         """dry-runでは対象を表示するだけで生成しない."""
         stdout = StringIO()
 
         call_command("backfill_event_detail_pdf_thumbnails", "--dry-run", "--force", stdout=stdout)
 
         self.assertIn(f"DRY-RUN id={self.detail.pk}", stdout.getvalue())
-        mock_ensure_pdf_thumbnail.assert_not_called()
+        mock_render.assert_not_called()
 
     @patch("event.management.commands.backfill_event_detail_pdf_thumbnails.sync_slide_share_queue_image")
-    @patch("event.management.commands.backfill_event_detail_pdf_thumbnails.ensure_pdf_thumbnail", return_value=True)
-    def test_force_overwrites_existing_thumbnail(self, mock_ensure_pdf_thumbnail, mock_sync_image):
+    @patch(
+        "event.management.commands.backfill_event_detail_pdf_thumbnails.render_pdf_thumbnail_jpeg",
+        return_value=b"new-thumbnail",
+    )
+    def test_force_overwrites_existing_thumbnail(self, mock_render, mock_sync_image):
         """force指定では既存サムネイルありのPDFも上書き対象にする."""
         stdout = StringIO()
 
-        call_command("backfill_event_detail_pdf_thumbnails", "--force", stdout=stdout)
+        call_command("backfill_event_detail_pdf_thumbnails", "--force", "--workers", "1", stdout=stdout)
 
-        mock_ensure_pdf_thumbnail.assert_called_once()
-        event_detail = mock_ensure_pdf_thumbnail.call_args.args[0]
-        self.assertEqual(event_detail.pk, self.detail.pk)
-        self.assertEqual(mock_ensure_pdf_thumbnail.call_args.kwargs, {"save": True, "overwrite": True})
-        mock_sync_image.assert_called_once_with(event_detail)
+        mock_render.assert_called_once_with(b"%PDF-1.4\n%%EOF")
+        self.detail.refresh_from_db()
+        self.assertIn(f"event_detail_{self.detail.pk}_thumbnail", self.detail.thumbnail_image.name)
+        with self.detail.thumbnail_image.open("rb") as thumbnail:
+            self.assertEqual(thumbnail.read(), b"new-thumbnail")
+        mock_sync_image.assert_called_once()
+        self.assertEqual(mock_sync_image.call_args.args[0].pk, self.detail.pk)
         self.assertIn("updated=1", stdout.getvalue())
+
+    @patch("event.management.commands.backfill_event_detail_pdf_thumbnails.sync_slide_share_queue_image")
+    @patch(
+        "event.management.commands.backfill_event_detail_pdf_thumbnails.render_pdf_thumbnail_jpeg",
+        side_effect=RuntimeError("broken pdf"),
+    )
+    def test_render_failure_is_reported(self, _mock_render, mock_sync_image):
+        """レンダリングに失敗したEventDetailは失敗として集計し、異常終了する."""
+        stdout = StringIO()
+        stderr = StringIO()
+
+        with self.assertRaises(CommandError):
+            call_command(
+                "backfill_event_detail_pdf_thumbnails", "--force", "--workers", "1",
+                stdout=stdout, stderr=stderr,
+            )
+
+        self.assertIn(f"FAILED id={self.detail.pk}: broken pdf", stderr.getvalue())
+        mock_sync_image.assert_not_called()
+
+
+class BackfillEventDetailPdfThumbnailsResumeTest(TestCase):
+    """チェックポイントからの再開のテスト."""
+
+    def setUp(self):
+        cache.clear()
+        event = make_event(make_community(name="Resume Community"), event_date=date(2025, 1, 1))
+        self.details = []
+        for i in range(3):
+            detail = make_event_detail(event, speaker=f"Speaker {i}", theme=f"Theme {i}")
+            # 内容ハッシュのキャッシュで描画が省略されないよう、PDFごとに内容を変える
+            detail.slide_file.save(f"resume{i}.pdf", ContentFile(f"%PDF-1.4\n%{i}\n%%EOF".encode()), save=True)
+            self.details.append(detail)
+
+    def tearDown(self):
+        cache.clear()
+
+    @patch("event.management.commands.backfill_event_detail_pdf_thumbnails.sync_slide_share_queue_image")
+    @patch(
+        "event.management.commands.backfill_event_detail_pdf_thumbnails.render_pdf_thumbnail_jpeg",
+        return_value=b"thumb",
+    )
+    def test_resume_skips_completed_chunks(self, mock_render, _mock_sync_image):
+        """--resume は保存済みチェックポイントより後のEventDetailだけを処理する."""
+        BatchCheckpoint(CHECKPOINT_NAME).save(self.details[1].pk)
+        stdout = StringIO()
+
+        call_command(
+            "backfill_event_detail_pdf_thumbnails", "--resume", "--workers", "1", "--batch-size", "1",
+            stdout=stdout,
+        )
+
+        self.assertEqual(mock_render.call_count, 1)
+        self.assertIn(f"UPDATED id={self.details[2].pk}", stdout.getvalue())
+        self.assertNotIn(f"UPDATED id={self.details[0].pk}", stdout.getvalue())
+        self.assertIsNone(BatchCheckpoint(CHECKPOINT_NAME).load())
+
+    @patch("event.management.commands.backfill_event_detail_pdf_thumbnails.sync_slide_share_queue_image")
+    @patch("event.management.commands.backfill_event_detail_pdf_thumbnails.render_pdf_thumbnail_jpeg")
+    def test_checkpoint_survives_interruption(self, mock_render, _mock_sync_image):
+        """途中で中断した場合は完了済みチャンクの位置がチェックポイントに残る."""
+        mock_render.side_effect = [b"thumb", KeyboardInterrupt()]
+
+        with self.assertRaises(KeyboardInterrupt):
+            call_command(
+                "backfill_event_detail_pdf_thumbnails", "--workers", "1", "--batch-size", "1",
+                stdout=StringIO(),
+            )
+
+        self.assertEqual(BatchCheckpoint(CHECKPOINT_NAME).load(), self.details[0].pk)
+
+    @patch("event.management.commands.backfill_event_detail_pdf_thumbnails.sync_slide_share_queue_image")
+    @patch(
+        "event.management.commands.backfill_event_detail_pdf_thumbnails.render_pdf_thumbnail_jpeg",
+        return_value=b"thumb",
+    )
+    def test_ids_and_limit_runs_leave_full_run_checkpoint(self, mock_render, _mock_sync_image):
+        """--ids / --limit の部分実行は全件実行のチェックポイントを読まず、上書きも削除もしない."""
+        BatchCheckpoint(CHECKPOINT_NAME).save(self.details[1].pk)
+
+        call_command(
+            "backfill_event_detail_pdf_thumbnails", "--resume", "--ids", str(self.details[0].pk),
+            "--workers", "1", "--batch-size", "1", stdout=StringIO(),
+        )
+        call_command(
+            "backfill_event_detail_pdf_thumbnails", "--limit", "1",
+            "--workers", "1", "--batch-size", "1", stdout=StringIO(),
+        )
+
+        # --ids はチェックポイントより前のIDでも処理する
+        self.details[0].refresh_from_db()
+        self.assertTrue(self.details[0].thumbnail_image.name)
+        self.assertEqual(mock_render.call_count, 2)
+        self.assertEqual(BatchCheckpoint(CHECKPOINT_NAME).load(), self.details[1].pk)
@@ -6,12 +6,14 @@ from django.urls import reverse
 
 from community.models import Community
 from event.models import Event, EventDetail
+from website.throttling import buckets
 
 
 @override_settings(ALLOWED_HOSTS=['testserver', 'localhost', '127.0.0.1'])
 class EventDetailHistoryRateLimitTest(TestCase):
     def setUp(self):
         cache.clear()
+        buckets.reset()
         self.client = Client()
         self.url = reverse('event:detail_history')
 
@@ -69,6 +71,7 @@ class EventDetailHistoryRateLimitTest(TestCase):
 class EventDetailHistoryQueryBloatPreventionTest(TestCase):
     def setUp(self):
         cache.clear()
+        buckets.reset()
         self.client = Client()
         self.url = reverse('event:detail_history')
 
@@ -1,3 +1,4 @@
+import hashlib
 import json
 import logging
 import os
@@ -6,6 +7,7 @@ from io import BytesIO
 from datetime import date, datetime
 from unittest.mock import MagicMock, patch
 
+from django.core.cache import cache
 from django.core.files.base import ContentFile
 from django.core.files import File
 from django.test import TestCase
@@ -19,20 +21,26 @@ from event.services.content_generation_service import (
     BlogOutput,
     apply_blog_output_to_event_detail,
     generate_blog,
-    _copy_uploaded_file_to_temp_path,
     _extract_pdf_text,
     _limit_source_text,
 )
 from event.services.youtube_service import get_transcript
 from event.services.media_service import ensure_pdf_thumbnail
-from event.models import Event, EventDetail
+from event.services.slide_pdf import SlidePdf, get_slide_pdf
+from event.services.source_material import get_or_create_slide_material, get_slide_material
+from event.models import Event, EventDetail, SourceMaterial
 from tests.live_smoke import require_live_smoke
 
 logger = logging.getLogger(__name__)
 
 class ContentGenerationMemoryGuardTest(TestCase):
-    def test_copy_uploaded_file_uses_chunks_without_reading_all(self):
+    def setUp(self):
+        cache.clear()
+
+    def test_slide_pdf_reads_file_by_chunks_without_temp_copy(self):
         class ChunkOnlyFile:
+            name = "slide/test.pdf"
+
             def __init__(self):
                 self.opened = False
                 self.closed = False
@@ -51,39 +59,41 @@ class ContentGenerationMemoryGuardTest(TestCase):
                 self.closed = True
 
         uploaded_file = ChunkOnlyFile()
-        temp_file_path = _copy_uploaded_file_to_temp_path(uploaded_file)
-        try:
-            with open(temp_file_path, "rb") as copied:
-                self.assertEqual(copied.read(), b"%PDF-1.4\n%%EOF")
-        finally:
-            os.unlink(temp_file_path)
+        with patch("tempfile.NamedTemporaryFile") as mock_temp_file:
+            slide_pdf = SlidePdf.from_file(uploaded_file)
 
+        self.assertEqual(slide_pdf.data, b"%PDF-1.4\n%%EOF")
+        self.assertEqual(slide_pdf.content_hash, hashlib.sha256(b"%PDF-1.4\n%%EOF").hexdigest())
+        mock_temp_file.assert_not_called()
         self.assertTrue(uploaded_file.opened)
         self.assertTrue(uploaded_file.closed)
 
     def test_extract_pdf_text_limits_pages_and_chars(self):
-        class FakePage:
-            def __init__(self, text):
-                self.text = text
-
-            def extract_text(self):
-                return self.text
-
-        fake_reader = type(
-            "FakeReader",
-            (),
-            {"pages": [FakePage(f"page-{index}") for index in range(35)]},
+        page_texts = [f"page-{index}" for index in range(35)]
+        slide_material = SourceMaterial(
+            kind=SourceMaterial.Kind.SLIDE_PDF,
+            text=SourceMaterial.PAGE_SEPARATOR.join(page_texts),
         )
 
-        with (
-            patch("event.services.content_generation_service.PdfReader", return_value=fake_reader),
-            patch("event.services.content_generation_service.MAX_PDF_TEXT_PAGES", 5),
-        ):
-            text = _extract_pdf_text("/tmp/example.pdf", max_chars=18)
+        with patch("event.services.content_generation_service.MAX_PDF_TEXT_PAGES", 5):
+            text = _extract_pdf_text(slide_material, max_chars=18)
 
         self.assertEqual(text, "page-0\npage-1\npage")
         self.assertNotIn("page-5", text)
 
+    def test_extract_pdf_text_from_real_pdf_uses_pdfium_document(self):
+        pdf_path = os.path.join(os.path.dirname(__file__), "input_data", "perplexity.pdf")
+        with open(pdf_path, "rb") as pdf_file:
+            slide_pdf = SlidePdf(pdf_file.read())
+
+        slide_material = get_or_create_slide_material(slide_pdf)
+        text = _extract_pdf_text(slide_material, max_chars=200)
+
+        self.assertTrue(text)
+        self.assertLessEqual(len(text), 200 + slide_pdf.page_count)
+        self.assertEqual(slide_material.page_count, slide_pdf.page_count)
+        self.assertEqual(slide_material.content_key, slide_pdf.content_hash)
+
     def test_limit_source_text_truncates_long_transcripts(self):
         self.assertEqual(_limit_source_text("abcdef", max_chars=3), "abc")
 
@@ -116,6 +126,10 @@ class TestGenerateBlog(TestCase):
         if os.path.exists(cls.local_file_path):
             os.unlink(cls.local_file_path)
 
+    def setUp(self):
+        # サムネイル・抽出テキストは内容ハッシュでキャッシュされるため、テスト間で共有しない
+        cache.clear()
+
     def create_event_detail(self, youtube_url=None, slide_file=None):
         event_detail = EventDetail.objects.create(
             theme="Perplexityってどうなのよ？",
@@ -316,7 +330,7 @@ class TestGenerateBlog(TestCase):
         self.assertEqual(result.text, '')
 
     @patch.dict("os.environ", {"OPENROUTER_API_KEY": "test-key"}, clear=False)
-    @patch("event.services.content_generation_service.OpenAI")
+    @patch("website.llm_gateway.OpenAI")
     def test_generate_blog_returns_empty_output_when_response_content_is_none(
         self,
         mock_openai_class,
@@ -361,7 +375,7 @@ class TestGenerateBlog(TestCase):
         self.assertTrue(valid_output.meta_description)
         self.assertTrue(valid_output.text)
 
-    @patch("event.services.media_service.pdfium.PdfDocument")
+    @patch("event.thumbnail.pdfium.PdfDocument")
     def test_ensure_pdf_thumbnail_creates_image_from_pdf(self, mock_pdf_document):
         """PDFの先頭ページから16:9のサムネイル画像を作成する."""
         event_detail = self.create_event_detail(slide_file=True)
@@ -378,7 +392,7 @@ class TestGenerateBlog(TestCase):
             self.assertEqual(thumbnail.size, (120, 67))
         mock_pdf_document.assert_called_once()
 
-    @patch("event.services.media_service.pdfium.PdfDocument")
+    @patch("event.thumbnail.pdfium.PdfDocument")
     def test_ensure_pdf_thumbnail_uses_default_scale_for_normal_page(self, mock_pdf_document):
         """通常サイズのPDFは既存の最大倍率でレンダリングする."""
         event_detail = self.create_event_detail(slide_file=True)
@@ -392,7 +406,7 @@ class TestGenerateBlog(TestCase):
         self.assertTrue(result)
         mock_page.render.assert_called_once_with(scale=2.0)
 
-    @patch("event.services.media_service.pdfium.PdfDocument")
+    @patch("event.thumbnail.pdfium.PdfDocument")
     def test_ensure_pdf_thumbnail_limits_scale_for_large_page(self, mock_pdf_document):
         """巨大なPDFページはレンダリング長辺が過大にならない倍率に抑える."""
         event_detail = self.create_event_detail(slide_file=True)
@@ -406,7 +420,7 @@ class TestGenerateBlog(TestCase):
         self.assertTrue(result)
         mock_page.render.assert_called_once_with(scale=0.4)
 
-    @patch("event.services.media_service.pdfium.PdfDocument")
+    @patch("event.thumbnail.pdfium.PdfDocument")
     def test_ensure_pdf_thumbnail_skips_when_already_set(self, mock_pdf_document):
         """既存サムネイルがある場合はPDFレンダリングしない."""
         event_detail = self.create_event_detail(slide_file=True)
@@ -423,7 +437,7 @@ class TestGenerateBlog(TestCase):
         self.assertFalse(result)
         mock_pdf_document.assert_not_called()
 
-    @patch("event.services.media_service.pdfium.PdfDocument")
+    @patch("event.thumbnail.pdfium.PdfDocument")
     def test_ensure_pdf_thumbnail_overwrites_existing_thumbnail(self, mock_pdf_document):
         """overwrite=Trueの場合は既存サムネイルがあってもPDFから再生成する."""
         event_detail = self.create_event_detail(slide_file=True)
@@ -444,6 +458,33 @@ class TestGenerateBlog(TestCase):
         self.assertIn(f"event_detail_{event_detail.pk}_thumbnail", event_detail.thumbnail_image.name)
         mock_pdf_document.assert_called_once()
 
+    @patch("event.thumbnail.pdfium.PdfDocument")
+    def test_ensure_pdf_thumbnail_reuses_render_for_same_content(self, mock_pdf_document):
+        """同じ内容のPDFは内容ハッシュのキャッシュを使い、再レンダリングしない."""
+        first = self.create_event_detail(slide_file=True)
+        second = self.create_event_detail(slide_file=True)
+        image = Image.new("RGB", (160, 90), color="white")
+        mock_bitmap = mock_pdf_document.return_value.__getitem__.return_value.render.return_value
+        mock_bitmap.to_pil.return_value = image
+
+        self.assertTrue(ensure_pdf_thumbnail(first))
+        self.assertTrue(ensure_pdf_thumbnail(second))
+
+        mock_pdf_document.assert_called_once()
+        self.assertTrue(second.thumbnail_image.name.endswith(".jpg"))
+
+    def test_thumbnail_and_text_extraction_share_one_read(self):
+        """同一リクエスト内のサムネイル生成とテキスト抽出はPDFを1回だけ読み出して共有する."""
+        event_detail = self.create_event_detail(slide_file=True)
+
+        with patch.object(SlidePdf, "from_file", wraps=SlidePdf.from_file) as mock_from_file:
+            slide_pdf = get_slide_pdf(event_detail)
+            get_slide_material(event_detail)
+            self.assertTrue(ensure_pdf_thumbnail(event_detail))
+            self.assertIs(get_slide_pdf(event_detail), slide_pdf)
+
+        mock_from_file.assert_called_once()
+
     @patch("event.services.content_generation_service.ensure_pdf_thumbnail")
     def test_apply_blog_output_sets_article_and_thumbnail(self, mock_ensure_pdf_thumbnail):
         """記事生成結果を反映するときに未設定サムネイルも補完する."""
@@ -663,56 +704,63 @@ class TranscriptCacheTest(TestCase):
         mock_client.chat.completions.create.return_value = mock_completion
         return mock_client
 
+    def _transcript_material(self):
+        return SourceMaterial.objects.filter(
+            kind=SourceMaterial.Kind.TRANSCRIPT, content_key=f"{self.VIDEO_ID}:ja"
+        ).first()
+
     @patch.dict("os.environ", {"OPENROUTER_API_KEY": "test-key"}, clear=False)
-    @patch("event.services.content_generation_service.OpenAI")
-    @patch("event.services.content_generation_service.get_transcript")
+    @patch("website.llm_gateway.OpenAI")
+    @patch("event.services.source_material.get_transcript")
     def test_transcript_cache_hit_skips_api(self, mock_get_transcript, mock_openai_class):
-        """キャッシュがあり video_id が一致すればYouTube APIを呼ばない."""
+        """同じ動画の字幕が保存済みならYouTube APIを呼ばない."""
         mock_openai_class.return_value = self._patch_openrouter()
-        detail = self._create_detail(
-            cached_transcript="キャッシュされた字幕",
-            cached_transcript_video_id=self.VIDEO_ID,
+        SourceMaterial.objects.create(
+            kind=SourceMaterial.Kind.TRANSCRIPT,
+            content_key=f"{self.VIDEO_ID}:ja",
+            text="キャッシュされた字幕",
         )
+        detail = self._create_detail()
 
         generate_blog(detail, model="test-model")
 
         mock_get_transcript.assert_not_called()
+        prompt_text = mock_openai_class.return_value.chat.completions.create.call_args.kwargs["messages"][1]["content"]
+        self.assertIn("キャッシュされた字幕", prompt_text)
 
     @patch.dict("os.environ", {"OPENROUTER_API_KEY": "test-key"}, clear=False)
-    @patch("event.services.content_generation_service.OpenAI")
-    @patch("event.services.content_generation_service.get_transcript", return_value="新しい字幕")
+    @patch("website.llm_gateway.OpenAI")
+    @patch("event.services.source_material.get_transcript", return_value="新しい字幕")
     def test_transcript_cached_after_successful_fetch(self, mock_get_transcript, mock_openai_class):
-        """取得成功時にキャッシュが保存される."""
+        """取得成功時に字幕が保存され、同じ動画の別発表でも再利用される."""
         mock_openai_class.return_value = self._patch_openrouter()
         detail = self._create_detail()
 
         generate_blog(detail, model="test-model")
+        generate_blog(self._create_detail(), model="test-model")
 
-        detail.refresh_from_db()
-        self.assertEqual(detail.cached_transcript, "新しい字幕")
-        self.assertEqual(detail.cached_transcript_video_id, self.VIDEO_ID)
+        self.assertEqual(self._transcript_material().text, "新しい字幕")
+        mock_get_transcript.assert_called_once_with(self.VIDEO_ID, "ja")
 
     @patch.dict("os.environ", {"OPENROUTER_API_KEY": "test-key"}, clear=False)
-    @patch("event.services.content_generation_service.OpenAI")
-    @patch("event.services.content_generation_service.get_transcript", return_value=None)
+    @patch("website.llm_gateway.OpenAI")
+    @patch("event.services.source_material.get_transcript", return_value=None)
     def test_transcript_fetch_failure_is_not_cached(self, mock_get_transcript, mock_openai_class):
-        """取得失敗時はキャッシュを書かない（恒久的な字幕なし扱いを避ける）."""
+        """取得失敗時は保存しない（恒久的な字幕なし扱いを避ける）."""
         mock_openai_class.return_value = self._patch_openrouter()
         detail = self._create_detail()
 
         generate_blog(detail, model="test-model")
 
-        detail.refresh_from_db()
-        self.assertEqual(detail.cached_transcript, "")
-        self.assertEqual(detail.cached_transcript_video_id, "")
+        self.assertIsNone(self._transcript_material())
 
     @patch.dict("os.environ", {"OPENROUTER_API_KEY": "test-key"}, clear=False)
-    @patch("event.services.content_generation_service.OpenAI")
-    @patch("event.services.content_generation_service.get_transcript", return_value="新しい字幕")
+    @patch("website.llm_gateway.OpenAI")
+    @patch("event.services.source_material.get_transcript", return_value="新しい字幕")
     def test_cache_write_does_not_disturb_posted_tweet_queue(self, mock_get_transcript, mock_openai_class):
-        """字幕キャッシュの保存が post_save シグナル経由で既投稿キューを壊さない.
+        """字幕の保存が post_save シグナル経由で既投稿キューを壊さない.
 
-        save() でキャッシュを書くと当日開催の承認済み発表では daily_reminder
+        EventDetail を save() で更新すると当日開催の承認済み発表では daily_reminder
         再同期が走り、投稿済み TweetQueue の generated_text が消える退行があった。
         """
         from django.utils import timezone
@@ -748,18 +796,17 @@ class TranscriptCacheTest(TestCase):
         self.assertEqual(queue.generated_text, "published text")
         self.assertEqual(queue.status, "posted")
         self.assertEqual(queue.error_message, "")
-        detail.refresh_from_db()
-        self.assertEqual(detail.cached_transcript, "新しい字幕")
+        self.assertEqual(self._transcript_material().text, "新しい字幕")
 
     @patch.dict("os.environ", {"OPENROUTER_API_KEY": "test-key"}, clear=False)
-    @patch("event.services.content_generation_service.OpenAI")
+    @patch("website.llm_gateway.OpenAI")
     @patch("event.services.content_generation_service._extract_pdf_text")
-    @patch("event.services.content_generation_service._copy_uploaded_file_to_temp_path", return_value="/tmp/dummy.pdf")
-    @patch("event.services.content_generation_service.get_transcript")
+    @patch("event.services.content_generation_service.get_slide_material")
+    @patch("event.services.source_material.get_transcript")
     def test_combined_source_limit(
         self,
         mock_get_transcript,
-        mock_copy,
+        mock_get_slide_material,
         mock_extract_pdf_text,
         mock_openai_class,
     ):
@@ -772,7 +819,7 @@ class TranscriptCacheTest(TestCase):
         mock_openai_class.return_value = mock_client
 
         # PDF 側は与えられた残り予算いっぱいのテキストを返す
-        mock_extract_pdf_text.side_effect = lambda path, *, max_chars: pdf_marker * max_chars
+        mock_extract_pdf_text.side_effect = lambda slide_material, *, max_chars: pdf_marker * max_chars
 
         detail = self._create_detail()
         with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as temp_file:
@@ -185,7 +185,7 @@ class OpenAICompatibleApiKeyMissingTest(SimpleTestCase):
         self.assertIn("OPENROUTER_API_KEY_DOES_NOT_EXIST", str(ctx.exception))
 
     @patch.dict("os.environ", {"FAKE_KEY": "secret"}, clear=False)
-    @patch("event.llm_service.OpenAI")
+    @patch("website.llm_gateway.OpenAI")
     def test_passes_base_url_when_provided(self, mock_openai_class):
         """base_url 指定時に OpenAI クライアントへ渡される"""
         mock_client = MagicMock()
@@ -104,7 +104,7 @@ class LTApplicationFormTest(TestCase):
         self.assertIn(self.future_event, event_queryset)
         self.assertNotIn(self.no_lt_event, event_queryset)
 
-    @patch('event.notifications.send_mail')
+    @patch('ta_hub.outbox.send_mail')
     def test_lt_application_creates_event_detail(self, mock_send_mail):
         """LT申請でEventDetailが作成される"""
         mock_send_mail.return_value = 1
@@ -139,7 +139,7 @@ class LTApplicationFormTest(TestCase):
         self.assertEqual(event_detail.status, 'pending')
         self.assertEqual(event_detail.applicant, self.user)
 
-    @patch('event.notifications.send_mail')
+    @patch('ta_hub.outbox.send_mail')
     def test_lt_application_uses_default_offset_30(self, mock_send_mail):
         """デフォルトのオフセット 30 分で LT 開始時刻が計算される"""
         mock_send_mail.return_value = 1
@@ -159,7 +159,7 @@ class LTApplicationFormTest(TestCase):
         # event.start_time = 22:00、オフセット30分 → 22:30
         self.assertEqual(event_detail.start_time, time(22, 30))
 
-    @patch('event.notifications.send_mail')
+    @patch('ta_hub.outbox.send_mail')
     def test_lt_application_ignores_posted_duration(self, mock_send_mail):
         """POSTされた持ち時間ではなく集会のデフォルトを保存する。"""
         mock_send_mail.return_value = 1
@@ -208,7 +208,7 @@ class LTApplicationFormTest(TestCase):
         self.assertEqual(response.status_code, 302)
         self.assertTrue('login' in response.url.lower())
 
-    @patch('event.notifications.send_mail')
+    @patch('ta_hub.outbox.send_mail')
     def test_lt_application_uses_custom_offset(self, mock_send_mail):
         """カスタムオフセットが LT 開始時刻に反映される"""
         mock_send_mail.return_value = 1
@@ -227,7 +227,7 @@ class LTApplicationFormTest(TestCase):
         # event.start_time = 22:00、オフセット45分 → 22:45
         self.assertEqual(event_detail.start_time, time(22, 45))
 
-    @patch('event.notifications.send_mail')
+    @patch('ta_hub.outbox.send_mail')
     def test_lt_application_offset_zero(self, mock_send_mail):
         """オフセット 0 のときは event.start_time と一致（旧挙動と同等）"""
         mock_send_mail.return_value = 1
@@ -245,7 +245,7 @@ class LTApplicationFormTest(TestCase):
         event_detail = EventDetail.objects.get(event=self.future_event, theme='Offset0')
         self.assertEqual(event_detail.start_time, time(22, 0))
 
-    @patch('event.notifications.send_mail')
+    @patch('ta_hub.outbox.send_mail')
     def test_lt_application_assigns_start_time_after_pending_lt(self, mock_send_mail):
         """承認待ちLTの終了時刻を次のLTの開始時刻にする。"""
         mock_send_mail.return_value = 1
@@ -275,7 +275,7 @@ class LTApplicationFormTest(TestCase):
         third_lt = EventDetail.objects.get(event=self.future_event, theme='Third LT')
         self.assertEqual(third_lt.start_time, time(23, 15))
 
-    @patch('event.notifications.send_mail')
+    @patch('ta_hub.outbox.send_mail')
     def test_lt_application_ignores_rejected_lt_for_start_time(self, mock_send_mail):
         """却下済みLTは次の開始時刻の計算対象から除外する。"""
         mock_send_mail.return_value = 1
@@ -298,7 +298,7 @@ class LTApplicationFormTest(TestCase):
         new_lt = EventDetail.objects.get(event=self.future_event, theme='New LT')
         self.assertEqual(new_lt.start_time, time(22, 30))
 
-    @patch('event.notifications.send_mail')
+    @patch('ta_hub.outbox.send_mail')
     def test_lt_application_uses_latest_existing_lt_end_time(self, mock_send_mail):
         """LT間に空きがあっても最も遅い終了時刻の後に割り当てる。"""
         mock_send_mail.return_value = 1
@@ -328,7 +328,7 @@ class LTApplicationFormTest(TestCase):
         new_lt = EventDetail.objects.get(event=self.future_event, theme='New LT')
         self.assertEqual(new_lt.start_time, time(23, 30))
 
-    @patch('event.notifications.send_mail')
+    @patch('ta_hub.outbox.send_mail')
     def test_lt_application_handles_start_time_across_midnight(self, mock_send_mail):
         """日付をまたぐLTでもイベント開始時刻からの経過時間で順序付ける。"""
         mock_send_mail.return_value = 1
@@ -478,7 +478,7 @@ class LTApplicationReviewTest(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertContains(response, 'Test Theme')
 
-    @patch('event.notifications.send_mail')
+    @patch('ta_hub.outbox.send_mail')
     def test_approve_application(self, mock_send_mail):
         """申請を承認できる"""
         mock_send_mail.return_value = 1
@@ -494,7 +494,7 @@ class LTApplicationReviewTest(TestCase):
         self.pending_application.refresh_from_db()
         self.assertEqual(self.pending_application.status, 'approved')
 
-    @patch('event.notifications.send_mail')
+    @patch('ta_hub.outbox.send_mail')
     def test_reject_application(self, mock_send_mail):
         """申請を却下できる"""
         mock_send_mail.return_value = 1
@@ -525,7 +525,7 @@ class LTApplicationReviewTest(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertContains(response, '却下する場合は理由を入力してください')
 
-    @patch('event.notifications.send_mail')
+    @patch('ta_hub.outbox.send_mail')
     def test_approve_with_rescheduled_event(self, mock_send_mail):
         """開催日・開始時刻・持ち時間を変更して承認すると EventDetail に反映される"""
         mock_send_mail.return_value = 1
@@ -547,7 +547,7 @@ class LTApplicationReviewTest(TestCase):
         self.assertEqual(self.pending_application.start_time, time(23, 30))
         self.assertEqual(self.pending_application.duration, 25)
 
-    @patch('event.notifications.send_mail')
+    @patch('ta_hub.outbox.send_mail')
     def test_reject_ignores_schedule_edits(self, mock_send_mail):
         """却下時は日時の編集値を反映しない"""
         mock_send_mail.return_value = 1
@@ -670,7 +670,7 @@ class LTApplicationReviewTest(TestCase):
 
         self.assertIn(self.event, choices)
 
-    @patch('event.notifications.send_mail')
+    @patch('ta_hub.outbox.send_mail')
     def test_reschedule_is_shown_in_result_mail(self, mock_send_mail):
         """日時変更ありで承認するとメール本文に変更前後が載る"""
         mock_send_mail.return_value = 1
@@ -678,17 +678,18 @@ class LTApplicationReviewTest(TestCase):
         self.client.force_login(self.owner)
 
         url = reverse('event:lt_application_review', kwargs={'pk': self.pending_application.pk})
-        self.client.post(url, self._review_post_data(
-            action='approve',
-            event=other_event.pk,
-        ))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(url, self._review_post_data(
+                action='approve',
+                event=other_event.pk,
+            ))
 
         html_message = mock_send_mail.call_args.kwargs['html_message']
         self.assertIn('主催者による日時変更', html_message)
         self.assertIn(self.event.date.strftime('%Y-%m-%d'), html_message)
         self.assertIn(other_event.date.strftime('%Y-%m-%d'), html_message)
 
-    @patch('event.notifications.send_mail')
+    @patch('ta_hub.outbox.send_mail')
     def test_result_mail_shows_presentation_start_time(self, mock_send_mail):
         """結果メールには集会ではなく発表個別の開始時刻を載せる"""
         mock_send_mail.return_value = 1
@@ -697,15 +698,16 @@ class LTApplicationReviewTest(TestCase):
         self.client.force_login(self.owner)
 
         url = reverse('event:lt_application_review', kwargs={'pk': self.pending_application.pk})
-        self.client.post(url, self._review_post_data(
-            action='approve',
-            start_time='23:15',
-        ))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(url, self._review_post_data(
+                action='approve',
+                start_time='23:15',
+            ))
 
         html_message = mock_send_mail.call_args.kwargs['html_message']
         self.assertIn('23:15', html_message)
 
-    @patch('event.notifications.send_mail')
+    @patch('ta_hub.outbox.send_mail')
     def test_approve_keeps_concurrent_applicant_edit(self, mock_send_mail):
         """レビュー画面を開いた後に申請者が直した内容を承認で巻き戻さない"""
         mock_send_mail.return_value = 1
@@ -721,7 +723,7 @@ class LTApplicationReviewTest(TestCase):
         self.assertEqual(self.pending_application.theme, '申請者が直したテーマ')
         self.assertEqual(self.pending_application.status, 'approved')
 
-    @patch('event.notifications.send_mail')
+    @patch('ta_hub.outbox.send_mail')
     def test_reject_keeps_concurrent_schedule_edit(self, mock_send_mail):
         """却下は日時を触らないので、別経路で変わった日時をそのまま残す"""
         mock_send_mail.return_value = 1
@@ -741,14 +743,15 @@ class LTApplicationReviewTest(TestCase):
         self.assertEqual(self.pending_application.start_time, time(23, 45))
         self.assertEqual(self.pending_application.status, 'rejected')
 
-    @patch('event.notifications.send_mail')
+    @patch('ta_hub.outbox.send_mail')
     def test_no_reschedule_section_when_unchanged(self, mock_send_mail):
         """日時を変更せず承認した場合は変更明示セクションを出さない"""
         mock_send_mail.return_value = 1
         self.client.force_login(self.owner)
 
         url = reverse('event:lt_application_review', kwargs={'pk': self.pending_application.pk})
-        self.client.post(url, self._review_post_data(action='approve'))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(url, self._review_post_data(action='approve'))
 
         html_message = mock_send_mail.call_args.kwargs['html_message']
         self.assertNotIn('主催者による日時変更', html_message)
@@ -928,7 +931,7 @@ class LTApplicationApproveRejectViewTest(TestCase):
             applicant=self.applicant
         )
 
-    @patch('event.notifications.send_mail')
+    @patch('ta_hub.outbox.send_mail')
     def test_approve_via_new_endpoint(self, mock_send_mail):
         """新しいエンドポイントで申請を承認できる"""
         mock_send_mail.return_value = 1
@@ -944,7 +947,7 @@ class LTApplicationApproveRejectViewTest(TestCase):
         self.pending_application.refresh_from_db()
         self.assertEqual(self.pending_application.status, 'approved')
 
-    @patch('event.notifications.send_mail')
+    @patch('ta_hub.outbox.send_mail')
     def test_reject_via_new_endpoint(self, mock_send_mail):
         """新しいエンドポイントで申請を却下できる"""
         mock_send_mail.return_value = 1
@@ -1041,7 +1044,7 @@ class LTApplicationApproveRejectViewTest(TestCase):
         self.pending_application.refresh_from_db()
         self.assertEqual(self.pending_application.status, 'approved')
 
-    @patch('event.notifications.send_mail')
+    @patch('ta_hub.outbox.send_mail')
     def test_approve_ajax_response(self, mock_send_mail):
         """AJAX経由での承認時にJSONレスポンスが返る"""
         mock_send_mail.return_value = 1
@@ -1057,7 +1060,7 @@ class LTApplicationApproveRejectViewTest(TestCase):
         self.pending_application.refresh_from_db()
         self.assertEqual(self.pending_application.status, 'approved')
 
-    @patch('event.notifications.send_mail')
+    @patch('ta_hub.outbox.send_mail')
     def test_reject_ajax_response(self, mock_send_mail):
         """AJAX経由での却下時にJSONレスポンスが返る"""
         mock_send_mail.return_value = 1
@@ -1381,7 +1384,7 @@ class LTApplicationAdditionalInfoTest(TestCase):
         self.assertContains(response, '追加情報')
         self.assertIn('name="additional_info"', response.content.decode())
 
-    @patch('event.notifications.send_mail')
+    @patch('ta_hub.outbox.send_mail')
     def test_submit_with_template_same_as_template_fails(self, mock_send_mail):
         """テンプレートと同一内容で送信するとエラーになる"""
         mock_send_mail.return_value = 1
@@ -1399,7 +1402,7 @@ class LTApplicationAdditionalInfoTest(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertContains(response, 'テンプレートの各項目を入力してください')
 
-    @patch('event.notifications.send_mail')
+    @patch('ta_hub.outbox.send_mail')
     def test_submit_with_valid_additional_info_succeeds(self, mock_send_mail):
         """有効な追加情報で送信が成功する"""
         mock_send_mail.return_value = 1
@@ -1425,7 +1428,7 @@ class LTApplicationAdditionalInfoTest(TestCase):
         self.assertIsNotNone(event_detail)
         self.assertIn('VRChatの技術', event_detail.additional_info)
 
-    @patch('event.notifications.send_mail')
+    @patch('ta_hub.outbox.send_mail')
     def test_submit_without_template_no_additional_info(self, mock_send_mail):
         """テンプレートなし集会では追加情報なしで送信できる"""
         mock_send_mail.return_value = 1
@@ -1451,7 +1454,7 @@ class LTApplicationAdditionalInfoTest(TestCase):
         self.assertIsNotNone(event_detail)
         self.assertEqual(event_detail.additional_info, '')
 
-    @patch('event.notifications.send_mail')
+    @patch('ta_hub.outbox.send_mail')
     def test_submit_without_template_with_additional_info_succeeds(self, mock_send_mail):
         """テンプレートなし集会でも追加情報を自由記入できる"""
         mock_send_mail.return_value = 1
@@ -46,7 +46,7 @@ class LTApplicationUserSyncTest(TestCase):
             kwargs={'community_pk': self.community.pk},
         )
 
-    @patch('event.notifications.send_mail')
+    @patch('ta_hub.outbox.send_mail')
     def test_speaker_updates_display_name(self, mock_send):
         """speaker を変更して送信すると user.display_name が更新される."""
         mock_send.return_value = 1
@@ -67,7 +67,7 @@ class LTApplicationUserSyncTest(TestCase):
         ed = EventDetail.objects.get(event=self.future_event, theme='X-sync')
         self.assertEqual(ed.speaker, 'NewName')
 
-    @patch('event.notifications.send_mail')
+    @patch('ta_hub.outbox.send_mail')
     def test_x_account_normalized_from_url(self, mock_send):
         """x_account に URL を送ると正規化される."""
         mock_send.return_value = 1
@@ -83,7 +83,7 @@ class LTApplicationUserSyncTest(TestCase):
         self.user.refresh_from_db()
         self.assertEqual(self.user.x_account, 'noricha_vr')
 
-    @patch('event.notifications.send_mail')
+    @patch('ta_hub.outbox.send_mail')
     def test_x_account_empty_is_allowed(self, mock_send):
         """x_account 未入力でも申込が成立する."""
         mock_send.return_value = 1
@@ -99,7 +99,7 @@ class LTApplicationUserSyncTest(TestCase):
         self.user.refresh_from_db()
         self.assertEqual(self.user.x_account, '')
 
-    @patch('event.notifications.send_mail')
+    @patch('ta_hub.outbox.send_mail')
     def test_speaker_duplicate_other_user_name_allowed(self, mock_send):
         """他ユーザーが同じ user_name を持つ場合でも表示名として申込できる."""
         mock_send.return_value = 1
@@ -121,7 +121,7 @@ class LTApplicationUserSyncTest(TestCase):
         self.assertEqual(self.user.user_name, 'OriginalName')
         self.assertEqual(self.user.display_name, 'TakenName')
 
-    @patch('event.notifications.send_mail')
+    @patch('ta_hub.outbox.send_mail')
     def test_speaker_same_as_self_is_allowed(self, mock_send):
         """自分自身の user_name と同じ speaker は許容される."""
         mock_send.return_value = 1
@@ -134,7 +134,7 @@ class LTApplicationUserSyncTest(TestCase):
         })
         self.assertEqual(response.status_code, 302)
 
-    @patch('event.notifications.send_mail')
+    @patch('ta_hub.outbox.send_mail')
     def test_speaker_allows_display_name_chars(self, mock_send):
         """空白など user_name では不正な文字も表示名として許容する."""
         mock_send.return_value = 1
@@ -4,19 +4,25 @@ from unittest.mock import patch
 
 from django.contrib.auth import get_user_model
 from django.core import mail
+from django.core.cache import cache
+from django.core.mail.backends.locmem import EmailBackend as LocmemEmailBackend
 from django.core.management import call_command
 from django.test import Client, TestCase, override_settings
 from django.urls import reverse
 
 from community.models import Community
 from event.material_upload_reminders import (
+    EMPTY_NOTE_DECISION,
     MATERIAL_UPLOAD_HISTORY_URL,
     MaterialReminderDecision,
+    OpenRouterMaterialReminderDecisionService,
+    decide_material_reminders,
     parse_material_reminder_decision,
     send_material_upload_reminders,
 )
 from event.models import Event, EventDetail, MaterialUploadReminderLog
 from vket.models import VketCollaboration, VketParticipation, VketPresentation
+from website.llm_gateway import FakeLlmProvider, get_llm_gateway
 
 User = get_user_model()
 
@@ -190,6 +196,69 @@ class MaterialUploadReminderTest(TestCase):
         self.assertIn(f"/account/lt-applications/{detail.pk}/edit/", message.body)
         self.assertNotIn("締切", message.body)
 
+    def _create_mixed_notes(self):
+        notes = ["資料公開なし", "", "資料は後日公開予定", "資料公開なし", "", "資料公開なし"]
+        for index, text in enumerate(notes):
+            self.create_detail(f"batch{index}", additional_info=text)
+        return notes
+
+    def test_batch_mode_decides_each_distinct_note_once(self):
+        """一括判定では同じ備考を1回だけ判定し、空の備考は判定サービスに渡さず、逐次判定と同じ結果になる"""
+        notes = self._create_mixed_notes()
+        mapping = {"資料公開なし": False}
+
+        batch_service = StubDecisionService(mapping=mapping)
+        batch_results = send_material_upload_reminders(
+            target_date=self.target_date, dry_run=True, decision_service=batch_service,
+        )
+        per_item_service = StubDecisionService(mapping=mapping)
+        per_item_results = send_material_upload_reminders(
+            target_date=self.target_date,
+            dry_run=True,
+            decision_service=per_item_service,
+            batch=False,
+        )
+
+        self.assertEqual(batch_results, per_item_results)
+        self.assertEqual(sorted(batch_service.seen_notes), sorted(set(notes) - {""}))
+        self.assertNotIn("", per_item_service.seen_notes)
+        self.assertEqual(
+            [result.action for result in batch_results],
+            ["skipped_by_note", "would_send", "would_send", "skipped_by_note", "would_send", "skipped_by_note"],
+        )
+
+    def test_batch_mode_saves_each_log_right_after_its_send(self):
+        """バッチ途中でプロセスが落ちても、送信済み分のログが残り再実行で二重送信しない"""
+        self._create_mixed_notes()
+        decision_service = StubDecisionService(mapping={"資料公開なし": False})
+        original_send = LocmemEmailBackend.send_messages
+        calls = []
+
+        def send_messages(backend, messages):
+            calls.append(messages)
+            if len(calls) == 2:
+                raise SystemExit("worker killed")
+            return original_send(backend, messages)
+
+        with patch.object(LocmemEmailBackend, "send_messages", autospec=True, side_effect=send_messages):
+            with self.assertRaises(SystemExit):
+                send_material_upload_reminders(target_date=self.target_date, decision_service=decision_service)
+
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(
+            MaterialUploadReminderLog.objects.filter(status=MaterialUploadReminderLog.Status.SENT).count(),
+            1,
+        )
+
+        send_material_upload_reminders(target_date=self.target_date, decision_service=decision_service)
+
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertEqual(len({tuple(message.to) for message in mail.outbox}), 3)
+        self.assertEqual(
+            MaterialUploadReminderLog.objects.filter(status=MaterialUploadReminderLog.Status.SENT).count(),
+            3,
+        )
+
     def test_vket_recipient_can_open_edit_url_from_email(self):
         detail = self.create_detail("vket_link")
         recipient = detail.applicant
@@ -282,6 +351,53 @@ class MaterialReminderDecisionParseTest(TestCase):
         self.assertEqual(decision.matched_intent, "no_public_material_or_video")
 
 
+@override_settings(LLM_RESPONSE_CACHE_ENABLED=True)
+@patch.dict("os.environ", {"OPENROUTER_API_KEY": "test-key"}, clear=False)
+class OpenRouterMaterialReminderDecisionServiceTest(TestCase):
+    """LLM ゲートウェイ経由の送信判定"""
+
+    DECISION_JSON = (
+        '{"shouldSend": false, "confidence": "high", '
+        '"reason": "動画公開なし", "matchedIntent": "no_public_material_or_video"}'
+    )
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def test_same_note_is_decided_once_from_cache(self):
+        """同じ備考の判定は応答キャッシュから返し、LLM を再度呼ばない"""
+        provider = FakeLlmProvider([self.DECISION_JSON])
+        service = OpenRouterMaterialReminderDecisionService(model_name="test/model:free")
+
+        with get_llm_gateway().override_provider(provider):
+            first = service.decide("動画公開なし")
+            second = service.decide("動画公開なし")
+
+        self.assertEqual(len(provider.requests), 1)
+        self.assertEqual(provider.requests[0].model, "test/model")
+        self.assertFalse(first.should_send)
+        self.assertEqual(second, first)
+
+    def test_empty_note_is_decided_without_llm(self):
+        provider = FakeLlmProvider()
+        service = OpenRouterMaterialReminderDecisionService(model_name="test/model")
+
+        with get_llm_gateway().override_provider(provider):
+            decisions = decide_material_reminders([" \n ", ""], service)
+
+        self.assertEqual(decisions, {" \n ": EMPTY_NOTE_DECISION, "": EMPTY_NOTE_DECISION})
+        self.assertEqual(provider.requests, [])
+
+    def test_llm_failure_is_wrapped_in_value_error(self):
+        provider = FakeLlmProvider([RuntimeError("timeout")])
+        service = OpenRouterMaterialReminderDecisionService(model_name="test/model")
+
+        with get_llm_gateway().override_provider(provider):
+            with self.assertRaisesMessage(ValueError, "material reminder LLM request failed"):
+                service.decide("備考")
+
+
 @override_settings(REQUEST_TOKEN="test-token")
 class MaterialUploadReminderEndpointTest(TestCase):
     def setUp(self):
@@ -1,6 +1,8 @@
 """event.notifications の単体テスト
 
 メール/Discord Webhook の通知送信パスをカバーする。
+申請・審査結果の通知はアウトボックス（ta_hub.outbox）経由なので、コミット時の
+コールバックを実行して配信まで確認する。
 silent failure を起こしうる recipient リスト構築・例外ハンドリングを重点的に検証する。
 """
 from unittest.mock import patch, MagicMock
@@ -8,6 +10,7 @@ from unittest.mock import patch, MagicMock
 import requests
 from django.contrib.auth import get_user_model
 from django.core import mail
+from django.db import transaction
 from django.test import TestCase, override_settings
 
 from community.models import CommunityMember
@@ -19,6 +22,7 @@ from event.notifications import (
     _send_discord_notification_for_new_application,
     _send_discord_notification_for_result,
 )
+from ta_hub.models import OutboxMessage
 from tests.factories import (
     make_community as _make_community_factory,
     make_event,
@@ -67,6 +71,10 @@ def _make_event_detail(event, applicant=None, status="pending"):
     return make_event_detail(event, applicant=applicant, status=status)
 
 
+def _queued_discord_message():
+    return OutboxMessage.objects.get(channel=OutboxMessage.Channel.DISCORD_WEBHOOK)
+
+
 @override_settings(DEFAULT_FROM_EMAIL="noreply@example.com")
 class NotifyOwnersOfNewApplicationTest(TestCase):
     """notify_owners_of_new_application の通知送信パス"""
@@ -80,7 +88,8 @@ class NotifyOwnersOfNewApplicationTest(TestCase):
 
     def test_sends_email_to_each_owner(self):
         """主催者全員にメール送信される（1主催者でアウトボックスに1件）"""
-        notify_owners_of_new_application(self.event_detail)
+        with self.captureOnCommitCallbacks(execute=True):
+            notify_owners_of_new_application(self.event_detail)
         self.assertEqual(len(mail.outbox), 1)
         msg = mail.outbox[0]
         self.assertEqual(msg.to, ["owner1@example.com"])
@@ -95,7 +104,8 @@ class NotifyOwnersOfNewApplicationTest(TestCase):
             user=owner2,
             role=CommunityMember.Role.OWNER,
         )
-        notify_owners_of_new_application(self.event_detail)
+        with self.captureOnCommitCallbacks(execute=True):
+            notify_owners_of_new_application(self.event_detail)
         recipients = sorted([msg.to[0] for msg in mail.outbox])
         self.assertEqual(recipients, ["owner1@example.com", "owner2@example.com"])
 
@@ -107,7 +117,8 @@ class NotifyOwnersOfNewApplicationTest(TestCase):
             user=owner_no_email,
             role=CommunityMember.Role.OWNER,
         )
-        notify_owners_of_new_application(self.event_detail)
+        with self.captureOnCommitCallbacks(execute=True):
+            notify_owners_of_new_application(self.event_detail)
         self.assertEqual(len(mail.outbox), 1)
         self.assertEqual(mail.outbox[0].to, ["owner1@example.com"])
 
@@ -116,24 +127,44 @@ class NotifyOwnersOfNewApplicationTest(TestCase):
         community_no_owner = _make_community(owner=None)
         event = _make_event(community_no_owner)
         event_detail = _make_event_detail(event, applicant=self.applicant)
-        notify_owners_of_new_application(event_detail)
+        with self.captureOnCommitCallbacks(execute=True):
+            notify_owners_of_new_application(event_detail)
         self.assertEqual(len(mail.outbox), 0)
 
-    @patch("event.notifications.send_mail")
-    def test_swallows_send_mail_exception(self, mock_send_mail):
-        """send_mail 例外時もクラッシュせず後続処理（Discord）に進む"""
+    @patch("ta_hub.outbox.send_mail")
+    def test_send_mail_failure_keeps_message_for_retry(self, mock_send_mail):
+        """send_mail 例外時もクラッシュせず、アウトボックスに再送待ちとして残る"""
         mock_send_mail.side_effect = RuntimeError("SMTP down")
         # 例外を投げずに完了する
-        notify_owners_of_new_application(self.event_detail)
+        with self.captureOnCommitCallbacks(execute=True):
+            notify_owners_of_new_application(self.event_detail)
         mock_send_mail.assert_called_once()
+        message = OutboxMessage.objects.get(channel=OutboxMessage.Channel.EMAIL)
+        self.assertEqual(message.status, OutboxMessage.Status.PENDING)
+        self.assertEqual(message.attempts, 1)
+        self.assertEqual(message.last_error, "RuntimeError")
+
+    def test_nothing_is_sent_when_transaction_rolls_back(self):
+        """申請の作成がロールバックされたら通知も送られない"""
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            try:
+                with transaction.atomic():
+                    notify_owners_of_new_application(self.event_detail)
+                    raise RuntimeError("rollback")
+            except RuntimeError:
+                pass
+        self.assertEqual(callbacks, [])
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertFalse(OutboxMessage.objects.exists())
 
-    @patch("event.notifications.post_discord_webhook")
+    @patch("ta_hub.outbox.send_discord_webhook")
     def test_calls_discord_webhook_when_url_set(self, mock_post):
         """webhook_url 設定済みなら Discord 通知が呼ばれる"""
         self.community.notification_webhook_url = WEBHOOK_URL
         self.community.save()
         mock_post.return_value = MagicMock(ok=True, status_code=200)
-        notify_owners_of_new_application(self.event_detail)
+        with self.captureOnCommitCallbacks(execute=True):
+            notify_owners_of_new_application(self.event_detail)
         mock_post.assert_called_once()
         # 第1引数が webhook_url であること
         self.assertEqual(mock_post.call_args.args[0], WEBHOOK_URL)
@@ -154,7 +185,8 @@ class NotifyApplicantOfResultTest(TestCase):
         event_detail = _make_event_detail(
             self.event, applicant=self.applicant, status="approved"
         )
-        notify_applicant_of_result(event_detail)
+        with self.captureOnCommitCallbacks(execute=True):
+            notify_applicant_of_result(event_detail)
         self.assertEqual(len(mail.outbox), 1)
         self.assertIn("承認", mail.outbox[0].subject)
         self.assertEqual(mail.outbox[0].to, ["applicant1@example.com"])
@@ -164,7 +196,8 @@ class NotifyApplicantOfResultTest(TestCase):
         event_detail = _make_event_detail(
             self.event, applicant=self.applicant, status="approved"
         )
-        notify_applicant_of_result(event_detail)
+        with self.captureOnCommitCallbacks(execute=True):
+            notify_applicant_of_result(event_detail)
 
         self.assertEqual(len(mail.outbox), 1)
         html_content = mail.outbox[0].alternatives[0][0]
@@ -176,14 +209,16 @@ class NotifyApplicantOfResultTest(TestCase):
         event_detail = _make_event_detail(
             self.event, applicant=self.applicant, status="rejected"
         )
-        notify_applicant_of_result(event_detail)
+        with self.captureOnCommitCallbacks(execute=True):
+            notify_applicant_of_result(event_detail)
         self.assertEqual(len(mail.outbox), 1)
         self.assertIn("却下", mail.outbox[0].subject)
 
     def test_returns_early_when_applicant_missing(self):
         """applicant が None なら早期 return"""
         event_detail = _make_event_detail(self.event, applicant=None, status="approved")
-        notify_applicant_of_result(event_detail)
+        with self.captureOnCommitCallbacks(execute=True):
+            notify_applicant_of_result(event_detail)
         self.assertEqual(len(mail.outbox), 0)
 
     def test_returns_early_when_applicant_email_missing(self):
@@ -192,7 +227,8 @@ class NotifyApplicantOfResultTest(TestCase):
         event_detail = _make_event_detail(
             self.event, applicant=applicant_no_email, status="approved"
         )
-        notify_applicant_of_result(event_detail)
+        with self.captureOnCommitCallbacks(execute=True):
+            notify_applicant_of_result(event_detail)
         self.assertEqual(len(mail.outbox), 0)
 
 
@@ -206,34 +242,29 @@ class DiscordNotificationForNewApplicationTest(TestCase):
         self.event = _make_event(self.community)
         self.event_detail = _make_event_detail(self.event, applicant=self.applicant)
 
-    @patch("event.notifications.post_discord_webhook")
-    def test_posts_to_webhook_when_url_set(self, mock_post):
-        """webhook_url 設定時に POST される"""
-        mock_post.return_value = MagicMock(ok=True, status_code=200)
+    def test_queues_webhook_when_url_set(self):
+        """webhook_url 設定時に Webhook 送信がアウトボックスに積まれる"""
         _send_discord_notification_for_new_application(self.event_detail, "https://example.com/review/1")
-        mock_post.assert_called_once()
-        payload = mock_post.call_args.args[1]
+        message = _queued_discord_message()
+        self.assertEqual(message.webhook_url, WEBHOOK_URL)
         # content / embeds 構造の最小検証
-        self.assertIn("content", payload)
-        self.assertIn("embeds", payload)
+        self.assertIn("content", message.payload)
+        self.assertIn("embeds", message.payload)
 
-    @patch("event.notifications.post_discord_webhook")
-    def test_skipped_when_webhook_url_empty(self, mock_post):
-        """webhook_url 空なら POST されない"""
+    def test_skipped_when_webhook_url_empty(self):
+        """webhook_url 空なら積まれない"""
         self.community.notification_webhook_url = ""
         self.community.save()
         _send_discord_notification_for_new_application(self.event_detail, "https://example.com/review/1")
-        mock_post.assert_not_called()
+        self.assertFalse(OutboxMessage.objects.exists())
 
-    @patch("event.notifications.post_discord_webhook")
-    def test_truncates_long_additional_info(self, mock_post):
+    def test_truncates_long_additional_info(self):
         """additional_info が 1000 文字超なら切り詰め + ... サフィックス"""
         long_text = "a" * 1500
         self.event_detail.additional_info = long_text
         self.event_detail.save()
-        mock_post.return_value = MagicMock(ok=True, status_code=200)
         _send_discord_notification_for_new_application(self.event_detail, "https://example.com/review/1")
-        payload = mock_post.call_args.args[1]
+        payload = _queued_discord_message().payload
         additional_field = next(
             (f for f in payload["embeds"][0]["fields"] if "追加情報" in f["name"]),
             None,
@@ -243,28 +274,22 @@ class DiscordNotificationForNewApplicationTest(TestCase):
         self.assertTrue(additional_field["value"].endswith("..."))
         self.assertEqual(len(additional_field["value"]), 1003)
 
-    @patch("event.notifications.post_discord_webhook")
-    def test_swallows_request_exception(self, mock_post):
-        """gateway最終失敗時も呼び出し元処理を継続する."""
-        mock_post.side_effect = requests.RequestException("network down")
-        _send_discord_notification_for_new_application(
-            self.event_detail,
-            "https://example.com/review/1",
-        )
-        mock_post.assert_called_once()
-
-    @patch("event.notifications.post_discord_webhook")
-    def test_handles_non_ok_response(self, mock_post):
-        """gatewayのHTTP最終失敗後も呼び出し元は継続する."""
+    @patch("ta_hub.outbox.send_discord_webhook")
+    def test_delivery_failure_keeps_message_for_retry(self, mock_post):
+        """配信失敗時も呼び出し元は継続し、メッセージは再送待ちで残る."""
         mock_post.side_effect = requests.HTTPError(
             "server error",
             response=MagicMock(status_code=500),
         )
-        _send_discord_notification_for_new_application(
-            self.event_detail,
-            "https://example.com/review/1",
-        )
+        with self.captureOnCommitCallbacks(execute=True):
+            _send_discord_notification_for_new_application(
+                self.event_detail,
+                "https://example.com/review/1",
+            )
         mock_post.assert_called_once()
+        message = _queued_discord_message()
+        self.assertEqual(message.status, OutboxMessage.Status.PENDING)
+        self.assertEqual(message.last_error, "HTTPError (HTTP 500)")
 
 
 class DiscordNotificationForResultTest(TestCase):
@@ -276,25 +301,21 @@ class DiscordNotificationForResultTest(TestCase):
         self.community = _make_community(owner=self.owner, webhook_url=WEBHOOK_URL)
         self.event = _make_event(self.community)
 
-    @patch("event.notifications.post_discord_webhook")
-    def test_approved_uses_green_color(self, mock_post):
+    def test_approved_uses_green_color(self):
         """承認時の embed color が緑 (5763719)"""
         event_detail = _make_event_detail(self.event, applicant=self.applicant, status="approved")
-        mock_post.return_value = MagicMock(ok=True, status_code=200)
         _send_discord_notification_for_result(event_detail)
-        payload = mock_post.call_args.args[1]
+        payload = _queued_discord_message().payload
         self.assertEqual(payload["embeds"][0]["color"], 5763719)
         self.assertIn("✅", payload["embeds"][0]["title"])
 
-    @patch("event.notifications.post_discord_webhook")
-    def test_rejected_uses_red_color_and_includes_reason(self, mock_post):
+    def test_rejected_uses_red_color_and_includes_reason(self):
         """却下時の embed color が赤 (15548997)、却下理由が fields に含まれる"""
         event_detail = _make_event_detail(self.event, applicant=self.applicant, status="rejected")
         event_detail.rejection_reason = "テーマが要件に合致しません"
         event_detail.save()
-        mock_post.return_value = MagicMock(ok=True, status_code=200)
         _send_discord_notification_for_result(event_detail)
-        payload = mock_post.call_args.args[1]
+        payload = _queued_discord_message().payload
         self.assertEqual(payload["embeds"][0]["color"], 15548997)
         self.assertIn("❌", payload["embeds"][0]["title"])
         reason_field = next(
@@ -304,19 +325,20 @@ class DiscordNotificationForResultTest(TestCase):
         self.assertIsNotNone(reason_field)
         self.assertEqual(reason_field["value"], "テーマが要件に合致しません")
 
-    @patch("event.notifications.post_discord_webhook")
-    def test_skipped_when_webhook_url_empty(self, mock_post):
-        """webhook_url 空なら POST されない"""
+    def test_skipped_when_webhook_url_empty(self):
+        """webhook_url 空なら積まれない"""
         self.community.notification_webhook_url = ""
         self.community.save()
         event_detail = _make_event_detail(self.event, applicant=self.applicant, status="approved")
         _send_discord_notification_for_result(event_detail)
-        mock_post.assert_not_called()
+        self.assertFalse(OutboxMessage.objects.exists())
 
 
 class DiscordWebhookSafeLoggingTest(TestCase):
     """event.notifications の3つのWebhook経路で安全な最終ログを検証する."""
 
+    sensitive_url = "https://discord.com/api/webhooks/123456789/secret-token"
+
     def setUp(self):
         self.owner = _make_user("owner1", "owner1@example.com")
         self.applicant = _make_user("applicant1", "applicant1@example.com")
@@ -331,10 +353,17 @@ class DiscordWebhookSafeLoggingTest(TestCase):
             status="approved",
         )
 
-    @patch("event.notifications.post_discord_webhook")
-    def test_all_webhook_failures_exclude_url_and_exception_message(self, mock_post):
-        """全3経路の最終ログからURL・token・例外本文・tracebackを除外する."""
-        sensitive_url = "https://discord.com/api/webhooks/123456789/secret-token"
+    def _assert_safe(self, logs):
+        self.assertIn("error_type=RequestException", logs)
+        self.assertIn("status_code=None", logs)
+        self.assertNotIn(self.sensitive_url, logs)
+        self.assertNotIn("secret-token", logs)
+        self.assertNotIn("request failed", logs)
+        self.assertNotIn("Traceback", logs)
+
+    @patch("ta_hub.outbox.send_discord_webhook")
+    def test_outbox_webhook_failures_exclude_url_and_exception_message(self, mock_post):
+        """アウトボックス経由の2経路の失敗ログと記録からURL・token・例外本文を除外する."""
         senders = (
             (
                 "new_application",
@@ -347,33 +376,38 @@ class DiscordWebhookSafeLoggingTest(TestCase):
                 "application_result",
                 lambda: _send_discord_notification_for_result(self.event_detail),
             ),
-            (
-                "slide_published",
-                lambda: notify_slide_material_published(self.event_detail),
-            ),
         )
         for label, send in senders:
             with self.subTest(label=label):
                 mock_post.reset_mock()
                 mock_post.side_effect = requests.RequestException(
-                    f"request failed for {sensitive_url}",
+                    f"request failed for {self.sensitive_url}",
                 )
-                with self.assertLogs(
-                    "event.notifications",
-                    level="ERROR",
-                ) as log_context:
-                    send()
+                with self.assertLogs("ta_hub.outbox", level="WARNING") as log_context:
+                    with self.captureOnCommitCallbacks(execute=True):
+                        send()
 
                 logs = "\n".join(log_context.output)
                 mock_post.assert_called_once()
-                self.assertIn(f"community_id={self.community.pk}", logs)
-                self.assertIn(f"event_detail_id={self.event_detail.pk}", logs)
-                self.assertIn("error_type=RequestException", logs)
-                self.assertIn("status_code=None", logs)
-                self.assertNotIn(sensitive_url, logs)
-                self.assertNotIn("secret-token", logs)
-                self.assertNotIn("request failed", logs)
-                self.assertNotIn("Traceback", logs)
+                self.assertIn(f":{self.event_detail.pk}", logs)
+                self._assert_safe(logs)
+                message = OutboxMessage.objects.latest("pk")
+                self.assertEqual(message.last_error, "RequestException")
+
+    @patch("event.notifications.post_discord_webhook")
+    def test_slide_published_failure_excludes_url_and_exception_message(self, mock_post):
+        """資料公開通知の最終ログからURL・token・例外本文・tracebackを除外する."""
+        mock_post.side_effect = requests.RequestException(
+            f"request failed for {self.sensitive_url}",
+        )
+        with self.assertLogs("event.notifications", level="ERROR") as log_context:
+            notify_slide_material_published(self.event_detail)
+
+        logs = "\n".join(log_context.output)
+        mock_post.assert_called_once()
+        self.assertIn(f"community_id={self.community.pk}", logs)
+        self.assertIn(f"event_detail_id={self.event_detail.pk}", logs)
+        self._assert_safe(logs)
 
 
 class SpeakerAccountLinkedNotificationTest(TestCase):
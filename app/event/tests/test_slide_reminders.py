@@ -1,8 +1,9 @@
-from datetime import date, datetime, time
+from datetime import date, datetime, time, timedelta
 from unittest.mock import patch
 
 from django.contrib.auth import get_user_model
 from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend as LocmemEmailBackend
 from django.core.management import call_command
 from django.test import Client, TestCase, override_settings
 from django.urls import reverse
@@ -10,7 +11,7 @@ from django.utils import timezone
 
 from community.models import Community
 from event.models import Event, EventDetail, MaterialUploadReminderLog
-from event.slide_reminders import process_slide_publication_reminders
+from event.slide_reminders import SLIDE_REMINDER_CLAIM_TIMEOUT, process_slide_publication_reminders
 from vket.models import VketCollaboration, VketParticipation, VketPresentation
 
 User = get_user_model()
@@ -104,6 +105,68 @@ class SlideReminderTestCase(TestCase):
         self.client.force_login(self.applicant)
         self.assertEqual(self.client.get(edit_path).status_code, 200)
 
+    def test_process_sends_all_reminders_over_one_connection(self):
+        """全件を組み立ててから1つのメール接続でまとめて送る"""
+        details = [self.create_detail(event_date=date(2026, 5, 20 + day)) for day in range(3)]
+
+        with patch.object(LocmemEmailBackend, 'open', autospec=True, return_value=True) as mock_open:
+            result = process_slide_publication_reminders(now=self.now)
+
+        self.assertEqual(mock_open.call_count, 1)
+        self.assertEqual(result.sent, 3)
+        self.assertEqual(result.event_detail_ids, [detail.pk for detail in details])
+        self.assertEqual(len(mail.outbox), 3)
+
+    def test_failed_send_is_released_for_next_run(self):
+        """送信に失敗した分は確保を外して次回に回し、他の宛先への送信は続ける"""
+        failing = self.create_detail(event_date=date(2026, 5, 22))
+        succeeding = self.create_detail(event_date=date(2026, 5, 29))
+        original_send = LocmemEmailBackend.send_messages
+        calls = []
+
+        def send_messages(backend, messages):
+            # 対象は開催日・ID順に送られるので、最初の1通（failing 宛て）だけ失敗させる
+            calls.append(messages)
+            if len(calls) == 1:
+                raise ConnectionError('smtp down')
+            return original_send(backend, messages)
+
+        with patch.object(LocmemEmailBackend, 'send_messages', autospec=True, side_effect=send_messages):
+            result = process_slide_publication_reminders(now=self.now)
+
+        self.assertEqual((result.sent, result.failed), (1, 1))
+        self.assertEqual(result.event_detail_ids, [succeeding.pk])
+        failing.material_upload_reminder_log.refresh_from_db()
+        succeeding.material_upload_reminder_log.refresh_from_db()
+        self.assertIsNone(failing.material_upload_reminder_log.follow_up_sent_at)
+        self.assertIsNotNone(succeeding.material_upload_reminder_log.follow_up_sent_at)
+
+        retry = process_slide_publication_reminders(now=self.now)
+        self.assertEqual(retry.event_detail_ids, [failing.pk])
+
+    def test_interrupted_run_is_resent_after_claim_expires(self):
+        """確保後に実行が落ちても送信済みにはならず、確保の期限が切れたら次の実行が送る"""
+        detail = self.create_detail()
+
+        with patch.object(LocmemEmailBackend, 'send_messages', autospec=True, side_effect=SystemExit('killed')):
+            with self.assertRaises(SystemExit):
+                process_slide_publication_reminders(now=self.now)
+
+        detail.material_upload_reminder_log.refresh_from_db()
+        self.assertIsNone(detail.material_upload_reminder_log.follow_up_sent_at)
+        self.assertEqual(detail.material_upload_reminder_log.follow_up_claimed_at, self.now)
+        # 確保の期限内は、まだ送信中かもしれないので他の実行は触らない
+        self.assertEqual(process_slide_publication_reminders(now=self.now).candidates, 0)
+
+        later = self.now + SLIDE_REMINDER_CLAIM_TIMEOUT + timedelta(minutes=1)
+        result = process_slide_publication_reminders(now=later)
+
+        self.assertEqual(result.event_detail_ids, [detail.pk])
+        self.assertEqual(len(mail.outbox), 1)
+        detail.material_upload_reminder_log.refresh_from_db()
+        self.assertIsNotNone(detail.material_upload_reminder_log.follow_up_sent_at)
+        self.assertIsNone(detail.material_upload_reminder_log.follow_up_claimed_at)
+
     def test_process_does_not_send_twice(self):
         self.create_detail()
 
@@ -0,0 +1,117 @@
+"""記事生成用の元資料ストア（event.services.source_material）のテスト"""
+import os
+from datetime import date
+from unittest.mock import patch
+
+from django.core.files.base import ContentFile
+from django.test import TestCase, override_settings
+
+from event.models import EventDetail, SourceMaterial
+from event.services.slide_pdf import SlidePdf
+from event.services.source_material import (
+    get_slide_material,
+    prepare_source_materials,
+    schedule_source_material_preparation,
+)
+from tests.factories import make_community, make_event, make_event_detail
+
+PDF_PATH = os.path.join(os.path.dirname(__file__), "input_data", "perplexity.pdf")
+
+
+class SourceMaterialTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        with open(PDF_PATH, "rb") as pdf_file:
+            cls.pdf_bytes = pdf_file.read()
+        cls.community = make_community(name="元資料集会")
+        cls.event = make_event(cls.community, event_date=date(2024, 5, 24))
+
+    def _create_detail(self, **extra):
+        detail = make_event_detail(self.event, **extra)
+        detail.slide_file.save("slide.pdf", ContentFile(self.pdf_bytes))
+        return detail
+
+    def test_same_deck_is_extracted_once_and_shared(self):
+        """同じ内容のPDFを参照する発表は1件の SourceMaterial を共有する"""
+        first = self._create_detail()
+        second = self._create_detail()
+
+        with patch.object(
+            SlidePdf, "_extract_page_texts", return_value=["1ページ目", "", "3ページ目"]
+        ) as mock_extract:
+            first_material = get_slide_material(first)
+            second_material = get_slide_material(second)
+
+        self.assertEqual(first_material.pk, second_material.pk)
+        self.assertEqual(mock_extract.call_count, 1)
+        self.assertEqual(first_material.page_texts, ["1ページ目", "", "3ページ目"])
+        self.assertEqual(SourceMaterial.objects.count(), 1)
+
+        first.refresh_from_db()
+        self.assertEqual(first.slide_material_id, first_material.pk)
+        self.assertEqual(first.slide_material_file, first.slide_file.name)
+
+    def test_linked_material_is_reused_without_reading_pdf(self):
+        """紐付け済みなら再生成時にストレージからPDFを読み出さない"""
+        detail = self._create_detail()
+        material = get_slide_material(detail)
+
+        reloaded = EventDetail.objects.get(pk=detail.pk)
+        with patch.object(SlidePdf, "from_file") as mock_from_file:
+            self.assertEqual(get_slide_material(reloaded).pk, material.pk)
+
+        mock_from_file.assert_not_called()
+        self.assertGreater(material.page_count, 0)
+        self.assertTrue(material.text)
+
+    def test_replaced_slide_is_linked_again(self):
+        """slide_file を差し替えたら古い紐付けを使わず作り直す"""
+        detail = self._create_detail()
+        with patch.object(SlidePdf, "_extract_page_texts", return_value=["旧スライド"]):
+            old_material = get_slide_material(detail)
+
+        detail.slide_file.save("new.pdf", ContentFile(self.pdf_bytes + b"\n% v2"))
+        with patch.object(SlidePdf, "_extract_page_texts", return_value=["新スライド"]):
+            new_material = get_slide_material(detail)
+
+        self.assertNotEqual(old_material.pk, new_material.pk)
+        self.assertEqual(new_material.page_texts, ["新スライド"])
+        detail.refresh_from_db()
+        self.assertEqual(detail.slide_material_id, new_material.pk)
+
+    @patch("event.services.source_material.get_transcript", return_value="字幕テキスト")
+    def test_prepare_source_materials_creates_slide_and_transcript(self, mock_get_transcript):
+        detail = self._create_detail(youtube_url="https://www.youtube.com/watch?v=rrKl0s23E0M")
+
+        with patch.object(SlidePdf, "_extract_page_texts", return_value=["本文"]):
+            prepare_source_materials(detail.pk)
+
+        detail.refresh_from_db()
+        self.assertEqual(detail.slide_material.page_texts, ["本文"])
+        transcript = SourceMaterial.objects.get(kind=SourceMaterial.Kind.TRANSCRIPT)
+        self.assertEqual(transcript.content_key, "rrKl0s23E0M:ja")
+        self.assertEqual(transcript.text, "字幕テキスト")
+        mock_get_transcript.assert_called_once_with("rrKl0s23E0M", "ja")
+
+    @override_settings(ENABLE_SOURCE_MATERIAL_THREADS_IN_TESTS=True)
+    @patch("event.services.source_material.threading.Thread")
+    def test_schedule_starts_background_thread_after_commit(self, mock_thread):
+        detail = self._create_detail()
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            schedule_source_material_preparation(detail)
+
+        self.assertEqual(len(callbacks), 1)
+        mock_thread.assert_called_once()
+        self.assertEqual(mock_thread.call_args.kwargs["args"][0], detail.pk)
+        mock_thread.return_value.start.assert_called_once()
+
+    @patch("event.services.source_material.threading.Thread")
+    def test_schedule_is_skipped_in_tests_by_default(self, mock_thread):
+        detail = self._create_detail()
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            schedule_source_material_preparation(detail)
+
+        self.assertEqual(callbacks, [])
+        mock_thread.assert_not_called()
@@ -0,0 +1,50 @@
+"""event.0032_copy_cached_transcripts（字幕キャッシュの SourceMaterial への移行）のテスト"""
+from datetime import date, time
+
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TransactionTestCase
+
+
+class CopyCachedTranscriptsMigrationTest(TransactionTestCase):
+    """0031（スキーマ追加のみ）から 0032 を流し、列を残したまま字幕をコピーすることを確認する"""
+
+    migrate_from = [('event', '0031_source_material')]
+    migrate_to = [('event', '0032_copy_cached_transcripts')]
+
+    def setUp(self):
+        self.executor = MigrationExecutor(connection)
+        self.executor.migrate(self.migrate_from)
+        self.old_apps = self.executor.loader.project_state(self.migrate_from).apps
+
+    def tearDown(self):
+        MigrationExecutor(connection).migrate(self.executor.loader.graph.leaf_nodes())
+        super().tearDown()
+
+    def _migrate_forward(self):
+        self.executor = MigrationExecutor(connection)
+        self.executor.migrate(self.migrate_to)
+        return self.executor.loader.project_state(self.migrate_to).apps
+
+    def test_copies_transcripts_once_per_video_and_keeps_columns(self):
+        Community = self.old_apps.get_model('community', 'Community')
+        Event = self.old_apps.get_model('event', 'Event')
+        EventDetail = self.old_apps.get_model('event', 'EventDetail')
+        community = Community.objects.create(name='移行集会', start_time=time(21, 0))
+        event = Event.objects.create(community=community, date=date(2026, 3, 1), start_time=time(21, 0))
+        for video_id, transcript in (('vid1', '字幕1'), ('vid1', '字幕1の重複'), ('vid2', '字幕2'), ('', '動画なし')):
+            EventDetail.objects.create(
+                event=event, cached_transcript=transcript, cached_transcript_video_id=video_id,
+            )
+
+        apps = self._migrate_forward()
+
+        SourceMaterial = apps.get_model('event', 'SourceMaterial')
+        self.assertEqual(
+            dict(SourceMaterial.objects.filter(kind='transcript').values_list('content_key', 'text')),
+            {'vid1:ja': '字幕1', 'vid2:ja': '字幕2'},
+        )
+        # 旧リビジョンが読むので列は残る
+        self.assertEqual(
+            apps.get_model('event', 'EventDetail').objects.exclude(cached_transcript='').count(), 4,
+        )
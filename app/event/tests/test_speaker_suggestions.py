@@ -0,0 +1,85 @@
+"""発表者名からのユーザー候補検索（event.services.speaker_suggestions）のテスト"""
+from django.test import TestCase
+from django.urls import reverse
+
+from event.services.speaker_suggestions import (
+    SpeakerSuggestion,
+    clear_user_name_index,
+    suggest_users_for_speaker,
+)
+from tests.factories import make_community, make_event, make_user
+
+
+class SuggestUsersForSpeakerTest(TestCase):
+    """suggest_users_for_speaker のテスト"""
+
+    def setUp(self):
+        clear_user_name_index()
+        self.addCleanup(clear_user_name_index)
+        self.tanaka = make_user(user_name="Tanaka", email="tanaka@example.com")
+        self.tanaka2 = make_user(user_name="tanaka2", email="tanaka2@example.com")
+        make_user(user_name="Suzuki", email="suzuki@example.com")
+
+    def test_returns_users_within_edit_distance_in_id_order(self):
+        suggestions = suggest_users_for_speaker("  TANAKA ")
+
+        self.assertEqual(
+            suggestions,
+            [
+                SpeakerSuggestion(self.tanaka.id, "Tanaka"),
+                SpeakerSuggestion(self.tanaka2.id, "tanaka2"),
+            ],
+        )
+
+    def test_limit_and_empty_input(self):
+        self.assertEqual(len(suggest_users_for_speaker("tanaka", limit=1)), 1)
+        self.assertEqual(suggest_users_for_speaker("   "), [])
+
+    def test_index_is_reused_until_cleared(self):
+        suggest_users_for_speaker("tanaka")
+        make_user(user_name="Tanakaa", email="tanakaa@example.com")
+
+        with self.assertNumQueries(0):
+            self.assertEqual(len(suggest_users_for_speaker("tanaka")), 2)
+        clear_user_name_index()
+        self.assertEqual(len(suggest_users_for_speaker("tanaka")), 3)
+
+
+class LTSpeakerSuggestionViewTest(TestCase):
+    """LT申請フォームが呼ぶ候補エンドポイントのテスト"""
+
+    def setUp(self):
+        clear_user_name_index()
+        self.addCleanup(clear_user_name_index)
+        self.user = make_user(user_name="Tanaka", email="tanaka@example.com")
+        make_user(user_name="Suzuki", email="suzuki@example.com")
+        self.url = reverse("event:lt_speaker_suggestions")
+
+    def test_returns_close_user_names(self):
+        self.client.force_login(self.user)
+
+        response = self.client.get(self.url, {"q": "tanaka"})
+
+        self.assertEqual(response.json(), {"suggestions": [{"user_name": "Tanaka"}]})
+
+    def test_short_query_returns_nothing(self):
+        self.client.force_login(self.user)
+
+        response = self.client.get(self.url, {"q": "t"})
+
+        self.assertEqual(response.json(), {"suggestions": []})
+
+    def test_requires_login(self):
+        response = self.client.get(self.url, {"q": "tanaka"})
+
+        self.assertEqual(response.status_code, 302)
+
+    def test_application_form_offers_suggestions(self):
+        self.client.force_login(self.user)
+        community = make_community(name="候補集会")
+        make_event(community)
+
+        response = self.client.get(reverse("event:lt_application_create", kwargs={"community_pk": community.pk}))
+
+        self.assertContains(response, 'list="speaker-suggestions"')
+        self.assertContains(response, f'data-url="{self.url}"')
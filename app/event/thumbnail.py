@@ -1,8 +1,15 @@
+from io import BytesIO
+
+import pypdfium2 as pdfium
 from PIL import Image
 
 SLIDE_THUMBNAIL_ASPECT_RATIO = 16 / 9
 SLIDE_THUMBNAIL_ASPECT_RATIO_TEXT = '16:9'
 
+PDF_THUMBNAIL_MAX_RENDER_SCALE = 2.0
+PDF_THUMBNAIL_MAX_LONG_EDGE_PX = 1600
+PDF_THUMBNAIL_JPEG_QUALITY = 85
+
 
 def crop_to_slide_thumbnail_aspect_ratio(image: Image.Image) -> Image.Image:
     """画像を中央基準でスライド比率にクロップする."""
@@ -22,3 +29,55 @@ def crop_to_slide_thumbnail_aspect_ratio(image: Image.Image) -> Image.Image:
         return image.crop((0, top, width, top + new_height))
 
     return image
+
+
+def get_pdf_thumbnail_render_scale(page) -> float:
+    """PDFページの長辺が上限を超えないレンダリング倍率を返す."""
+    try:
+        width, height = page.get_size()
+        long_edge = max(float(width), float(height))
+    except (AttributeError, TypeError, ValueError):
+        return PDF_THUMBNAIL_MAX_RENDER_SCALE
+
+    if long_edge <= 0:
+        return PDF_THUMBNAIL_MAX_RENDER_SCALE
+
+    return min(PDF_THUMBNAIL_MAX_RENDER_SCALE, PDF_THUMBNAIL_MAX_LONG_EDGE_PX / long_edge)
+
+
+def render_pdf_thumbnail_jpeg(pdf_source) -> bytes:
+    """PDFの先頭ページをスライド比率のJPEGにレンダリングする.
+
+    モデルに依存しない純粋関数なので、一括処理ではプロセスプールから呼び出せる。
+
+    Args:
+        pdf_source: PDFのファイルパスまたはバイト列
+
+    Returns:
+        JPEG画像のバイト列
+    """
+    pdf = pdfium.PdfDocument(pdf_source)
+    try:
+        return render_pdf_document_thumbnail_jpeg(pdf)
+    finally:
+        if hasattr(pdf, 'close'):
+            pdf.close()
+
+
+def render_pdf_document_thumbnail_jpeg(pdf) -> bytes:
+    """開いている pdfium ドキュメントの先頭ページをスライド比率のJPEGにレンダリングする."""
+    page = pdf[0]
+    try:
+        bitmap = page.render(scale=get_pdf_thumbnail_render_scale(page))
+        try:
+            image = crop_to_slide_thumbnail_aspect_ratio(bitmap.to_pil().convert('RGB'))
+        finally:
+            if hasattr(bitmap, 'close'):
+                bitmap.close()
+    finally:
+        if hasattr(page, 'close'):
+            page.close()
+
+    image_buffer = BytesIO()
+    image.save(image_buffer, format='JPEG', quality=PDF_THUMBNAIL_JPEG_QUALITY, optimize=True)
+    return image_buffer.getvalue()
@@ -21,6 +21,7 @@ from .views import (
     LTApplicationCreateView,
     LTApplicationRejectView,
     LTApplicationReviewView,
+    LTSpeakerSuggestionView,
     SpeakerInviteIssueView,
     SpeakerInviteTokenExchangeView,
     SpeakerLinkConfirmView,
@@ -59,6 +60,7 @@ urlpatterns = [
     path('generate/', generate_llm_events, name='generate_llm_events'),
     # LT申請
     path('apply/<int:community_pk>/', LTApplicationCreateView.as_view(), name='lt_application_create'),
+    path('apply/speaker-suggestions/', LTSpeakerSuggestionView.as_view(), name='lt_speaker_suggestions'),
     path('apply/<int:community_pk>/complete/', LTApplicationCompleteView.as_view(), name='lt_application_complete'),
     path('application/<int:pk>/review/', LTApplicationReviewView.as_view(), name='lt_application_review'),
     path('application/<int:pk>/approve/', LTApplicationApproveView.as_view(), name='lt_application_approve'),
@@ -37,6 +37,7 @@ from event.views.lt_application import (  # noqa: F401
     LTApplicationCreateView,
     LTApplicationRejectView,
     LTApplicationReviewView,
+    LTSpeakerSuggestionView,
 )
 from event.views.speaker_link import (  # noqa: F401
     SpeakerInviteIssueView,
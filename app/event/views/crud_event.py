@@ -334,12 +334,15 @@ class EventDeleteView(LoginRequiredMixin, DeleteView):
             logger.info(f"以降のイベントも削除します: {len(subsequent_events)}件")
 
         # 「以降のイベントも削除」選択時も、Vketコラボ期間中のイベントは運営調整済みのため対象から除外する
+        # 判定結果は下の削除連鎖のチェックでも再利用し、イベントごとのロック判定クエリを出さない
+        lock_infos = {}
         if not (request.user.is_superuser or request.user.is_staff):
-            from vket.services import get_vket_lock_info
+            from vket.services import get_vket_lock_info_bulk
+            lock_infos = get_vket_lock_info_bulk(events_to_delete)
             locked_events = []
             lock_message = ""
             for evt in events_to_delete:
-                locked, message = get_vket_lock_info(evt)
+                locked, message = lock_infos.get(evt.pk, (False, ""))
                 if locked:
                     locked_events.append(evt)
                     lock_message = message
@@ -361,7 +364,7 @@ class EventDeleteView(LoginRequiredMixin, DeleteView):
             if event_to_delete.pk in processed_event_ids:
                 continue
             occurrences = get_cascade_occurrences(event_to_delete)
-            lock_message = self._get_cascade_lock_message(request, occurrences)
+            lock_message = self._get_cascade_lock_message(request, occurrences, lock_infos)
             if lock_message:
                 # 削除を中止した開催回は processed に入れない。
                 # 入れると後続ループで未削除の兄弟がスキップされ、
@@ -425,15 +428,22 @@ class EventDeleteView(LoginRequiredMixin, DeleteView):
         return redirect('event:my_list')
 
     @staticmethod
-    def _get_cascade_lock_message(request, occurrences) -> str:
-        """削除連鎖にVketロック中の開催回があればメッセージを返す。"""
+    def _get_cascade_lock_message(request, occurrences, lock_infos) -> str:
+        """削除連鎖にVketロック中の開催回があればメッセージを返す。
+
+        lock_infos は判定済みの {event_id: (ロック中か, メッセージ)}。
+        未判定の開催回だけをまとめて判定し、結果を lock_infos に追加する。
+        """
         if request.user.is_superuser or request.user.is_staff:
             return ''
 
-        from vket.services import get_vket_lock_info
+        from vket.services import get_vket_lock_info_bulk
 
+        unresolved = [occurrence for occurrence in occurrences if occurrence.pk not in lock_infos]
+        if unresolved:
+            lock_infos.update(get_vket_lock_info_bulk(unresolved))
         for occurrence in occurrences:
-            locked, message = get_vket_lock_info(occurrence)
+            locked, message = lock_infos.get(occurrence.pk, (False, ""))
             if locked:
                 return message
         return ''
@@ -3,7 +3,6 @@ import logging
 from datetime import timedelta
 from typing import List, Dict
 
-from django.core.cache import cache
 from django.http import Http404
 from django.views.generic import DetailView
 
@@ -15,6 +14,7 @@ from event.models import EventDetail
 from event.views.helpers import can_manage_event_detail, extract_video_info
 from utils.vrchat_time import get_vrchat_today
 from website.constants import CACHE_TTL_HOUR
+from website.page_cache import get_or_build
 
 logger = logging.getLogger(__name__)
 
@@ -174,14 +174,10 @@ class EventDetailView(DetailView):
         return context
 
     def _fetch_related_event_details(self, event_detail: EventDetail) -> List[EventDetail]:
-        # キャッシュキーを生成
-        cache_key = f'related_event_details_{event_detail.event_id}'
-        related_event_details = cache.get(cache_key)
-        if related_event_details is None:
-            max_related_items = 6
-            cache_timeout_seconds = CACHE_TTL_HOUR
-            # キャッシュがない場合のみDBクエリを実行
-            related_event_details = list(
+        max_related_items = 6
+
+        def build():
+            return list(
                 EventDetail.objects
                 .filter(
                     event__community=event_detail.event.community,
@@ -194,7 +190,5 @@ class EventDetailView(DetailView):
                 .values('id', 'h1')[:max_related_items]
             )
 
-            # 1時間キャッシュする
-            cache.set(cache_key, related_event_details, cache_timeout_seconds)
-
-        return related_event_details
+        # 1時間キャッシュする（期限切れ時の再計算は1リクエストに絞る）
+        return get_or_build(f'related_event_details_{event_detail.event_id}', build, CACHE_TTL_HOUR)
@@ -13,9 +13,8 @@ from utils.vrchat_time import get_vrchat_today
 from website.settings import GOOGLE_CALENDAR_ID
 
 from ta_hub.utils import get_client_ip
-from django.core.cache import cache
+from website import throttling
 from django.http import HttpResponse
-from django.utils import timezone
 
 logger = logging.getLogger(__name__)
 
@@ -122,28 +121,18 @@ class EventDetailPastList(ListView):
     RATE_LIMIT_MAX_REQUESTS = 20
     ALLOWED_FILTER_KEYS = ('community_name', 'speaker', 'theme')
 
-    def _get_rate_limit_cache_key(self, client_ip):
-        bucket = int(timezone.now().timestamp()) // self.RATE_LIMIT_WINDOW_SECONDS
-        return f"event_detail_history:ip:{client_ip}:bucket:{bucket}"
+    RATE_LIMIT_SCOPE = 'event_detail_history'
 
     def _is_rate_limited(self):
+        # プロセス内のトークンバケットで判定する（リクエストごとにキャッシュを読み書きしない）
         client_ip = get_client_ip(self.request)
-        cache_key = self._get_rate_limit_cache_key(client_ip)
-        request_count = cache.get(cache_key, 0)
-
-        if request_count >= self.RATE_LIMIT_MAX_REQUESTS:
-            return True
-
-        if request_count == 0:
-            cache.set(cache_key, 1, timeout=self.RATE_LIMIT_WINDOW_SECONDS)
-        else:
-            try:
-                cache.incr(cache_key)
-            except ValueError:
-                # race condition等でキーが消えていた場合は初期化し直す
-                cache.set(cache_key, 1, timeout=self.RATE_LIMIT_WINDOW_SECONDS)
-
-        return False
+        allowed, _ = throttling.consume(
+            self.RATE_LIMIT_SCOPE,
+            f'ip:{client_ip}',
+            self.RATE_LIMIT_MAX_REQUESTS,
+            self.RATE_LIMIT_WINDOW_SECONDS,
+        )
+        return not allowed
 
     def _get_sanitized_filter_params(self):
         """検索に必要なキーのみ残し、単一値へ正規化したQueryDictを返す。"""
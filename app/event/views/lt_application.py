@@ -14,6 +14,7 @@ from django.views.generic import FormView, TemplateView, View
 from community.models import Community
 from event.forms import LTApplicationForm, LTApplicationReviewForm
 from event.models import Event, EventDetail
+from event.services.speaker_suggestions import suggest_users_for_speaker
 
 logger = logging.getLogger(__name__)
 
@@ -142,9 +143,9 @@ class LTApplicationCreateView(LoginRequiredMixin, FormView):
                 additional_info=form.cleaned_data.get('additional_info', ''),
             )
 
-        # 主催者に通知
-        from event.notifications import notify_owners_of_new_application
-        notify_owners_of_new_application(event_detail, request=self.request)
+            # 主催者に通知（申請の作成と同じトランザクションでアウトボックスに積む）
+            from event.notifications import notify_owners_of_new_application
+            notify_owners_of_new_application(event_detail, request=self.request)
 
         logger.info(
             f'発表申請作成: Community={self.community.name}, Event={event.date}, '
@@ -154,6 +155,23 @@ class LTApplicationCreateView(LoginRequiredMixin, FormView):
         return redirect('event:lt_application_complete', community_pk=self.community.pk)
 
 
+class LTSpeakerSuggestionView(LoginRequiredMixin, View):
+    """LT申請フォームの発表者名入力に、近い名前の既存ユーザーを返す（入力補完用）"""
+
+    # 短すぎる入力は編集距離2以内にほぼ全員が入るので引かない
+    MIN_QUERY_LENGTH = 2
+
+    def get(self, request, *args, **kwargs):
+        query = request.GET.get('q', '').strip()[:EventDetail._meta.get_field('speaker').max_length]
+        if len(query) < self.MIN_QUERY_LENGTH:
+            return JsonResponse({'suggestions': []})
+        return JsonResponse({
+            'suggestions': [
+                {'user_name': suggestion.user_name} for suggestion in suggest_users_for_speaker(query)
+            ],
+        })
+
+
 class LTApplicationCompleteView(LoginRequiredMixin, TemplateView):
     """発表申請完了ページ"""
 
@@ -237,13 +255,13 @@ class LTApplicationReviewView(LoginRequiredMixin, FormView):
 
             locked.save(update_fields=update_fields)
 
-        # 申請者に通知
-        from event.notifications import notify_applicant_of_result
-        notify_applicant_of_result(
-            self.event_detail,
-            request=self.request,
-            schedule_changes=schedule_changes,
-        )
+            # 申請者に通知（審査結果の保存と同じトランザクションでアウトボックスに積む）
+            from event.notifications import notify_applicant_of_result
+            notify_applicant_of_result(
+                self.event_detail,
+                request=self.request,
+                schedule_changes=schedule_changes,
+            )
 
         messages.success(self.request, f'申請を{status_text}しました。')
         logger.info(
@@ -318,13 +336,12 @@ class LTApplicationApproveView(LoginRequiredMixin, View):
             messages.info(request, 'この申請は既に処理されています。')
             return redirect('event:my_list')
 
-        # 承認処理
-        event_detail.status = 'approved'
-        event_detail.save()
-
-        # 申請者に通知
+        # 承認処理と申請者への通知（同じトランザクションでアウトボックスに積む）
         from event.notifications import notify_applicant_of_result
-        notify_applicant_of_result(event_detail, request=request)
+        with transaction.atomic():
+            event_detail.status = 'approved'
+            event_detail.save()
+            notify_applicant_of_result(event_detail, request=request)
 
         logger.info(
             f'発表申請承認: EventDetail ID={event_detail.pk}, '
@@ -367,14 +384,13 @@ class LTApplicationRejectView(LoginRequiredMixin, View):
             messages.error(request, '却下理由を入力してください。')
             return redirect('event:my_list')
 
-        # 却下処理
-        event_detail.status = 'rejected'
-        event_detail.rejection_reason = rejection_reason
-        event_detail.save()
-
-        # 申請者に通知
+        # 却下処理と申請者への通知（同じトランザクションでアウトボックスに積む）
         from event.notifications import notify_applicant_of_result
-        notify_applicant_of_result(event_detail, request=request)
+        with transaction.atomic():
+            event_detail.status = 'rejected'
+            event_detail.rejection_reason = rejection_reason
+            event_detail.save()
+            notify_applicant_of_result(event_detail, request=request)
 
         logger.info(
             f'発表申請却下: EventDetail ID={event_detail.pk}, '
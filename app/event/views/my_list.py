@@ -7,6 +7,7 @@ from django.urls import reverse
 from django.utils import timezone
 from django.views.generic import ListView
 
+from community.permissions import get_user_memberships
 from event.models import Event, EventDetail
 from event_calendar.calendar_utils import create_calendar_entry_url
 from utils.vrchat_time import get_vrchat_today
@@ -22,36 +23,26 @@ class EventMyList(LoginRequiredMixin, ListView):
 
     def _get_user_communities(self):
         """ユーザーが管理者である集会のID一覧を取得する"""
-        return list(
-            self.request.user.community_memberships.values_list('community_id', flat=True)
-        )
+        return [membership.community_id for membership in get_user_memberships(self.request.user)]
 
     def _get_active_community(self):
         """アクティブな集会を取得する"""
+        memberships = get_user_memberships(self.request.user)
         active_community_id = self.request.session.get('active_community_id')
         if active_community_id:
-            membership = self.request.user.community_memberships.filter(
-                community_id=active_community_id
-            ).select_related('community').first()
-            if membership:
-                return membership.community
+            for membership in memberships:
+                if membership.community_id == active_community_id:
+                    return membership.community
 
         # フォールバック: 最初の管理集会
-        membership = self.request.user.community_memberships.select_related('community').first()
-        if membership:
-            return membership.community
+        if memberships:
+            return memberships[0].community
 
         return None
 
     def _get_user_communities_list(self):
         """ユーザーが管理者である集会のオブジェクト一覧を取得する"""
-        communities = []
-
-        # メンバーシップベースの集会
-        for membership in self.request.user.community_memberships.select_related('community'):
-            communities.append(membership.community)
-
-        return communities
+        return [membership.community for membership in get_user_memberships(self.request.user)]
 
     def _get_warnings(self, community):
         """アクティブな集会に対する警告リストを取得する"""
@@ -142,10 +133,15 @@ class EventMyList(LoginRequiredMixin, ListView):
         - can_edit_event: 集会の管理者（owner/staff）または superuser
         - vket_locked: Vket コラボ期間中で編集不可（superuser/is_staff は False）
         """
-        from vket.services import get_vket_lock_info
+        from vket.services import get_vket_lock_info_bulk
 
         user = self.request.user
         today = get_vrchat_today()
+        # Vket ロックは一覧全体を1クエリで判定する（superuser/is_staff は判定不要）
+        if user.is_superuser or user.is_staff:
+            lock_infos = {}
+        else:
+            lock_infos = get_vket_lock_info_bulk(events)
         # community 単位で権限判定を1回にまとめる（N+1回避）
         community_edit_cache = {}
         for event in events:
@@ -156,11 +152,7 @@ class EventMyList(LoginRequiredMixin, ListView):
                 )
             event.can_edit_event = community_edit_cache[community_id] and event.date >= today
 
-            if user.is_superuser or user.is_staff:
-                event.vket_locked = False
-            else:
-                locked, _ = get_vket_lock_info(event)
-                event.vket_locked = locked
+            event.vket_locked, _ = lock_infos.get(event.id, (False, ""))
         return events
 
     def _attach_event_details(self, events):